@@ -0,0 +1,67 @@
+"""Memory per pod of a nodes snapshot, by representation.
+
+Measured with tracemalloc: the bytes still allocated after building each
+representation of the same synthetic cluster (100k pods on 1000 nodes,
+40 owners in 20 namespaces, 3 labels per pod by default).
+
+    python benchmarks/bench_memory.py [--nodes N] [--pods N]
+"""
+
+import argparse
+import gc
+import tracemalloc
+from typing import List
+
+import fake_cluster
+
+
+def measure(build):
+    """(value, bytes allocated by *build* and still live)."""
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=1000)
+    parser.add_argument("--pods", type=int, default=100_000)
+    args = parser.parse_args()
+
+    core = fake_cluster.FakeCoreV1Api(args.nodes, args.pods)
+    fake_cluster.install(core)
+    import k8s_client
+    import models
+    import records
+    from pydantic import TypeAdapter
+
+    from cache_backend import MemoryCacheBackend
+    from usage_index import UsageIndex
+
+    k8s = k8s_client.K8sClient(backend=MemoryCacheBackend())
+    nodes, from_api = measure(k8s._fetch_nodes_with_pods)
+    payload = records.dump_nodes(nodes)
+    _, from_json = measure(lambda: records.load_nodes(payload))
+    # How snapshots were held before the records
+    adapter = TypeAdapter(List[models.NodeDetail])
+    _, pydantic = measure(lambda: adapter.validate_json(payload))
+
+    index = UsageIndex(core, k8s_client._pod_requests, "bench", 5, 30)
+    _, usage = measure(index._relist)
+
+    print(f"{args.nodes} nodes, {args.pods} pods, {len(payload) / 1e6:.1f} MB as JSON")
+    for label, size in (
+        ("pydantic NodeDetail/PodDetail", pydantic),
+        ("records built from the API", from_api),
+        ("records decoded from JSON", from_json),
+        ("usage index (SUMMARY_SOURCE=index)", usage),
+    ):
+        print(f"  {label:<36} {size / args.pods:8.0f} bytes/pod")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Serving times over a large snapshot (4000 nodes, 40k pods by default).
+
+- GET /api/nodes through the TestClient, warm cache, against validating
+  and serializing the records through the response model per request
+- cluster summary from the usage index against a full fetch
+- label selectors through the LabelIndex against a linear scan
+
+Each time is the median of ``--runs`` runs.
+
+    python benchmarks/bench_snapshot.py [--nodes N] [--pods N] [--runs N]
+"""
+
+import argparse
+import logging
+import statistics
+import time
+from typing import List
+
+import fake_cluster
+
+SELECTORS = (
+    ("pods", "app=trainer-7-7d9f8c6b5"),
+    ("pods", "team in (team-1,team-2),app!=trainer-1-7d9f8c6b5"),
+    ("nodes", "nvidia.com/gpu.product=NVIDIA-H100-80GB-HBM3,pool notin (pool-1)"),
+)
+
+
+def median_ms(fn, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def _matches(labels, requirements) -> bool:
+    for r in requirements:
+        if r.op == "exists":
+            ok = r.key in labels
+        elif r.op == "!exists":
+            ok = r.key not in labels
+        elif r.op == "in":
+            ok = labels.get(r.key) in r.values
+        else:
+            ok = labels.get(r.key) not in r.values
+        if not ok:
+            return False
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=4000)
+    parser.add_argument("--pods", type=int, default=40_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    core = fake_cluster.FakeCoreV1Api(args.nodes, args.pods, owners=50)
+    fake_cluster.install(core)
+    from fastapi.testclient import TestClient
+    from pydantic import TypeAdapter
+
+    import k8s_client
+    import main as app_main
+    import models
+    from label_index import LabelIndex, parse_selector
+    from usage_index import UsageIndex
+
+    # main configures INFO logging; one line per request would bury the results
+    logging.disable(logging.INFO)
+    print(f"{args.nodes} nodes, {args.pods} pods, median of {args.runs}")
+
+    with TestClient(app_main.app) as http:
+        response = http.get("/api/nodes")
+        response.raise_for_status()
+        served = median_ms(lambda: http.get("/api/nodes"), args.runs)
+    nodes = k8s_client.get_k8s_client().get_nodes_with_pods()
+    # What the response model did per request before the pre-serialized bytes
+    adapter = TypeAdapter(List[models.NodeDetail])
+    validated = median_ms(
+        lambda: adapter.dump_json(adapter.validate_python(nodes, from_attributes=True)),
+        args.runs,
+    )
+    print(f"GET /api/nodes ({len(response.content) / 1e6:.1f} MB)")
+    print(f"  response model validation + dump  {validated:8.0f} ms")
+    print(f"  pre-serialized JSON bytes         {served:8.0f} ms")
+
+    k8s = k8s_client.K8sClient()
+    fetched = median_ms(
+        lambda: k8s_client.build_cluster_summary(k8s._fetch_nodes_with_pods()), args.runs
+    )
+    index = UsageIndex(core, k8s_client._pod_requests, "bench", 5, 30)
+    index._relist()
+    k8s._usage = index
+    indexed = median_ms(k8s._build_index_summary, args.runs)
+    print("Cluster summary")
+    print(f"  full node and pod fetch           {fetched:8.0f} ms")
+    print(f"  usage index + node list           {indexed:8.0f} ms")
+
+    label_index = LabelIndex(nodes)
+    print("Label selectors (index / linear scan)")
+    for kind, selector in SELECTORS:
+        requirements = parse_selector(selector)
+        if kind == "nodes":
+            select = label_index.select_nodes
+            objects = [(n, n.labels) for n in nodes]
+        else:
+            select = label_index.select_pods
+            objects = [(p, p.labels) for _, p in label_index.pods]
+        matched = len(select(requirements))
+        assert matched == sum(_matches(labels, requirements) for _, labels in objects)
+        indexed = median_ms(lambda: select(requirements), args.runs)
+        scanned = median_ms(
+            lambda: [o for o, labels in objects if _matches(labels, requirements)], args.runs
+        )
+        print(f"  {kind} {selector!r}: {matched} matched, "
+              f"{indexed:.2f} / {scanned:.2f} ms ({scanned / indexed:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
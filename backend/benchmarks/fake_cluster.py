@@ -0,0 +1,122 @@
+"""Synthetic cluster served by an in-process fake CoreV1Api.
+
+Nodes and pods are real ``kubernetes.client`` models, so K8sClient builds
+its records exactly as it does from the API server.  ``install()`` makes
+``K8sClient()`` (and the app) talk to the fake instead of a cluster.
+"""
+
+import datetime
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from kubernetes import client, config  # noqa: E402
+
+_EPOCH = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+_GPU_TYPES = ("NVIDIA-A100-SXM4-80GB", "NVIDIA-H100-80GB-HBM3", "NVIDIA-L4")
+
+
+def make_node(i: int, gpus: int = 8) -> client.V1Node:
+    resources = {"nvidia.com/gpu": str(gpus), "cpu": "64", "memory": "512Gi"}
+    return client.V1Node(
+        metadata=client.V1ObjectMeta(
+            name=f"node-{i}",
+            labels={
+                "nvidia.com/gpu.product": _GPU_TYPES[i % len(_GPU_TYPES)],
+                "topology.kubernetes.io/zone": f"zone-{i % 3}",
+                "kubernetes.io/arch": "amd64",
+                "pool": f"pool-{i % 10}",
+            },
+        ),
+        status=client.V1NodeStatus(
+            capacity=resources,
+            allocatable=resources,
+            conditions=[client.V1NodeCondition(type="Ready", status="True")],
+            node_info=client.V1NodeSystemInfo(
+                architecture="amd64", boot_id="", container_runtime_version="containerd://1.7",
+                kernel_version="6.1", kube_proxy_version="", kubelet_version="v1.29.4",
+                machine_id="", operating_system="linux", os_image="Ubuntu 22.04",
+                system_uuid="",
+            ),
+        ),
+    )
+
+
+def make_pod(i: int, node: str, owners: int, namespaces: int) -> client.V1Pod:
+    owner = f"trainer-{i % owners}-7d9f8c6b5"
+    namespace = f"team-{i % namespaces}"
+    requests = {"nvidia.com/gpu": "1", "cpu": "4", "memory": "16Gi"}
+    return client.V1Pod(
+        metadata=client.V1ObjectMeta(
+            name=f"{owner}-{i:06d}",
+            namespace=namespace,
+            uid=f"uid-{i}",
+            labels={"app": owner, "pod-template-hash": "7d9f8c6b5", "team": namespace},
+            owner_references=[client.V1OwnerReference(
+                api_version="apps/v1", kind="ReplicaSet", name=owner,
+                uid=f"owner-{i % owners}", controller=True,
+            )],
+            creation_timestamp=_EPOCH,
+        ),
+        spec=client.V1PodSpec(
+            node_name=node,
+            containers=[client.V1Container(
+                name="main",
+                image="nvcr.io/nvidia/pytorch:24.05-py3",
+                resources=client.V1ResourceRequirements(
+                    requests=requests, limits={"nvidia.com/gpu": "1"}
+                ),
+            )],
+        ),
+        status=client.V1PodStatus(
+            phase="Running",
+            pod_ip="10.0.0.1",
+            qos_class="Burstable",
+            container_statuses=[client.V1ContainerStatus(
+                name="main", image="nvcr.io/nvidia/pytorch:24.05-py3", image_id="",
+                ready=True, restart_count=0,
+                state=client.V1ContainerState(
+                    running=client.V1ContainerStateRunning(started_at=_EPOCH)
+                ),
+            )],
+        ),
+    )
+
+
+class _List:
+    def __init__(self, items, continue_token=None):
+        self.items = items
+        self.metadata = client.V1ListMeta(resource_version="1", _continue=continue_token)
+
+
+class FakeCoreV1Api:
+    """The CoreV1Api calls K8sClient and UsageIndex make, over fixed lists."""
+
+    def __init__(self, nodes: int, pods: int, owners: int = 40, namespaces: int = 20):
+        self.nodes = [make_node(i) for i in range(nodes)]
+        self.pods = [make_pod(i, f"node-{i % nodes}", owners, namespaces) for i in range(pods)]
+        self.api_client = client.ApiClient()
+
+    def list_node(self, **kwargs):
+        return _List(self.nodes)
+
+    def list_pod_for_all_namespaces(self, limit=None, _continue=None, **kwargs):
+        if not limit:
+            return _List(self.pods)
+        start = int(_continue or 0)
+        end = start + limit
+        return _List(self.pods[start:end], str(end) if end < len(self.pods) else None)
+
+    def list_namespaced_pod(self, namespace, **kwargs):
+        return _List([p for p in self.pods if p.metadata.namespace == namespace])
+
+
+def install(core: FakeCoreV1Api) -> None:
+    """Route every K8sClient to *core*, without kubeconfig or watches."""
+    os.environ.setdefault("OWNER_GRAPH_ENABLED", "0")
+    os.environ.setdefault("REFRESH_SCHEDULER", "0")
+    config.load_incluster_config = lambda *args, **kwargs: None
+    client.CoreV1Api = lambda *args, **kwargs: core
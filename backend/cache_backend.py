@@ -0,0 +1,424 @@
+"""Pluggable snapshot cache backends.
+
+The default backend keeps snapshots in process memory.  Setting
+``CACHE_BACKEND`` to ``file`` (a directory on a shared volume) or ``redis``
+shares serialized snapshots between backend replicas, and a per-key lease
+makes sure only one replica refreshes a given cluster at a time.  The lease
+holder renews it while a refresh runs (see ``keep_lease``), so a refresh
+that takes longer than ``CACHE_LEASE_TTL`` is not started a second time.
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration from environment
+# ---------------------------------------------------------------------------
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")     # memory | file | redis
+CACHE_DIR = os.getenv("CACHE_DIR", "/var/cache/k8s-dashboard")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+REDIS_KEY_PREFIX = os.getenv("REDIS_KEY_PREFIX", "k8s-dashboard")
+CACHE_LEASE_TTL = int(os.getenv("CACHE_LEASE_TTL", "120"))  # refresh lease (seconds)
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    fetched_at: float  # wall-clock time (time.time()) so replicas can compare
+    version: int
+
+
+def _owner_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+class CacheBackend:
+    """Interface for snapshot storage shared by all K8sClient instances.
+
+    ``serialized`` backends only store ``bytes``; callers encode before
+    ``put`` and decode after ``get``.
+    """
+
+    serialized = False
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        raise NotImplementedError
+
+    def put(self, key: str, value: Any, fetched_at: Optional[float] = None) -> CacheEntry:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def drop_local(self, key: str) -> None:
+        """Free whatever this process holds for *key* without affecting
+        other replicas."""
+        raise NotImplementedError
+
+    def acquire_lease(self, key: str, ttl: int = CACHE_LEASE_TTL) -> bool:
+        """Try to become the refresher for *key*.  Non-blocking."""
+        raise NotImplementedError
+
+    def renew_lease(self, key: str, ttl: int = CACHE_LEASE_TTL) -> bool:
+        """Extend a lease this process holds; False if it was lost."""
+        raise NotImplementedError
+
+    def release_lease(self, key: str) -> None:
+        raise NotImplementedError
+
+    @contextmanager
+    def keep_lease(self, key: str, ttl: int = CACHE_LEASE_TTL) -> Iterator[None]:
+        """Renew the lease on *key* every third of *ttl* while the block runs."""
+        done = threading.Event()
+
+        def renew() -> None:
+            while not done.wait(ttl / 3):
+                try:
+                    if not self.renew_lease(key, ttl):
+                        logger.warning("Refresh lease on %s is held elsewhere", key)
+                except Exception:
+                    logger.exception("Renewing refresh lease on %s failed", key)
+
+        thread = threading.Thread(target=renew, name=f"lease-{key}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+
+
+# ---------------------------------------------------------------------------
+# In-process (default)
+# ---------------------------------------------------------------------------
+class MemoryCacheBackend(CacheBackend):
+    """Python objects in a dict; leases only de-duplicate local threads."""
+
+    def __init__(self):
+        self._entries: Dict[str, CacheEntry] = {}
+        self._owner = _owner_id()
+        # key -> (owner, monotonic expiry)
+        self._leases: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        return self._entries.get(key)
+
+    def put(self, key: str, value: Any, fetched_at: Optional[float] = None) -> CacheEntry:
+        with self._lock:
+            prev = self._entries.get(key)
+            entry = CacheEntry(
+                value,
+                fetched_at if fetched_at is not None else time.time(),
+                prev.version + 1 if prev else 1,
+            )
+            self._entries[key] = entry
+        return entry
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    drop_local = delete
+
+    def acquire_lease(self, key: str, ttl: int = CACHE_LEASE_TTL) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            lease = self._leases.get(key)
+            if lease is not None and lease[1] > now:
+                return False
+            self._leases[key] = (self._owner, now + ttl)
+            return True
+
+    def renew_lease(self, key: str, ttl: int = CACHE_LEASE_TTL) -> bool:
+        with self._lock:
+            lease = self._leases.get(key)
+            if lease is None or lease[0] != self._owner:
+                return False
+            self._leases[key] = (self._owner, time.monotonic() + ttl)
+            return True
+
+    def release_lease(self, key: str) -> None:
+        with self._lock:
+            lease = self._leases.get(key)
+            if lease is not None and lease[0] == self._owner:
+                del self._leases[key]
+
+
+# ---------------------------------------------------------------------------
+# Shared filesystem (e.g. a ReadWriteMany volume)
+# ---------------------------------------------------------------------------
+class FileCacheBackend(CacheBackend):
+    """One file per key: a JSON header line followed by the payload bytes.
+
+    Writes go to a temp file and are renamed into place, so readers never see
+    a partial snapshot.  Each rename creates a new inode, which lets readers
+    keep the last payload they read until the file is replaced.  Leases are
+    ``O_EXCL`` lock files holding the owner's id.  Their mtime is the last
+    renewal, and they expire *ttl* seconds after it in case the owning
+    replica dies mid-refresh.  A stale lease is broken by one replica at a
+    time, under an ``O_EXCL`` guard file, by renaming it to a name unique to
+    that replica.
+    """
+
+    serialized = True
+
+    def __init__(self, directory: str = CACHE_DIR):
+        self._dir = directory
+        self._owner = _owner_id()
+        # key -> ((inode, mtime_ns), entry) for the last file read
+        self._read_memo: Dict[str, tuple] = {}
+        os.makedirs(self._dir, exist_ok=True)
+
+    def _path(self, key: str, suffix: str) -> str:
+        safe = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in key)
+        return os.path.join(self._dir, safe + suffix)
+
+    def _read_header(self, path: str) -> Optional[dict]:
+        try:
+            with open(path, "rb") as f:
+                return json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        try:
+            with open(self._path(key, ".snap"), "rb") as f:
+                st = os.fstat(f.fileno())
+                stamp = (st.st_ino, st.st_mtime_ns)
+                memo = self._read_memo.get(key)
+                if memo is not None and memo[0] == stamp:
+                    return memo[1]
+                header = json.loads(f.readline())
+                payload = f.read()
+        except (OSError, ValueError):
+            return None
+        entry = CacheEntry(payload, header["fetched_at"], header["version"])
+        self._read_memo[key] = (stamp, entry)
+        return entry
+
+    def put(self, key: str, value: bytes, fetched_at: Optional[float] = None) -> CacheEntry:
+        path = self._path(key, ".snap")
+        prev = self._read_header(path)
+        header = {
+            "version": prev["version"] + 1 if prev else 1,
+            "fetched_at": fetched_at if fetched_at is not None else time.time(),
+        }
+        tmp = f"{path}.{self._owner}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(json.dumps(header).encode() + b"\n")
+            f.write(value)
+        os.replace(tmp, path)
+        return CacheEntry(value, header["fetched_at"], header["version"])
+
+    def delete(self, key: str) -> None:
+        self._read_memo.pop(key, None)
+        try:
+            os.remove(self._path(key, ".snap"))
+        except FileNotFoundError:
+            pass
+
+    def drop_local(self, key: str) -> None:
+        self._read_memo.pop(key, None)
+
+    def _lease_owner(self, path: str) -> Optional[str]:
+        try:
+            with open(path) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _break_stale_lease(self, path: str, ttl: int) -> bool:
+        """Remove the lease at *path* if it is stale.  True when the lease
+        is gone (worth retrying to take it), False while it is held or
+        another replica is breaking it."""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return True
+        if time.time() - st.st_mtime < ttl:
+            return False
+        # One breaker at a time: otherwise a replica that saw the old lease
+        # could rename away the lease another replica just took
+        guard = path + ".breaking"
+        try:
+            os.close(os.open(guard, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+        except FileExistsError:
+            try:
+                # Left behind by a replica that died mid-break
+                if time.time() - os.stat(guard).st_mtime >= ttl:
+                    os.remove(guard)
+            except FileNotFoundError:
+                pass
+            return False
+        try:
+            # Broken and taken again since the first look?
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                return True
+            if time.time() - st.st_mtime < ttl:
+                return False
+            broken = f"{path}.{self._owner}.broken"
+            try:
+                os.rename(path, broken)
+            except FileNotFoundError:
+                return True  # released by its holder
+            taken = os.stat(broken)
+            if taken.st_ino != st.st_ino or time.time() - taken.st_mtime < ttl:
+                # Renewed (or released and taken) between the stat and the
+                # rename: hand it back unless someone took the path already
+                try:
+                    os.link(broken, path)
+                except FileExistsError:
+                    pass
+                os.remove(broken)
+                return False
+            os.remove(broken)
+            return True
+        finally:
+            os.remove(guard)
+
+    def acquire_lease(self, key: str, ttl: int = CACHE_LEASE_TTL) -> bool:
+        path = self._path(key, ".lease")
+        while True:
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                # Stale lease left behind by a dead replica: break it and retry
+                if not self._break_stale_lease(path, ttl):
+                    return False
+                continue
+            with os.fdopen(fd, "w") as f:
+                f.write(self._owner)
+            return True
+
+    def renew_lease(self, key: str, ttl: int = CACHE_LEASE_TTL) -> bool:
+        path = self._path(key, ".lease")
+        if self._lease_owner(path) != self._owner:
+            return False
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def release_lease(self, key: str) -> None:
+        path = self._path(key, ".lease")
+        if self._lease_owner(path) != self._owner:
+            return
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Redis (or any server speaking the Redis protocol)
+# ---------------------------------------------------------------------------
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+_RENEW_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class RedisCacheBackend(CacheBackend):
+    """Snapshots in a Redis hash per key; leases via ``SET NX PX``."""
+
+    serialized = True
+
+    def __init__(self, url: str = REDIS_URL, prefix: str = REDIS_KEY_PREFIX):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError(
+                "CACHE_BACKEND=redis requires the 'redis' package (pip install redis)"
+            ) from exc
+        self._redis = redis.Redis.from_url(url)
+        self._prefix = prefix
+        self._owner = _owner_id()
+        self._release = self._redis.register_script(_RELEASE_SCRIPT)
+        self._renew = self._redis.register_script(_RENEW_SCRIPT)
+
+    def _key(self, key: str, kind: str) -> str:
+        return f"{self._prefix}:{kind}:{key}"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        data = self._redis.hgetall(self._key(key, "snap"))
+        if not data:
+            return None
+        return CacheEntry(
+            data[b"value"], float(data[b"fetched_at"]), int(data[b"version"])
+        )
+
+    def put(self, key: str, value: bytes, fetched_at: Optional[float] = None) -> CacheEntry:
+        fetched_at = fetched_at if fetched_at is not None else time.time()
+        snap_key = self._key(key, "snap")
+        pipe = self._redis.pipeline()
+        pipe.hincrby(snap_key, "version", 1)
+        pipe.hset(snap_key, mapping={"value": value, "fetched_at": fetched_at})
+        version, _ = pipe.execute()
+        return CacheEntry(value, fetched_at, int(version))
+
+    def delete(self, key: str) -> None:
+        self._redis.delete(self._key(key, "snap"))
+
+    def drop_local(self, key: str) -> None:
+        pass
+
+    def acquire_lease(self, key: str, ttl: int = CACHE_LEASE_TTL) -> bool:
+        return bool(
+            self._redis.set(self._key(key, "lease"), self._owner, nx=True, px=ttl * 1000)
+        )
+
+    def renew_lease(self, key: str, ttl: int = CACHE_LEASE_TTL) -> bool:
+        return bool(
+            self._renew(keys=[self._key(key, "lease")], args=[self._owner, ttl * 1000])
+        )
+
+    def release_lease(self, key: str) -> None:
+        self._release(keys=[self._key(key, "lease")], args=[self._owner])
+
+
+# ---------------------------------------------------------------------------
+# Process-wide backend selected by CACHE_BACKEND
+# ---------------------------------------------------------------------------
+_BACKENDS = {
+    "memory": MemoryCacheBackend,
+    "file": FileCacheBackend,
+    "redis": RedisCacheBackend,
+}
+_backend: Optional[CacheBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_cache_backend() -> CacheBackend:
+    """Return the process-wide cache backend, creating it on first use."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if CACHE_BACKEND not in _BACKENDS:
+                    raise ValueError(
+                        f"Unknown CACHE_BACKEND {CACHE_BACKEND!r}; "
+                        f"expected one of {', '.join(_BACKENDS)}"
+                    )
+                _backend = _BACKENDS[CACHE_BACKEND]()
+                logger.info("Using %s snapshot cache backend", CACHE_BACKEND)
+    return _backend
@@ -0,0 +1,99 @@
+"""Per-context circuit breaker for unreachable clusters.
+
+After ``BREAKER_FAILURE_THRESHOLD`` consecutive fetches that fail to reach
+the API server (errors it returns do not count) the circuit opens and
+fetches fail immediately, without touching the network, for an
+exponentially growing backoff (``BREAKER_BASE_BACKOFF`` doubling up to
+``BREAKER_MAX_BACKOFF``).  When the backoff expires one trial fetch is let
+through (half-open); success closes the circuit, failure re-opens it with
+the next backoff step.
+"""
+
+import os
+import random
+import threading
+import time
+
+# ---------------------------------------------------------------------------
+# Configuration from environment
+# ---------------------------------------------------------------------------
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "2"))
+BREAKER_BASE_BACKOFF = float(os.getenv("BREAKER_BASE_BACKOFF", "5"))     # seconds
+BREAKER_MAX_BACKOFF = float(os.getenv("BREAKER_MAX_BACKOFF", "300"))     # seconds
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of fetching while a context's circuit is open."""
+
+    def __init__(self, context: str, retry_after: float):
+        super().__init__(f"Cluster {context} is unreachable; retrying in {retry_after:.0f}s")
+        self.context = context
+        self.retry_after = retry_after
+
+
+class ClusterUnreachableError(Exception):
+    """Raised when a fetch fails before the API server answers (refused,
+    timed out, reset), whether or not the circuit has opened yet."""
+
+    def __init__(self, context: str, retry_after: float):
+        super().__init__(f"Cluster {context} is unreachable; retry in {retry_after:.0f}s")
+        self.context = context
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(self, name: str):
+        self.name = name
+        self._failures = 0
+        self._opened = 0          # consecutive times the circuit has opened
+        self._open_until = 0.0    # monotonic
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened == 0:
+                return CLOSED
+            if time.monotonic() < self._open_until or self._trial_running:
+                return OPEN
+            return HALF_OPEN
+
+    def retry_after(self) -> float:
+        return max(0.0, self._open_until - time.monotonic())
+
+    def raise_if_open(self) -> None:
+        """Like before_call(), but never claims the half-open trial."""
+        if self.state == OPEN:
+            raise CircuitOpenError(self.name, self.retry_after())
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a fetch may go ahead now."""
+        with self._lock:
+            if self._opened == 0:
+                return
+            if time.monotonic() < self._open_until or self._trial_running:
+                raise CircuitOpenError(self.name, self.retry_after())
+            # Half-open: let exactly one trial through
+            self._trial_running = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened = 0
+            self._open_until = 0.0
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._opened == 0 and self._failures < BREAKER_FAILURE_THRESHOLD:
+                return
+            backoff = min(BREAKER_MAX_BACKOFF, BREAKER_BASE_BACKOFF * 2 ** self._opened)
+            self._opened += 1
+            self._open_until = time.monotonic() + backoff * random.uniform(0.8, 1.2)
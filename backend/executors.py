@@ -0,0 +1,133 @@
+"""Bounded per-context executors with admission control.
+
+Blocking snapshot work for each cluster context runs on that context's own
+small thread pool instead of the event loop's shared default executor, so
+a slow cluster can only exhaust its own threads.  When a context already
+has ``CONTEXT_WORKERS`` calls running and ``CONTEXT_QUEUE_LIMIT`` waiting,
+new calls are rejected with ContextOverloadedError (HTTP 503 with
+Retry-After) instead of queueing without bound.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, TypeVar
+
+from models import ExecutorStats
+
+T = TypeVar("T")
+
+# ---------------------------------------------------------------------------
+# Configuration from environment
+# ---------------------------------------------------------------------------
+CONTEXT_WORKERS = int(os.getenv("CONTEXT_WORKERS", "4"))          # threads per context
+CONTEXT_QUEUE_LIMIT = int(os.getenv("CONTEXT_QUEUE_LIMIT", "32"))  # waiting calls per context
+
+_EWMA_ALPHA = 0.2
+
+
+class ContextOverloadedError(Exception):
+    """Raised when a context's executor queue is full."""
+
+    def __init__(self, context: str, retry_after: float):
+        super().__init__(f"Too many pending requests for cluster {context}")
+        self.context = context
+        self.retry_after = retry_after
+
+
+class ContextExecutor:
+    def __init__(
+        self,
+        name: str,
+        workers: int = CONTEXT_WORKERS,
+        queue_limit: int = CONTEXT_QUEUE_LIMIT,
+    ):
+        self.name = name
+        self._workers = workers
+        self._queue_limit = queue_limit
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"ctx-{name}")
+        self._lock = threading.Lock()
+        self._pending = 0   # queued + running
+        self._running = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._avg_wait = 0.0
+        self._max_wait = 0.0
+        self._avg_run = 0.0
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        with self._lock:
+            if self._pending >= self._workers + self._queue_limit:
+                self._rejected += 1
+                raise ContextOverloadedError(self.name, self._retry_after())
+            self._pending += 1
+            self._submitted += 1
+        enqueued = time.monotonic()
+
+        def task():
+            started = time.monotonic()
+            with self._lock:
+                self._running += 1
+                wait = started - enqueued
+                self._avg_wait += _EWMA_ALPHA * (wait - self._avg_wait)
+                self._max_wait = max(self._max_wait, wait)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._avg_run += _EWMA_ALPHA * (time.monotonic() - started - self._avg_run)
+
+        future = self._pool.submit(task)
+        # Runs even if the call is cancelled before it starts
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _retry_after(self) -> float:
+        # Time for the current backlog to drain at the observed run time
+        return max(1.0, self._avg_run * self._pending / self._workers)
+
+    def stats(self) -> ExecutorStats:
+        with self._lock:
+            return ExecutorStats(
+                context=self.name,
+                workers=self._workers,
+                queue_limit=self._queue_limit,
+                running=self._running,
+                queued=self._pending - self._running,
+                submitted=self._submitted,
+                rejected=self._rejected,
+                avg_wait_ms=round(self._avg_wait * 1000, 1),
+                max_wait_ms=round(self._max_wait * 1000, 1),
+                avg_run_ms=round(self._avg_run * 1000, 1),
+            )
+
+
+_executors: Dict[str, ContextExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(context: Optional[str]) -> ContextExecutor:
+    """Executor for *context* (None is the default context).  Callers must
+    validate the context first; there is one executor per known context."""
+    name = context or "__default__"
+    with _executors_lock:
+        if name not in _executors:
+            _executors[name] = ContextExecutor(name)
+        return _executors[name]
+
+
+async def run_in_context(context: Optional[str], fn: Callable[..., T], *args) -> T:
+    return await get_executor(context).run(fn, *args)
+
+
+def executor_stats() -> List[ExecutorStats]:
+    with _executors_lock:
+        executors = list(_executors.values())
+    return [e.stats() for e in sorted(executors, key=lambda e: e.name)]
@@ -0,0 +1,169 @@
+"""Columnar export of a snapshot as Arrow IPC or Parquet (optional).
+
+The nested node list is flattened into three tables, built straight from
+the snapshot records without going through JSON:
+
+- ``nodes``: one row per node,
+- ``pods``: one row per pod, with the name of its node,
+- ``containers``: one row per container, with its node, namespace and pod.
+
+Repeated strings (GPU types, namespaces, owners, phases, images, ...) are
+dictionary-encoded and labels are ``map<string, string>`` columns.  Tables
+are written in record batches / row groups of ``EXPORT_BATCH_ROWS`` rows
+and streamed to the client batch by batch.
+
+Requires the ``pyarrow`` package (``pip install pyarrow``); without it
+:data:`AVAILABLE` is False.  pyarrow is only imported by the first export,
+so processes that never export don't pay for loading it.
+"""
+
+import importlib.util
+import os
+from typing import TYPE_CHECKING, Dict, Iterator, List, Tuple
+
+from records import NodeRecord
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# Optional dependency, looked up without importing it
+AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+# ---------------------------------------------------------------------------
+# Configuration from environment
+# ---------------------------------------------------------------------------
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "65536"))
+
+TABLES = ("nodes", "pods", "containers")
+FORMATS = {
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+# Column kinds: "dict" = dictionary-encoded string
+_NODE_COLUMNS = [
+    ("name", "str"), ("gpu_type", "dict"),
+    ("gpu_total", "int"), ("gpu_allocatable", "int"), ("gpu_used", "int"),
+    ("cpu_total_millicores", "int"), ("cpu_allocatable_millicores", "int"),
+    ("cpu_used_millicores", "int"),
+    ("memory_total_bytes", "int"), ("memory_allocatable_bytes", "int"),
+    ("memory_used_bytes", "int"),
+    ("conditions_ready", "bool"), ("os", "dict"), ("arch", "dict"),
+    ("kubelet_version", "dict"),
+    ("cpu_usage_millicores", "int"), ("memory_usage_bytes", "int"),
+    ("gpu_utilization_percent", "float"),
+    ("labels", "labels"),
+]
+_POD_COLUMNS = [
+    ("name", "str"), ("namespace", "dict"),
+    ("owner_kind", "dict"), ("owner_name", "dict"),
+    ("workload_kind", "dict"), ("workload_name", "dict"), ("phase", "dict"),
+    ("gpu_request", "int"), ("gpu_limit", "int"),
+    ("cpu_request_millicores", "int"), ("cpu_limit_millicores", "int"),
+    ("memory_request_bytes", "int"), ("memory_limit_bytes", "int"),
+    ("created_at", "str"), ("ip", "str"), ("qos_class", "dict"),
+    ("cpu_usage_millicores", "int"), ("memory_usage_bytes", "int"),
+    ("gpu_utilization_percent", "float"),
+    ("labels", "labels"),
+]
+_CONTAINER_COLUMNS = [
+    ("name", "dict"), ("state", "dict"), ("ready", "bool"),
+    ("restart_count", "int"), ("image", "dict"), ("reason", "dict"),
+    ("message", "str"), ("started_at", "str"),
+]
+
+
+def _array(values: list, kind: str):
+    import pyarrow as pa
+
+    if kind == "dict":
+        return pa.array(values, pa.string()).dictionary_encode()
+    if kind == "labels":
+        return pa.array(
+            [list(labels.items()) for labels in values], pa.map_(pa.string(), pa.string())
+        )
+    return pa.array(values, {
+        "str": pa.string(), "int": pa.int64(), "bool": pa.bool_(), "float": pa.float64(),
+    }[kind])
+
+
+def _table(rows: List[tuple], prefix: List[Tuple[str, str]], columns: List[Tuple[str, str]]):
+    """Table from (*prefix values, record) rows."""
+    import pyarrow as pa
+
+    arrays, names = [], []
+    for i, (name, kind) in enumerate(prefix):
+        arrays.append(_array([row[i] for row in rows], kind))
+        names.append(name)
+    for name, kind in columns:
+        arrays.append(_array([getattr(row[-1], name) for row in rows], kind))
+        names.append(name)
+    return pa.table(arrays, names=names)
+
+
+def build_tables(nodes: List[NodeRecord]) -> Dict[str, "pa.Table"]:
+    """The nodes, pods and containers tables of a snapshot."""
+    node_rows = [(len(n.pods), n) for n in nodes]
+    pod_rows = [(n.name, p) for n in nodes for p in n.pods]
+    container_rows = [
+        (node, p.namespace, p.name, c) for node, p in pod_rows for c in p.containers
+    ]
+    return {
+        "nodes": _table(node_rows, [("pod_count", "int")], _NODE_COLUMNS),
+        "pods": _table(pod_rows, [("node", "dict")], _POD_COLUMNS),
+        "containers": _table(
+            container_rows,
+            [("node", "dict"), ("namespace", "dict"), ("pod", "str")],
+            _CONTAINER_COLUMNS,
+        ),
+    }
+
+
+class _Sink:
+    """Write-only file object whose buffered bytes are drained as they are
+    produced, so a table is streamed without being written out whole."""
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._pos = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._buf += data
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = bytes(self._buf)
+        self._buf.clear()
+        return data
+
+
+def iter_table(table: "pa.Table", fmt: str) -> Iterator[bytes]:
+    """Encode *table* as an Arrow IPC stream or a Parquet file, yielding
+    the bytes of each batch as soon as it is written."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _Sink()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, table.schema)
+        for start in range(0, table.num_rows, EXPORT_BATCH_ROWS):
+            writer.write_table(table.slice(start, EXPORT_BATCH_ROWS))
+            yield sink.drain()
+    else:
+        writer = pa.ipc.new_stream(sink, table.schema)
+        for batch in table.to_batches(max_chunksize=EXPORT_BATCH_ROWS):
+            writer.write_batch(batch)
+            yield sink.drain()
+    writer.close()
+    yield sink.drain()
@@ -0,0 +1,102 @@
+"""GPU fragmentation per GPU type.
+
+Utilization alone hides whether a job can be placed: 30% free GPUs
+scattered one or two per node cannot run an 8-GPU job.  Per GPU type this
+tracks, over ready nodes:
+
+- a histogram of free GPUs per node,
+- the largest request that fits on a single node, counting only nodes
+  with enough CPU and memory left to run a GPU pod,
+- free GPUs stranded because the node's CPU or memory is exhausted
+  (less than ``STRANDED_CPU_MILLICORES`` / ``STRANDED_MEMORY_BYTES``
+  unrequested).
+
+Computed from each node's capacity and used fields, incrementally per
+snapshot (see gpu_cube.NodeRollup).
+"""
+
+import os
+from collections import Counter
+from typing import Dict, List, Optional
+
+from gpu_cube import NodeRollup
+from models import FreeGpuBucket, GpuFragmentation, parse_k8s_quantity
+from records import NodeRecord
+
+# ---------------------------------------------------------------------------
+# Configuration from environment
+# ---------------------------------------------------------------------------
+STRANDED_CPU_MILLICORES = int(os.getenv("STRANDED_CPU_MILLICORES", "1000"))
+STRANDED_MEMORY_BYTES = parse_k8s_quantity(os.getenv("STRANDED_MEMORY_BYTES", "4Gi"))
+
+
+class _TypeStats:
+    __slots__ = (
+        "nodes", "free", "free_hist", "placeable_hist", "by_cpu", "by_memory", "stranded",
+    )
+
+    def __init__(self):
+        self.nodes = 0
+        self.free = 0
+        self.free_hist: Counter = Counter()        # free GPUs -> nodes
+        self.placeable_hist: Counter = Counter()   # placeable GPUs -> nodes
+        self.by_cpu = 0
+        self.by_memory = 0
+        self.stranded = 0
+
+
+class Fragmentation(NodeRollup):
+    def __init__(self, nodes: List[NodeRecord]):
+        self._types: Dict[str, _TypeStats] = {}
+        super().__init__(nodes)
+
+    def _contribution(self, node: NodeRecord) -> Optional[tuple]:
+        if node.gpu_allocatable <= 0 or not node.conditions_ready:
+            return None
+        free = max(0, node.gpu_allocatable - node.gpu_used)
+        cpu_out = (
+            node.cpu_allocatable_millicores - node.cpu_used_millicores
+            < STRANDED_CPU_MILLICORES
+        )
+        memory_out = (
+            node.memory_allocatable_bytes - node.memory_used_bytes
+            < STRANDED_MEMORY_BYTES
+        )
+        return node.gpu_type, free, cpu_out, memory_out
+
+    def _apply(self, contribution: tuple, sign: int) -> None:
+        gpu_type, free, cpu_out, memory_out = contribution
+        stats = self._types.get(gpu_type)
+        if stats is None:
+            stats = self._types[gpu_type] = _TypeStats()
+        stats.nodes += sign
+        stats.free += sign * free
+        placeable = 0 if cpu_out or memory_out else free
+        stats.by_cpu += sign * free * cpu_out
+        stats.by_memory += sign * free * memory_out
+        stats.stranded += sign * (free - placeable)
+        for hist, bucket in ((stats.free_hist, free), (stats.placeable_hist, placeable)):
+            hist[bucket] += sign
+            if hist[bucket] == 0:
+                del hist[bucket]
+        if stats.nodes == 0:
+            del self._types[gpu_type]
+
+    def report(self) -> List[GpuFragmentation]:
+        with self._lock:
+            return [
+                GpuFragmentation(
+                    gpu_type=gpu_type,
+                    node_count=stats.nodes,
+                    free_gpus=stats.free,
+                    free_histogram=[
+                        FreeGpuBucket(free_gpus=free, node_count=count)
+                        for free, count in sorted(stats.free_hist.items())
+                    ],
+                    largest_placeable_request=max(stats.placeable_hist, default=0),
+                    stranded_gpus=stats.stranded,
+                    stranded_by_cpu=stats.by_cpu,
+                    stranded_by_memory=stats.by_memory,
+                )
+                for gpu_type, stats in sorted(self._types.items())
+            ]
@@ -0,0 +1,166 @@
+"""GPU capacity rollups by GPU type, zone, node pool and ready state.
+
+A GpuCube keeps GPU counters for every combination of the four
+dimensions, including every roll-up where any dimension is ``*`` (all
+values), so a drill-down such as "A100s in us-east-1a across all pools" is
+a single dict lookup.  Each GPU node adds its counters to 2^4 cells.
+
+The cube is updated incrementally (NodeRollup): on a new snapshot only
+nodes whose contribution changed, appeared or disappeared are subtracted
+and re-added.
+"""
+
+import itertools
+import os
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from models import GpuCapacity, GpuCapacityCell
+from records import NodeRecord
+
+# ---------------------------------------------------------------------------
+# Configuration from environment
+# ---------------------------------------------------------------------------
+ZONE_LABEL = "topology.kubernetes.io/zone"
+# First label found names the node's pool
+NODE_POOL_LABELS = [
+    label.strip()
+    for label in os.getenv(
+        "NODE_POOL_LABELS",
+        "cloud.google.com/gke-nodepool,eks.amazonaws.com/nodegroup,"
+        "karpenter.sh/nodepool,kubernetes.azure.com/agentpool",
+    ).split(",")
+    if label.strip()
+]
+
+ALL = "*"
+DIMENSIONS = ("gpu_type", "zone", "pool", "ready")
+
+# (gpu_type, zone, pool, ready) with ALL for rolled-up dimensions
+CellKey = Tuple[str, str, str, str]
+# nodes, gpu_total, gpu_allocatable, gpu_used
+Counts = Tuple[int, int, int, int]
+
+
+def _node_pool(labels: Dict[str, str]) -> str:
+    for label in NODE_POOL_LABELS:
+        if label in labels:
+            return labels[label]
+    return "N/A"
+
+
+def _rollups(key: CellKey):
+    """The cell itself and every roll-up of it (2^4 keys)."""
+    for mask in itertools.product((False, True), repeat=len(key)):
+        yield tuple(ALL if rolled else value for value, rolled in zip(key, mask))
+
+
+class NodeRollup:
+    """Aggregate kept up to date from successive node snapshots.
+
+    Subclasses map a node to a hashable contribution (or None) and apply
+    it with a sign; update() re-applies only nodes whose contribution
+    changed since the previous snapshot.  Subclasses must set up their
+    state before calling ``super().__init__(nodes)``.
+    """
+
+    def __init__(self, nodes: List[NodeRecord]):
+        # node name -> its contribution, to subtract on the next update
+        self._nodes: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self.update(nodes)
+
+    def _contribution(self, node: NodeRecord) -> Optional[tuple]:
+        raise NotImplementedError
+
+    def _apply(self, contribution: tuple, sign: int) -> None:
+        raise NotImplementedError
+
+    def update(self, nodes: List[NodeRecord]) -> "NodeRollup":
+        """Bring the rollup up to date with a new snapshot."""
+        current = {}
+        for node in nodes:
+            contribution = self._contribution(node)
+            if contribution is not None:
+                current[node.name] = contribution
+        with self._lock:
+            for name, old in list(self._nodes.items()):
+                if current.get(name) != old:
+                    self._apply(old, -1)
+                    del self._nodes[name]
+            for name, new in current.items():
+                if name not in self._nodes:
+                    self._apply(new, 1)
+                    self._nodes[name] = new
+        return self
+
+
+class GpuCube(NodeRollup):
+    def __init__(self, nodes: List[NodeRecord]):
+        self._cells: Dict[CellKey, List[int]] = {}
+        # dimension -> value -> GPU nodes with that value
+        self._values: List[Counter] = [Counter() for _ in DIMENSIONS]
+        super().__init__(nodes)
+
+    def _contribution(self, node: NodeRecord) -> Optional[Tuple[CellKey, Counts]]:
+        if node.gpu_total <= 0:
+            return None
+        key = (
+            node.gpu_type,
+            node.labels.get(ZONE_LABEL, "N/A"),
+            _node_pool(node.labels),
+            "true" if node.conditions_ready else "false",
+        )
+        return key, (1, node.gpu_total, node.gpu_allocatable, node.gpu_used)
+
+    def _apply(self, contribution: Tuple[CellKey, Counts], sign: int) -> None:
+        key, counts = contribution
+        for cell_key in _rollups(key):
+            cell = self._cells.get(cell_key)
+            if cell is None:
+                cell = self._cells[cell_key] = [0, 0, 0, 0]
+            for i, n in enumerate(counts):
+                cell[i] += sign * n
+            if cell[0] == 0:
+                del self._cells[cell_key]
+        for values, value in zip(self._values, key):
+            values[value] += sign
+            if values[value] == 0:
+                del values[value]
+
+    def cell(self, key: CellKey) -> GpuCapacityCell:
+        with self._lock:
+            counts = tuple(self._cells.get(key, (0, 0, 0, 0)))
+        return _cell(key, counts)
+
+    def query(
+        self, filters: Dict[str, str], group_by: Optional[str] = None
+    ) -> GpuCapacity:
+        """Totals for *filters* (dimension -> value; missing means all),
+        optionally broken down by one more dimension."""
+        key = tuple(filters.get(d, ALL) for d in DIMENSIONS)
+        groups = []
+        if group_by is not None:
+            axis = DIMENSIONS.index(group_by)
+            with self._lock:
+                values = sorted(self._values[axis])
+            for value in values:
+                group_key = key[:axis] + (value,) + key[axis + 1:]
+                cell = self.cell(group_key)
+                if cell.node_count:
+                    groups.append(cell)
+        return GpuCapacity(group_by=group_by, total=self.cell(key), groups=groups)
+
+
+def _cell(key: CellKey, counts: Counts) -> GpuCapacityCell:
+    nodes, total, allocatable, used = counts
+    return GpuCapacityCell(
+        **dict(zip(DIMENSIONS, key)),
+        node_count=nodes,
+        gpu_total=total,
+        gpu_allocatable=allocatable,
+        gpu_used=used,
+        gpu_available=allocatable - used,
+        utilization_percent=round(used / allocatable * 100, 1) if allocatable else 0.0,
+    )
@@ -0,0 +1,116 @@
+"""Pods holding GPUs they do not use.
+
+Each nodes snapshot collected with METRICS_ENABLED=1 carries the measured
+GPU utilization of every pod (metrics.py).  An IdleGpuTracker keeps, per
+GPU pod, a ring buffer of the last ``IDLE_GPU_MAX_SAMPLES`` samples within
+``IDLE_GPU_WINDOW`` seconds plus the time its current idle stretch began
+(first consecutive sample below ``IDLE_GPU_THRESHOLD`` percent).  A pod is
+idle once that stretch covers the whole window; its waste is
+``gpu_request`` times the length of the stretch.
+
+Each observation touches only the pods of the new snapshot and evicts
+expired samples from the front of their buffers, so no history is ever
+rescanned.  Pods that leave the snapshot are forgotten.
+"""
+
+import os
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from models import IdleGpuPod, IdleGpuReport
+from records import NodeRecord
+
+# ---------------------------------------------------------------------------
+# Configuration from environment
+# ---------------------------------------------------------------------------
+IDLE_GPU_WINDOW = int(os.getenv("IDLE_GPU_WINDOW", "3600"))             # seconds
+IDLE_GPU_THRESHOLD = float(os.getenv("IDLE_GPU_THRESHOLD", "5"))        # percent
+IDLE_GPU_MAX_SAMPLES = int(os.getenv("IDLE_GPU_MAX_SAMPLES", "256"))    # per pod
+
+
+class _PodHistory:
+    __slots__ = ("samples", "total", "idle_since", "pod", "node", "gpu_type")
+
+    def __init__(self):
+        # (time, utilization) within the window, oldest first
+        self.samples: deque = deque()
+        self.total = 0.0
+        self.idle_since: Optional[float] = None
+        self.pod = None
+        self.node = ""
+        self.gpu_type = "N/A"
+
+    def add(self, at: float, utilization: float) -> None:
+        self.samples.append((at, utilization))
+        self.total += utilization
+        if utilization >= IDLE_GPU_THRESHOLD:
+            self.idle_since = None
+        elif self.idle_since is None:
+            self.idle_since = at
+        horizon = at - IDLE_GPU_WINDOW
+        samples = self.samples
+        while samples and (samples[0][0] < horizon or len(samples) > IDLE_GPU_MAX_SAMPLES):
+            self.total -= samples.popleft()[1]
+
+
+class IdleGpuTracker:
+    def __init__(self):
+        # (namespace, name) -> history
+        self._pods: Dict[Tuple[str, str], _PodHistory] = {}
+        self._lock = threading.Lock()
+        self.observed_at: Optional[float] = None
+
+    def observe(self, nodes: List[NodeRecord], at: float) -> None:
+        """Record the GPU utilization of every GPU pod in *nodes*, measured
+        at *at* (epoch seconds)."""
+        seen = set()
+        with self._lock:
+            for node in nodes:
+                for pod in node.pods:
+                    if pod.gpu_request <= 0:
+                        continue
+                    key = (pod.namespace, pod.name)
+                    seen.add(key)
+                    history = self._pods.get(key)
+                    if history is None:
+                        history = self._pods[key] = _PodHistory()
+                    history.pod, history.node, history.gpu_type = pod, node.name, node.gpu_type
+                    if pod.gpu_utilization_percent is not None:
+                        history.add(at, pod.gpu_utilization_percent)
+            for key in self._pods.keys() - seen:
+                del self._pods[key]
+            self.observed_at = at
+
+    def report(self) -> IdleGpuReport:
+        now = self.observed_at
+        idle = []
+        with self._lock:
+            tracked = sum(1 for h in self._pods.values() if h.samples)
+            for h in self._pods.values():
+                if h.idle_since is None or now - h.idle_since < IDLE_GPU_WINDOW:
+                    continue
+                pod = h.pod
+                idle_seconds = now - h.idle_since
+                idle.append(IdleGpuPod(
+                    name=pod.name,
+                    namespace=pod.namespace,
+                    node=h.node,
+                    owner_kind=pod.owner_kind,
+                    owner_name=pod.owner_name,
+                    gpu_type=h.gpu_type,
+                    gpu_request=pod.gpu_request,
+                    idle_seconds=round(idle_seconds, 1),
+                    wasted_gpu_hours=round(pod.gpu_request * idle_seconds / 3600, 2),
+                    mean_utilization_percent=round(h.total / len(h.samples), 1),
+                    samples=len(h.samples),
+                ))
+        idle.sort(key=lambda p: (-p.wasted_gpu_hours, p.namespace, p.name))
+        return IdleGpuReport(
+            window_seconds=IDLE_GPU_WINDOW,
+            threshold_percent=IDLE_GPU_THRESHOLD,
+            tracked_pods=tracked,
+            idle_gpus=sum(p.gpu_request for p in idle),
+            wasted_gpu_hours=round(sum(p.wasted_gpu_hours for p in idle), 2),
+            pods=idle,
+        )
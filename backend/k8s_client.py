@@ -1,12 +1,37 @@
+import functools
 import os
+import socket
 import time
 import logging
-from typing import List, Dict, Optional, Tuple
-from kubernetes import client, config
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Dict, Optional, Tuple
+from pydantic import TypeAdapter
+import snapshot_store
+from records import (
+    ContainerRecord,
+    LabelPool,
+    NodeRecord,
+    PodRecord,
+    dump_nodes,
+    intern,
+    load_nodes,
+)
+from cache_backend import CacheBackend, CacheEntry, get_cache_backend
+from circuit_breaker import BREAKER_BASE_BACKOFF, OPEN, CircuitBreaker, ClusterUnreachableError
+from idle_gpu import IdleGpuTracker
+from metrics import METRICS_ENABLED, METRICS_SCRAPE_CONCURRENCY, MetricsCollector, join_usage
+from owner_graph import (
+    OWNER_GRAPH_ENABLED,
+    OWNER_SYNC_WAIT,
+    OwnerGraph,
+    controller_ref,
+    watch_connections,
+)
+from pending import ANY_GPU_TYPE, PendingPodRecord, PendingQueueTracker
+from usage_index import Requests, UsageIndex
 from models import (
-    ContainerStatus,
-    PodDetail,
-    NodeDetail,
     ClusterSummary,
     ResourceStat,
     GpuTypeStat,
@@ -15,10 +40,22 @@ from models import (
     bytes_to_human_readable,
     millicores_to_cores,
     ClusterInfo,
+    ConnectionStats,
+    ContextReadiness,
+    IdleGpuReport,
+    NamespaceStatus,
+    NamespaceUsage,
+    PendingQueue,
+    ScopeStatus,
+    WorkloadUsage,
 )
 
 logger = logging.getLogger(__name__)
 
+# The kubernetes package (and its generated models) is imported on first use
+# rather than at module import, so the web server can answer /healthz before
+# the client is loaded.
+
 GPU_RESOURCE = "nvidia.com/gpu"
 
 GPU_TYPE_LABELS = [
@@ -33,37 +70,471 @@ GPU_TYPE_LABELS = [
 # Configuration from environment
 # ---------------------------------------------------------------------------
 CACHE_TTL = int(os.getenv("CACHE_TTL", "30"))            # TTL for cached responses (seconds)
+CACHE_WAIT = float(os.getenv("CACHE_WAIT", "30"))        # max wait for another replica's refresh
+CLIENT_CACHE_MAX = int(os.getenv("CLIENT_CACHE_MAX", "16"))        # contexts kept at once
+CLIENT_IDLE_TTL = int(os.getenv("CLIENT_IDLE_TTL", "900"))         # evict after idle (seconds)
+CACHE_MEMORY_BUDGET_MB = int(os.getenv("CACHE_MEMORY_BUDGET_MB", "256"))  # across contexts
+
+READY_REQUIRE_WARM = os.getenv("READY_REQUIRE_WARM", "")          # "all" or comma-separated contexts
+K8S_CONNECT_TIMEOUT = float(os.getenv("K8S_CONNECT_TIMEOUT", "5"))
+# Longest silence while reading a response, not a cap on its total duration
+K8S_READ_TIMEOUT = float(os.getenv("K8S_READ_TIMEOUT", "600"))
+# Connections kept per context for lists and scrapes; each long-lived watch
+# (owner graph, usage index) gets one more on top
+K8S_POOL_MAXSIZE = int(os.getenv("K8S_POOL_MAXSIZE", "8"))
+# urllib3 retries per API call; the circuit breaker paces retries across calls
+K8S_RETRIES = int(os.getenv("K8S_RETRIES", "0"))
+K8S_KEEPALIVE_IDLE = int(os.getenv("K8S_KEEPALIVE_IDLE", "30"))    # 0 disables TCP keep-alive
+SUMMARY_SOURCE = os.getenv("SUMMARY_SOURCE", "snapshot")          # "snapshot" or "index"
+# Namespace-scoped mode: list pods only in these namespaces (comma-separated)
+K8S_NAMESPACES = [ns.strip() for ns in os.getenv("K8S_NAMESPACES", "").split(",") if ns.strip()]
+NAMESPACE_LIST_CONCURRENCY = int(os.getenv("NAMESPACE_LIST_CONCURRENCY", "8"))
+
+# Rough resident size of one record (records.py), used for the memory budget
+_APPROX_NODE_BYTES = 2048
+_APPROX_POD_BYTES = 768
+
+# (dump, load) codecs for snapshots stored in a shared (bytes-only) cache
+# backend or the on-disk snapshot store
+_summary_adapter = TypeAdapter(ClusterSummary)
+_idle_adapter = TypeAdapter(IdleGpuReport)
+_pending_adapter = TypeAdapter(PendingQueue)
+_scope_adapter = TypeAdapter(ScopeStatus)
+_SNAPSHOT_CODECS: Dict[str, Tuple[Callable, Callable]] = {
+    "nodes_with_pods": (dump_nodes, load_nodes),
+    "cluster_summary": (_summary_adapter.dump_json, _summary_adapter.validate_json),
+    "idle_gpus": (_idle_adapter.dump_json, _idle_adapter.validate_json),
+    "scope": (_scope_adapter.dump_json, _scope_adapter.validate_json),
+    "pending": (_pending_adapter.dump_json, _pending_adapter.validate_json),
+}
+
+
+def _is_connection_error(exc: Exception) -> bool:
+    """True for failures to reach the API server, as opposed to errors it
+    returned."""
+    from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError, TimeoutError
+
+    return isinstance(
+        exc, (MaxRetryError, NewConnectionError, ProtocolError, TimeoutError, ConnectionError)
+    )
+
+
+def _socket_options() -> Optional[list]:
+    """urllib3 socket options with TCP keep-alive, so pooled connections to
+    the API server survive idle gaps between refreshes."""
+    if K8S_KEEPALIVE_IDLE <= 0:
+        return None
+    from urllib3.connection import HTTPConnection
+
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    for name, value in (
+        ("TCP_KEEPIDLE", K8S_KEEPALIVE_IDLE),
+        ("TCP_KEEPINTVL", max(1, K8S_KEEPALIVE_IDLE // 3)),
+        ("TCP_KEEPCNT", 3),
+    ):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
+
+
+def _snapshot_key(context: Optional[str], key: str) -> str:
+    return f"{context or '__default__'}:{key}"
+
+
+def _pod_resources(pod) -> Tuple[int, int, int, int, int, int]:
+    """Summed container (gpu request, gpu limit, cpu request, cpu limit,
+    memory request, memory limit) of *pod*; CPU in millicores, memory in
+    bytes."""
+    gpu_request = 0
+    gpu_limit = 0
+    cpu_request_millicores = 0
+    cpu_limit_millicores = 0
+    memory_request_bytes = 0
+    memory_limit_bytes = 0
+
+    for c in pod.spec.containers:
+        res = c.resources
+        req = (res.requests if res else None) or {}
+        lim = (res.limits if res else None) or {}
+
+        # GPU
+        gpu_request += int(req.get(GPU_RESOURCE, 0))
+        gpu_limit += int(lim.get(GPU_RESOURCE, 0))
+
+        # CPU (in millicores)
+        cpu_req_str = req.get("cpu", "0")
+        cpu_lim_str = lim.get("cpu", "0")
+        cpu_request_millicores += parse_cpu_quantity(cpu_req_str)
+        cpu_limit_millicores += parse_cpu_quantity(cpu_lim_str)
+
+        # Memory (in bytes)
+        mem_req_str = req.get("memory", "0")
+        mem_lim_str = lim.get("memory", "0")
+        memory_request_bytes += parse_k8s_quantity(mem_req_str)
+        memory_limit_bytes += parse_k8s_quantity(mem_lim_str)
+
+    return (
+        gpu_request,
+        gpu_limit,
+        cpu_request_millicores,
+        cpu_limit_millicores,
+        memory_request_bytes,
+        memory_limit_bytes,
+    )
+
+
+def _pod_requests(pod) -> Requests:
+    gpu, _, cpu, _, memory, _ = _pod_resources(pod)
+    return gpu, cpu, memory
+
+
+def _pod_gpu_type(pod) -> str:
+    """GPU type a GPU pod requires through nodeSelector or required node
+    affinity on a GPU type label, else "any"."""
+    selector = pod.spec.node_selector or {}
+    for key in GPU_TYPE_LABELS:
+        if key in selector:
+            return selector[key]
+    affinity = pod.spec.affinity
+    required = (
+        affinity.node_affinity.required_during_scheduling_ignored_during_execution
+        if affinity and affinity.node_affinity
+        else None
+    )
+    for term in (required.node_selector_terms if required else None) or []:
+        for expr in term.match_expressions or []:
+            if expr.key in GPU_TYPE_LABELS and expr.operator == "In" and expr.values:
+                return expr.values[0]
+    return ANY_GPU_TYPE
+
+
+def _condition(pod, condition_type: str):
+    for condition in pod.status.conditions or []:
+        if condition.type == condition_type:
+            return condition
+    return None
+
+
+def _pending_pod_record(pod, record: PodRecord, now: float) -> PendingPodRecord:
+    """Queue entry of an unscheduled pod, with the scheduler's latest
+    reason for not placing it."""
+    created = pod.metadata.creation_timestamp
+    condition = _condition(pod, "PodScheduled")
+    return PendingPodRecord(
+        pod=record,
+        gpu_type=intern(_pod_gpu_type(pod)) if record.gpu_request > 0 else "",
+        created=created.timestamp() if created else now,
+        reason=intern(condition.reason) if condition else None,
+        message=condition.message if condition else None,
+    )
+
+
+def _scheduled_wait(pod, now: float) -> float:
+    """Seconds *pod* spent before being bound to a node."""
+    created = pod.metadata.creation_timestamp
+    if created is None:
+        return 0.0
+    condition = _condition(pod, "PodScheduled")
+    if condition is not None and condition.status == "True" and condition.last_transition_time:
+        return max(0.0, (condition.last_transition_time - created).total_seconds())
+    return max(0.0, now - created.timestamp())
+
+
+def _bare_node_record(name: str, node_pods: List[PodRecord]) -> NodeRecord:
+    """Record for a node known only from its pods (nodes not readable).
+    Its readiness is unknown, so it is not counted as ready."""
+    return NodeRecord(
+        name=intern(name),
+        conditions_ready=False,
+        gpu_used=sum(p.gpu_request for p in node_pods),
+        cpu_used_millicores=sum(p.cpu_request_millicores for p in node_pods),
+        memory_used_bytes=sum(p.memory_request_bytes for p in node_pods),
+        pods=node_pods,
+    )
+
+
+# Last failed fetch per context: context -> (message, wall-clock time)
+_fetch_errors: Dict[str, Tuple[str, float]] = {}
 
 
 class K8sClient:
-    def __init__(self, context: Optional[str] = None):
+    def __init__(
+        self,
+        context: Optional[str] = None,
+        namespaces: Optional[List[str]] = None,
+        backend: Optional[CacheBackend] = None,
+        watches: bool = True,
+    ):
+        """*watches* False is for one-shot clients (the report CLI): no
+        owner graph or usage index is started, so pods keep their direct
+        owner and the summary is built from the snapshot."""
+        from kubernetes import client, config
+
         self._in_cluster = False
-        self._cache: Dict[str, tuple] = {}
+        self._context = context
+        # Set once evicted; a refresh still running then discards its result
+        self.closed = False
+        # Namespace-scoped mode when non-empty (default: K8S_NAMESPACES)
+        self.namespaces = K8S_NAMESPACES if namespaces is None else namespaces
+        # Outcome of the last pod listing done by this replica
+        self._scope: Optional[ScopeStatus] = None
+        # Default: the process-wide backend shared with other clients/replicas
+        self._backend = backend or get_cache_backend()
+        # Decoded copies of serialized snapshots: key -> (version, value)
+        self._decoded: Dict[str, tuple] = {}
+        # Serialized responses: key -> (version, fetched_at, JSON bytes)
+        self._json: Dict[str, tuple] = {}
+        # Indexes built over the nodes snapshot: name -> (version, fetched_at, value)
+        self._derived: Dict[str, tuple] = {}
+        # Keys already looked up in the on-disk snapshot store; a key is
+        # added only once its snapshot (if any) is in the backend
+        self._disk_checked: set = set()
+        self._disk_locks = {key: threading.Lock() for key in _SNAPSHOT_CODECS}
+        self._records_bytes = 0
+        # Snapshot TTL on the request path; the refresh scheduler raises it
+        # to track the context's adaptive refresh interval.
+        self.ttl = CACHE_TTL
+        self.breaker = CircuitBreaker(context or "__default__")
+        # The usage index watches pods in all namespaces, so namespace-scoped
+        # clients derive the summary from the snapshot
+        self._index_summary = watches and SUMMARY_SOURCE == "index" and not self.namespaces
+        # Started on first use with SUMMARY_SOURCE=index
+        self._usage: Optional[UsageIndex] = None
+        self._usage_lock = threading.Lock()
+        # Created on first refresh with METRICS_ENABLED=1
+        self._metrics: Optional[MetricsCollector] = None
+        # Started on first refresh with OWNER_GRAPH_ENABLED=1
+        self._owners: Optional[OwnerGraph] = None
+        self._owners_created = False
+        # Snapshots are built from request threads, the refresh scheduler,
+        # warm-up and preloads alike: one of them creates the graph
+        self._owners_lock = threading.Lock()
+        self._watch_owners = watches
+        # GPU utilization history of the snapshots this replica fetched
+        self.idle_gpus = IdleGpuTracker()
+        # Unscheduled pods of the snapshots this replica fetched
+        self.pending = PendingQueueTracker()
+        # Each context gets its own connection pool, reused across refreshes
+        configuration = client.Configuration()
         try:
-            config.load_incluster_config()
+            config.load_incluster_config(client_configuration=configuration)
             self._in_cluster = True
-            self.core = client.CoreV1Api()
         except config.ConfigException:
-            if context:
-                api_client = config.new_client_from_config(context=context)
-                self.core = client.CoreV1Api(api_client=api_client)
-            else:
-                config.load_kube_config()
-                self.core = client.CoreV1Api()
+            config.load_kube_config(context=context, client_configuration=configuration)
+        # Watches hold their connection for minutes; without room for them
+        # the lists and scrapes would open a new connection every call
+        self.pool_maxsize = (
+            K8S_POOL_MAXSIZE
+            + (watch_connections(self.namespaces or None) if watches else 0)
+            + (1 if self._index_summary else 0)
+        )
+        configuration.connection_pool_maxsize = self.pool_maxsize
+        configuration.socket_options = _socket_options()
+        # urllib3 defaults to 3 retries, which makes an unreachable server
+        # take 4 connect timeouts to fail
+        configuration.retries = K8S_RETRIES
+        self.core = client.CoreV1Api(api_client=client.ApiClient(configuration))
 
     # ------------------------------------------------------------------
-    # TTL cache
+    # TTL cache (backed by the shared snapshot cache backend)
     # ------------------------------------------------------------------
+    def _cache_key(self, key: str) -> str:
+        return _snapshot_key(self._context, key)
+
+    def _load(self, key: str) -> Optional[CacheEntry]:
+        entry = self._backend.get(self._cache_key(key))
+        if entry is None and key not in self._disk_checked:
+            entry = self._load_persisted(key)
+        if entry is None or not self._backend.serialized:
+            return entry
+        self._remember_json(key, entry, entry.value)
+        memo = self._decoded.get(key)
+        if memo is None or memo[0] != entry.version:
+            value = _SNAPSHOT_CODECS[key][1](entry.value)
+            self._note_size(key, value)
+            memo = (entry.version, value)
+            self._decoded[key] = memo
+        return entry._replace(value=memo[1])
+
+    def _load_persisted(self, key: str) -> Optional[CacheEntry]:
+        """Seed the cache from the on-disk snapshot store, once per key.
+
+        Concurrent first requests wait for the one loading the key instead
+        of falling through to a fetch.
+        """
+        cache_key = self._cache_key(key)
+        with self._disk_locks[key]:
+            if key in self._disk_checked:
+                return self._backend.get(cache_key)
+            try:
+                stored = snapshot_store.load(cache_key)
+                if stored is None:
+                    return None
+                payload, fetched_at = stored
+                logger.info(
+                    "Loaded persisted %s (%.0fs old)", cache_key, time.time() - fetched_at
+                )
+                if self._backend.serialized:
+                    return self._backend.put(cache_key, payload, fetched_at=fetched_at)
+                value = _SNAPSHOT_CODECS[key][1](payload)
+                self._note_size(key, value)
+                return self._backend.put(cache_key, value, fetched_at=fetched_at)
+            finally:
+                self._disk_checked.add(key)
+
+    def _note_size(self, key: str, value) -> None:
+        if key == "nodes_with_pods":
+            self._records_bytes = sum(
+                _APPROX_NODE_BYTES + _APPROX_POD_BYTES * len(n.pods) for n in value
+            )
+
+    @property
+    def approx_bytes(self) -> int:
+        return self._records_bytes + sum(len(m[2]) for m in list(self._json.values()))
+
+    def _remember_json(self, key: str, entry: CacheEntry, payload: bytes) -> None:
+        memo = self._json.get(key)
+        if memo is None or memo[:2] != (entry.version, entry.fetched_at):
+            self._json[key] = (entry.version, entry.fetched_at, payload)
+
+    def _store(self, key: str, value, fetched_at: Optional[float] = None) -> CacheEntry:
+        if self.closed:
+            # Evicted mid-fetch: don't bring back the snapshots close() dropped
+            return CacheEntry(value, fetched_at if fetched_at is not None else time.time(), 0)
+        self._note_size(key, value)
+        cache_key = self._cache_key(key)
+        payload = None
+        if self._backend.serialized or snapshot_store.enabled():
+            payload = _SNAPSHOT_CODECS[key][0](value)
+        if self._backend.serialized:
+            entry = self._backend.put(cache_key, payload, fetched_at=fetched_at)
+            self._decoded[key] = (entry.version, value)
+        else:
+            entry = self._backend.put(cache_key, value, fetched_at=fetched_at)
+        if snapshot_store.enabled():
+            snapshot_store.save(
+                cache_key, payload, entry.fetched_at, keep_history=key == "nodes_with_pods"
+            )
+        if payload is not None:
+            self._remember_json(key, entry, payload)
+        return entry._replace(value=value)
+
+    def _get_entry(
+        self, key: str, fn, ttl: int = CACHE_TTL, background: bool = True
+    ) -> CacheEntry:
+        """Return the cached entry if still fresh, otherwise call *fn* and cache.
+
+        Only the replica holding the refresh lease calls *fn*; the others
+        keep serving the previous snapshot, or wait for the leader's result
+        when they have none yet.  With *background*, the leader also serves
+        the stale snapshot and refreshes in a background thread; while the
+        context's circuit is open it serves the stale snapshot without
+        trying, and fails fast with CircuitOpenError when it has none.
+        """
+        entry = self._load(key)
+        if entry is not None and time.time() - entry.fetched_at < ttl:
+            return entry
+
+        lease_key = self._cache_key(key)
+        leader = self._backend.acquire_lease(lease_key)
+        if not leader:
+            if entry is not None:
+                return entry
+            deadline = time.monotonic() + CACHE_WAIT
+            while time.monotonic() < deadline:
+                time.sleep(0.5)
+                entry = self._load(key)
+                if entry is not None:
+                    return entry
+                self.breaker.raise_if_open()
+                # The leader released the lease without a snapshot (its fetch
+                # failed): fetch here rather than wait out CACHE_WAIT
+                leader = self._backend.acquire_lease(lease_key)
+                if leader:
+                    break
+            else:
+                logger.warning("Timed out waiting for %s refresh; fetching locally", lease_key)
+        elif entry is not None and background:
+            if self.breaker.state == OPEN:
+                self._backend.release_lease(lease_key)
+                return entry
+            threading.Thread(
+                target=self._refresh_locked, args=(key, fn, lease_key), daemon=True
+            ).start()
+            return entry
+
+        if not leader:
+            return self._fetch_and_store(key, fn)
+        try:
+            with self._backend.keep_lease(lease_key):
+                return self._fetch_and_store(key, fn)
+        finally:
+            self._backend.release_lease(lease_key)
+
+    def _fetch_and_store(self, key: str, fn) -> CacheEntry:
+        context = self._context or "__default__"
+        self.breaker.before_call()
+        try:
+            value = fn()
+        except Exception as exc:
+            _fetch_errors[context] = (f"{type(exc).__name__}: {exc}"[:500], time.time())
+            if _is_connection_error(exc):
+                self.breaker.record_failure()
+                retry_after = self.breaker.retry_after() or BREAKER_BASE_BACKOFF
+                raise ClusterUnreachableError(context, retry_after) from exc
+            # The API server answered (RBAC, server or parse error): it is
+            # reachable, so this closes the circuit rather than opening it
+            self.breaker.record_success()
+            raise
+        self.breaker.record_success()
+        _fetch_errors.pop(context, None)
+        return self._store(key, value)
+
+    def _refresh_locked(self, key: str, fn, lease_key: str) -> None:
+        try:
+            with self._backend.keep_lease(lease_key):
+                self._fetch_and_store(key, fn)
+        except Exception:
+            logger.exception("Background refresh of %s failed", lease_key)
+        finally:
+            self._backend.release_lease(lease_key)
+
     def _get_cached(self, key: str, fn, ttl: int = CACHE_TTL):
-        """Return cached value if still fresh, otherwise call *fn* and cache."""
-        now = time.monotonic()
-        if key in self._cache:
-            value, ts = self._cache[key]
-            if now - ts < ttl:
-                return value
-        result = fn()
-        self._cache[key] = (result, now)
-        return result
+        return self._get_entry(key, fn, ttl).value
+
+    def connection_stats(self) -> ConnectionStats:
+        """Connections opened vs. requests served by this context's pool."""
+        pool_manager = self.core.api_client.rest_client.pool_manager
+        opened = requests = 0
+        for pool_key in pool_manager.pools.keys():
+            pool = pool_manager.pools.get(pool_key)
+            if pool is not None:
+                opened += pool.num_connections
+                requests += pool.num_requests
+        return ConnectionStats(
+            context=self._context or "__default__",
+            pool_maxsize=self.pool_maxsize,
+            connections_opened=opened,
+            requests=requests,
+            connections_reused=max(0, requests - opened),
+        )
+
+    def close(self) -> None:
+        """Drop this context's local snapshots and its connection pool."""
+        self.closed = True
+        for key in _SNAPSHOT_CODECS:
+            self._backend.drop_local(self._cache_key(key))
+        self._decoded.clear()
+        self._json.clear()
+        self._derived.clear()
+        self._records_bytes = 0
+        if self._usage is not None:
+            self._usage.stop()
+        with self._owners_lock:
+            if self._owners is not None:
+                self._owners.stop()
+        self.core.api_client.close()
 
     # ------------------------------------------------------------------
     # Internal helpers
@@ -74,7 +545,7 @@ class K8sClient:
                 return labels[key]
         return "N/A"
 
-    def _build_container_status(self, cs) -> ContainerStatus:
+    def _build_container_record(self, cs, pool: LabelPool) -> ContainerRecord:
         state = cs.state or {}
         if state.running:
             state_name = "running"
@@ -97,61 +568,50 @@ class K8sClient:
             reason = None
             started = None
 
-        return ContainerStatus(
-            name=cs.name,
+        return ContainerRecord(
+            name=pool.share(cs.name),
             state=state_name,
             ready=cs.ready or False,
             restart_count=cs.restart_count or 0,
-            image=cs.image or "",
-            reason=reason,
+            image=pool.share(cs.image or ""),
+            reason=pool.share(reason),
             started_at=started,
         )
 
-    def _build_pod_detail(self, pod) -> PodDetail:
-        gpu_request = 0
-        gpu_limit = 0
-        cpu_request_millicores = 0
-        cpu_limit_millicores = 0
-        memory_request_bytes = 0
-        memory_limit_bytes = 0
-
-        for c in pod.spec.containers:
-            res = c.resources or client.V1ResourceRequirements()
-            req = res.requests or {}
-            lim = res.limits or {}
-
-            # GPU
-            gpu_request += int(req.get(GPU_RESOURCE, 0))
-            gpu_limit += int(lim.get(GPU_RESOURCE, 0))
-
-            # CPU (in millicores)
-            cpu_req_str = req.get("cpu", "0")
-            cpu_lim_str = lim.get("cpu", "0")
-            cpu_request_millicores += parse_cpu_quantity(cpu_req_str)
-            cpu_limit_millicores += parse_cpu_quantity(cpu_lim_str)
-
-            # Memory (in bytes)
-            mem_req_str = req.get("memory", "0")
-            mem_lim_str = lim.get("memory", "0")
-            memory_request_bytes += parse_k8s_quantity(mem_req_str)
-            memory_limit_bytes += parse_k8s_quantity(mem_lim_str)
-
-        owners = pod.metadata.owner_references or []
-        owner_kind = owners[0].kind if owners else "None"
-        owner_name = owners[0].name if owners else pod.metadata.name
-
-        container_statuses = []
-        for cs in pod.status.container_statuses or []:
-            container_statuses.append(self._build_container_status(cs))
-
-        pod_labels = pod.metadata.labels or {}
-
-        return PodDetail(
+    def _build_pod_record(
+        self, pod, label_pool: LabelPool, resolve: Optional[Callable] = None
+    ) -> PodRecord:
+        (
+            gpu_request,
+            gpu_limit,
+            cpu_request_millicores,
+            cpu_limit_millicores,
+            memory_request_bytes,
+            memory_limit_bytes,
+        ) = _pod_resources(pod)
+
+        owner = controller_ref(pod.metadata.owner_references)
+        owner_kind = owner.kind if owner else "None"
+        owner_name = owner.name if owner else pod.metadata.name
+        workload_kind, workload_name = owner_kind, owner_name
+        if owner is not None and resolve is not None:
+            workload_kind, workload_name = resolve(
+                pod.metadata.namespace, owner_kind, owner_name
+            )
+
+        container_statuses = tuple(
+            self._build_container_record(cs, label_pool)
+            for cs in pod.status.container_statuses or []
+        )
+
+        return PodRecord(
             name=pod.metadata.name,
-            namespace=pod.metadata.namespace,
-            owner_kind=owner_kind,
-            owner_name=owner_name,
-            phase=pod.status.phase or "Unknown",
+            namespace=intern(pod.metadata.namespace),
+            owner_kind=intern(owner_kind),
+            owner_name=label_pool.share(owner_name),
+            workload_kind=intern(workload_kind),
+            workload_name=label_pool.share(workload_name),
+            phase=intern(pod.status.phase or "Unknown"),
             gpu_request=gpu_request,
             gpu_limit=gpu_limit,
             cpu_request_millicores=cpu_request_millicores,
@@ -163,209 +623,865 @@ class K8sClient:
             if pod.metadata.creation_timestamp
             else None,
             ip=pod.status.pod_ip,
-            qos_class=pod.status.qos_class,
-            labels=pod_labels,
+            qos_class=intern(pod.status.qos_class),
+            labels=label_pool.get(pod.metadata.labels),
         )
 
     # ------------------------------------------------------------------
     # Public API (cached)
     # ------------------------------------------------------------------
-    def get_nodes_with_pods(self) -> List[NodeDetail]:
-        return self._get_cached("nodes_with_pods", self._fetch_nodes_with_pods)
+    def get_nodes_entry(self) -> CacheEntry:
+        return self._get_entry("nodes_with_pods", self._fetch_nodes_with_pods, self.ttl)
+
+    def get_nodes_with_pods(self) -> List[NodeRecord]:
+        return self.get_nodes_entry().value
+
+    def get_summary_entry(self) -> CacheEntry:
+        if self._index_summary:
+            return self._get_entry("cluster_summary", self._build_index_summary, self.ttl)
+        # Derived from the nodes snapshot and stamped with its fetch time, so
+        # the summary is rebuilt exactly when a new snapshot lands.
+        nodes = self.get_nodes_entry()
+        summary = self._load("cluster_summary")
+        if summary is not None and summary.fetched_at == nodes.fetched_at:
+            return summary
+        return self._store(
+            "cluster_summary",
+            build_cluster_summary(nodes.value),
+            fetched_at=nodes.fetched_at,
+        )
 
     def get_cluster_summary(self) -> ClusterSummary:
-        return self._get_cached("cluster_summary", self._build_cluster_summary)
+        return self.get_summary_entry().value
+
+    def get_idle_gpu_entry(self) -> CacheEntry:
+        """Idle GPU report as of the current nodes snapshot.
+
+        Only the replica that fetched the snapshot has the utilization
+        history; the others serve the report it stored."""
+        nodes = self.get_nodes_entry()
+        report = self._load("idle_gpus")
+        if report is not None and (
+            report.fetched_at == nodes.fetched_at or self.idle_gpus.observed_at is None
+        ):
+            return report
+        return self._store(
+            "idle_gpus", self.idle_gpus.report(), fetched_at=nodes.fetched_at
+        )
+
+    def get_scope_entry(self) -> CacheEntry:
+        """Which namespaces the current nodes snapshot covers, and which of
+        them failed to list (stored by the replica that fetched it)."""
+        nodes = self.get_nodes_entry()
+        scope = self._load("scope")
+        if scope is not None and (scope.fetched_at == nodes.fetched_at or self._scope is None):
+            return scope
+        return self._store(
+            "scope",
+            self._scope or ScopeStatus(namespaces_scoped=bool(self.namespaces)),
+            fetched_at=nodes.fetched_at,
+        )
+
+    def get_pending_entry(self) -> CacheEntry:
+        """Pending-pod queue as of the current nodes snapshot (stored by the
+        replica that fetched it)."""
+        nodes = self.get_nodes_entry()
+        queue = self._load("pending")
+        if queue is not None and (
+            queue.fetched_at == nodes.fetched_at or self.pending.observed_at is None
+        ):
+            return queue
+        return self._store("pending", self.pending.report(), fetched_at=nodes.fetched_at)
+
+    def get_json_entry(self, key: str) -> CacheEntry:
+        """Snapshot *key* as response-ready JSON bytes, serialized at most
+        once per snapshot version."""
+        entry = {
+            "nodes_with_pods": self.get_nodes_entry,
+            "cluster_summary": self.get_summary_entry,
+            "idle_gpus": self.get_idle_gpu_entry,
+            "scope": self.get_scope_entry,
+            "pending": self.get_pending_entry,
+        }[key]()
+        memo = self._json.get(key)
+        if memo is None or memo[:2] != (entry.version, entry.fetched_at):
+            self._remember_json(key, entry, _SNAPSHOT_CODECS[key][0](entry.value))
+            memo = self._json[key]
+        return entry._replace(value=memo[2])
+
+    def get_derived(
+        self,
+        name: str,
+        build: Callable[[List[NodeRecord]], Any],
+        update: Optional[Callable[[Any, List[NodeRecord]], Any]] = None,
+    ) -> Tuple[CacheEntry, Any]:
+        """Return the nodes entry and *build* applied to its snapshot, built
+        at most once per snapshot version (indexes and rollups).  With
+        *update*, later versions are applied to the previous value instead
+        of rebuilding it."""
+        entry = self.get_nodes_entry()
+        memo = self._derived.get(name)
+        if memo is None or memo[:2] != (entry.version, entry.fetched_at):
+            if memo is not None and update is not None:
+                value = update(memo[2], entry.value)
+            else:
+                value = build(entry.value)
+            memo = (entry.version, entry.fetched_at, value)
+            self._derived[name] = memo
+        return entry, memo[2]
+
+    def cached_nodes(self) -> Optional[List[NodeRecord]]:
+        """The nodes snapshot if one is cached; never fetches."""
+        entry = self._load("nodes_with_pods")
+        return entry.value if entry is not None else None
+
+    def refresh(self) -> None:
+        """Fetch fresh snapshots now, regardless of TTL.
+
+        With SUMMARY_SOURCE=index the nodes snapshot is only refreshed once
+        something has asked for it.
+        """
+        if self._index_summary:
+            self._get_entry(
+                "cluster_summary", self._build_index_summary, ttl=0, background=False
+            )
+            if self.cached_nodes() is None:
+                return
+        self._get_entry(
+            "nodes_with_pods", self._fetch_nodes_with_pods, ttl=0, background=False
+        )
+        self.get_cluster_summary()
+        self.get_scope_entry()
+        self.get_pending_entry()
+        if METRICS_ENABLED:
+            self.get_idle_gpu_entry()
 
     # ------------------------------------------------------------------
-    # Fetchers (actual K8s API calls — no timeout so large clusters
-    # can return all data without being cut off)
+    # Fetchers (actual K8s API calls — a short connect timeout and a read
+    # timeout that only bounds silence between bytes, so large clusters can
+    # return all data without being cut off while unreachable ones fail fast)
     # ------------------------------------------------------------------
-    def _fetch_nodes_with_pods(self) -> List[NodeDetail]:
+    def _fetch_nodes_with_pods(self) -> List[NodeRecord]:
         logger.info("Fetching nodes and pods from K8s API")
-        all_nodes = self.core.list_node().items
-        all_pods = self.core.list_pod_for_all_namespaces().items
+        timeout = (K8S_CONNECT_TIMEOUT, K8S_READ_TIMEOUT)
+        # Started before the lists, so the first sync overlaps them
+        owner_graph = self._owner_graph()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            # Metrics are collected while the lists are in flight
+            metrics = None
+            if METRICS_ENABLED:
+                metrics = pool.submit(self._metrics_collector().collect)
+            all_nodes = self._list_nodes(timeout)
+            all_pods, statuses = self._list_pods(timeout)
+        self._scope = ScopeStatus(
+            namespaces_scoped=bool(self.namespaces),
+            namespaces=statuses,
+            nodes_listed=all_nodes is not None,
+        )
 
-        pods_by_node: Dict[str, List[PodDetail]] = {}
+        resolve = None
+        if owner_graph is not None:
+            # Kinds not synced (yet) resolve pods to their direct owner
+            owner_graph.wait_synced(OWNER_SYNC_WAIT)
+            resolve = owner_graph.resolve
+        label_pool = LabelPool()
+        pods_by_node: Dict[str, List[PodRecord]] = {}
+        now = time.time()
+        pending: List[PendingPodRecord] = []
+        # Waits of pods that left the previous queue for a node
+        scheduled_waits: List[float] = []
+        queued = len(self.pending) > 0
         for pod in all_pods:
-            node_name = pod.spec.node_name or "unscheduled"
-            detail = self._build_pod_detail(pod)
-            pods_by_node.setdefault(node_name, []).append(detail)
+            record = self._build_pod_record(pod, label_pool, resolve)
+            node_name = pod.spec.node_name
+            if not node_name:
+                if record.phase == "Pending":
+                    pending.append(_pending_pod_record(pod, record, now))
+                continue
+            if queued and f"{record.namespace}/{record.name}" in self.pending:
+                scheduled_waits.append(_scheduled_wait(pod, now))
+            pods_by_node.setdefault(node_name, []).append(record)
 
-        result = []
-        for node in all_nodes:
-            labels = node.metadata.labels or {}
-            cap = node.status.capacity or {}
-            alloc = node.status.allocatable or {}
-
-            # GPU
-            gpu_total = int(cap.get(GPU_RESOURCE, 0))
-            gpu_allocatable = int(alloc.get(GPU_RESOURCE, 0))
-
-            # CPU (in millicores)
-            cpu_total = parse_cpu_quantity(cap.get("cpu", "0"))
-            cpu_allocatable = parse_cpu_quantity(alloc.get("cpu", "0"))
-
-            # Memory (in bytes)
-            memory_total = parse_k8s_quantity(cap.get("memory", "0"))
-            memory_allocatable = parse_k8s_quantity(alloc.get("memory", "0"))
-
-            node_pods = pods_by_node.get(node.metadata.name, [])
-
-            # Calculate used resources based on pod requests
-            gpu_used = sum(p.gpu_request for p in node_pods)
-            cpu_used = sum(p.cpu_request_millicores for p in node_pods)
-            memory_used = sum(p.memory_request_bytes for p in node_pods)
-
-            conditions = node.status.conditions or []
-            is_ready = any(c.type == "Ready" and c.status == "True" for c in conditions)
-
-            node_info = node.status.node_info
-            result.append(
-                NodeDetail(
-                    name=node.metadata.name,
-                    gpu_type=self._extract_gpu_type(labels),
-                    gpu_total=gpu_total,
-                    gpu_allocatable=gpu_allocatable,
-                    gpu_used=gpu_used,
-                    cpu_total_millicores=cpu_total,
-                    cpu_allocatable_millicores=cpu_allocatable,
-                    cpu_used_millicores=cpu_used,
-                    memory_total_bytes=memory_total,
-                    memory_allocatable_bytes=memory_allocatable,
-                    memory_used_bytes=memory_used,
-                    labels=labels,
-                    pods=node_pods,
-                    conditions_ready=is_ready,
-                    os=node_info.os_image if node_info else "",
-                    arch=labels.get("kubernetes.io/arch", ""),
-                    kubelet_version=node_info.kubelet_version if node_info else "",
+        if all_nodes is None:
+            # Nodes not readable: one capacity-less record per node in use
+            nodes = [
+                _bare_node_record(name, node_pods)
+                for name, node_pods in sorted(pods_by_node.items())
+            ]
+        else:
+            nodes = [
+                self._build_node_record(
+                    node, pods_by_node.get(node.metadata.name, []), label_pool
                 )
+                for node in all_nodes
+            ]
+        if metrics is not None:
+            snapshot = metrics.result()
+            join_usage(nodes, snapshot)
+            self.idle_gpus.observe(nodes, snapshot.collected_at)
+        self.pending.observe(pending, scheduled_waits, nodes, now)
+        return nodes
+
+    def _list_nodes(self, timeout) -> Optional[list]:
+        """All nodes; None in namespace-scoped mode when listing nodes is
+        forbidden."""
+        from kubernetes.client.exceptions import ApiException
+
+        try:
+            return self.core.list_node(_request_timeout=timeout).items
+        except ApiException as exc:
+            if exc.status != 403 or not self.namespaces:
+                raise
+            logger.warning("Listing nodes is forbidden; reporting nodes without capacity")
+            return None
+
+    def _list_pods(self, timeout) -> Tuple[list, List[NamespaceStatus]]:
+        """All pods, or in namespace-scoped mode the pods of each namespace,
+        listed concurrently, plus the per-namespace outcome.  Fails only if
+        every namespace does."""
+        if not self.namespaces:
+            return self.core.list_pod_for_all_namespaces(_request_timeout=timeout).items, []
+
+        workers = max(1, min(NAMESPACE_LIST_CONCURRENCY, len(self.namespaces)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                (ns, pool.submit(self.core.list_namespaced_pod, ns, _request_timeout=timeout))
+                for ns in self.namespaces
+            ]
+        pods, statuses = [], []
+        for ns, future in futures:
+            try:
+                items = future.result().items
+            except Exception as exc:
+                statuses.append(NamespaceStatus(
+                    namespace=ns,
+                    ok=False,
+                    error=" ".join(f"{type(exc).__name__}: {exc}".split())[:500],
+                ))
+                continue
+            pods.extend(items)
+            statuses.append(NamespaceStatus(namespace=ns, ok=True, pod_count=len(items)))
+        failed = [s for s in statuses if not s.ok]
+        if len(failed) == len(statuses):
+            raise RuntimeError(f"Listing pods failed in every namespace: {failed[0].error}")
+        for s in failed:
+            logger.warning("Listing pods in namespace %s failed: %s", s.namespace, s.error)
+        return pods, statuses
+
+    def _metrics_collector(self) -> MetricsCollector:
+        if self._metrics is None:
+            # Collected while the node and pod lists are in flight: scrapes
+            # get what is left of K8S_POOL_MAXSIZE, so none of them waits
+            # for (or discards) a pooled connection
+            lists = 1 + (
+                min(NAMESPACE_LIST_CONCURRENCY, len(self.namespaces)) if self.namespaces else 1
+            )
+            self._metrics = MetricsCollector(
+                self.core,
+                K8S_CONNECT_TIMEOUT,
+                concurrency=min(METRICS_SCRAPE_CONCURRENCY, K8S_POOL_MAXSIZE - lists),
             )
+        return self._metrics
 
-        return result
-
-    def _build_cluster_summary(self) -> ClusterSummary:
-        """Get aggregated cluster-wide resource statistics."""
-        nodes = self.get_nodes_with_pods()
-
-        # Aggregate CPU
-        cpu_total = sum(n.cpu_total_millicores for n in nodes)
-        cpu_allocatable = sum(n.cpu_allocatable_millicores for n in nodes)
-        cpu_used = sum(n.cpu_used_millicores for n in nodes)
-        cpu_available = cpu_allocatable - cpu_used
-        cpu_util = (cpu_used / cpu_allocatable * 100) if cpu_allocatable > 0 else 0.0
-
-        # Aggregate Memory
-        memory_total = sum(n.memory_total_bytes for n in nodes)
-        memory_allocatable = sum(n.memory_allocatable_bytes for n in nodes)
-        memory_used = sum(n.memory_used_bytes for n in nodes)
-        memory_available = memory_allocatable - memory_used
-        memory_util = (
-            (memory_used / memory_allocatable * 100) if memory_allocatable > 0 else 0.0
-        )
+    def _build_node_record(
+        self,
+        node,
+        node_pods: List[PodRecord],
+        label_pool: LabelPool,
+        used: Optional[Requests] = None,
+    ) -> NodeRecord:
+        """Node record with *node_pods*; *used* overrides the requested
+        (gpu, cpu, memory) otherwise summed from the pods."""
+        labels = {
+            intern(k): label_pool.share(v) for k, v in (node.metadata.labels or {}).items()
+        }
+        cap = node.status.capacity or {}
+        alloc = node.status.allocatable or {}
 
-        # Aggregate GPU
-        gpu_total = sum(n.gpu_total for n in nodes)
-        gpu_allocatable = sum(n.gpu_allocatable for n in nodes)
-        gpu_used = sum(n.gpu_used for n in nodes)
-        gpu_available = gpu_allocatable - gpu_used
-        gpu_util = (gpu_used / gpu_allocatable * 100) if gpu_allocatable > 0 else 0.0
-
-        # Aggregate Pods
-        pods_total = sum(len(n.pods) for n in nodes)
-
-        # Count ready nodes
-        ready_nodes = sum(1 for n in nodes if n.conditions_ready)
-
-        # GPU by type
-        gpu_type_map: Dict[str, Dict] = {}
-        for n in nodes:
-            if n.gpu_total > 0:
-                t = n.gpu_type
-                if t not in gpu_type_map:
-                    gpu_type_map[t] = {"total": 0, "allocatable": 0, "used": 0, "node_count": 0}
-                gpu_type_map[t]["total"] += n.gpu_total
-                gpu_type_map[t]["allocatable"] += n.gpu_allocatable
-                gpu_type_map[t]["used"] += n.gpu_used
-                gpu_type_map[t]["node_count"] += 1
-
-        gpu_by_type = []
-        for gtype, stats in sorted(gpu_type_map.items()):
-            avail = stats["allocatable"] - stats["used"]
-            util = (stats["used"] / stats["allocatable"] * 100) if stats["allocatable"] > 0 else 0.0
-            gpu_by_type.append(GpuTypeStat(
-                gpu_type=gtype,
-                total=stats["total"],
-                allocatable=stats["allocatable"],
-                used=stats["used"],
-                available=avail,
-                utilization_percent=round(util, 1),
-                node_count=stats["node_count"],
-            ))
-
-        return ClusterSummary(
-            cpu=ResourceStat(
-                total=cpu_total,
-                allocatable=cpu_allocatable,
-                used=cpu_used,
-                available=cpu_available,
-                utilization_percent=round(cpu_util, 1),
-                unit="millicores",
-                total_display=f"{millicores_to_cores(cpu_total):.1f} cores",
-                used_display=f"{millicores_to_cores(cpu_used):.1f} cores",
-                available_display=f"{millicores_to_cores(cpu_available):.1f} cores",
-            ),
-            memory=ResourceStat(
-                total=memory_total,
-                allocatable=memory_allocatable,
-                used=memory_used,
-                available=memory_available,
-                utilization_percent=round(memory_util, 1),
-                unit="bytes",
-                total_display=bytes_to_human_readable(memory_total),
-                used_display=bytes_to_human_readable(memory_used),
-                available_display=bytes_to_human_readable(memory_available),
-            ),
-            gpu=ResourceStat(
-                total=gpu_total,
-                allocatable=gpu_allocatable,
-                used=gpu_used,
-                available=gpu_available,
-                utilization_percent=round(gpu_util, 1),
-                unit="GPUs",
-                total_display=str(gpu_total),
-                used_display=str(gpu_used),
-                available_display=str(gpu_available),
-            ),
-            pods=ResourceStat(
-                total=pods_total,
-                allocatable=pods_total,
-                used=pods_total,
-                available=0,
-                utilization_percent=0.0,
-                unit="pods",
-                total_display=str(pods_total),
-                used_display=str(pods_total),
-                available_display="0",
-            ),
-            node_count=len(nodes),
-            ready_node_count=ready_nodes,
-            gpu_by_type=gpu_by_type,
+        # GPU
+        gpu_total = int(cap.get(GPU_RESOURCE, 0))
+        gpu_allocatable = int(alloc.get(GPU_RESOURCE, 0))
+
+        # CPU (in millicores)
+        cpu_total = parse_cpu_quantity(cap.get("cpu", "0"))
+        cpu_allocatable = parse_cpu_quantity(alloc.get("cpu", "0"))
+
+        # Memory (in bytes)
+        memory_total = parse_k8s_quantity(cap.get("memory", "0"))
+        memory_allocatable = parse_k8s_quantity(alloc.get("memory", "0"))
+
+        # Calculate used resources based on pod requests
+        if used is None:
+            used = (
+                sum(p.gpu_request for p in node_pods),
+                sum(p.cpu_request_millicores for p in node_pods),
+                sum(p.memory_request_bytes for p in node_pods),
+            )
+        gpu_used, cpu_used, memory_used = used
+
+        conditions = node.status.conditions or []
+        is_ready = any(c.type == "Ready" and c.status == "True" for c in conditions)
+
+        node_info = node.status.node_info
+        return NodeRecord(
+            name=node.metadata.name,
+            gpu_type=intern(self._extract_gpu_type(labels)),
+            gpu_total=gpu_total,
+            gpu_allocatable=gpu_allocatable,
+            gpu_used=gpu_used,
+            cpu_total_millicores=cpu_total,
+            cpu_allocatable_millicores=cpu_allocatable,
+            cpu_used_millicores=cpu_used,
+            memory_total_bytes=memory_total,
+            memory_allocatable_bytes=memory_allocatable,
+            memory_used_bytes=memory_used,
+            labels=labels,
+            pods=node_pods,
+            conditions_ready=is_ready,
+            os=intern(node_info.os_image) if node_info else "",
+            arch=intern(labels.get("kubernetes.io/arch", "")),
+            kubelet_version=intern(node_info.kubelet_version) if node_info else "",
         )
 
+    def _build_index_summary(self) -> ClusterSummary:
+        """Summary from a node list plus the usage index, without listing
+        pods (SUMMARY_SOURCE=index)."""
+        index = self._usage_index()
+        if not index.wait_synced(CACHE_WAIT):
+            raise TimeoutError(f"Usage index for {index.name} is not synced yet")
+        timeout = (K8S_CONNECT_TIMEOUT, K8S_READ_TIMEOUT)
+        all_nodes = self.core.list_node(_request_timeout=timeout).items
+        usage = index.usage()
+        label_pool = LabelPool()
+        nodes = []
+        pod_count = 0
+        for node in all_nodes:
+            counters = usage.get(node.metadata.name, (0, 0, 0, 0))
+            pod_count += counters[3]
+            nodes.append(self._build_node_record(node, [], label_pool, used=counters[:3]))
+        return build_cluster_summary(nodes, pod_count=pod_count)
+
+    def _usage_index(self) -> UsageIndex:
+        with self._usage_lock:
+            if self._usage is None:
+                if self.closed:
+                    raise RuntimeError(f"K8s client for {self._context or '__default__'} is closed")
+                self._usage = UsageIndex(
+                    self.core,
+                    _pod_requests,
+                    self._context or "__default__",
+                    K8S_CONNECT_TIMEOUT,
+                    K8S_READ_TIMEOUT,
+                )
+                self._usage.start()
+            return self._usage
+
+    def _owner_graph(self) -> Optional[OwnerGraph]:
+        if not OWNER_GRAPH_ENABLED or not self._watch_owners:
+            return None
+        if self._owners_created or self.closed:
+            return self._owners
+        with self._owners_lock:
+            if self._owners_created or self.closed:
+                return self._owners
+            try:
+                owners = OwnerGraph.create(
+                    self.core.api_client,
+                    self._context or "__default__",
+                    K8S_CONNECT_TIMEOUT,
+                    K8S_READ_TIMEOUT,
+                    namespaces=self.namespaces or None,
+                )
+            except Exception as exc:
+                # Retried on the next refresh; pods keep their direct owner
+                logger.warning("Owner graph for %s not started: %s", self._context, exc)
+                return None
+            if owners is not None:
+                owners.start()
+            self._owners = owners
+            self._owners_created = True
+            return owners
+
+
+# ---------------------------------------------------------------------------
+# Aggregations (shared by snapshots, the usage index, selector queries and
+# the report CLI)
+# ---------------------------------------------------------------------------
+def build_cluster_summary(
+    nodes: List[NodeRecord], pod_count: Optional[int] = None
+) -> ClusterSummary:
+    """Aggregated resource statistics for *nodes*.
+
+    *pod_count* replaces counting ``n.pods`` for nodes built without pods.
+    """
+
+    # Aggregate CPU
+    cpu_total = sum(n.cpu_total_millicores for n in nodes)
+    cpu_allocatable = sum(n.cpu_allocatable_millicores for n in nodes)
+    cpu_used = sum(n.cpu_used_millicores for n in nodes)
+    cpu_available = cpu_allocatable - cpu_used
+    cpu_util = (cpu_used / cpu_allocatable * 100) if cpu_allocatable > 0 else 0.0
+
+    # Aggregate Memory
+    memory_total = sum(n.memory_total_bytes for n in nodes)
+    memory_allocatable = sum(n.memory_allocatable_bytes for n in nodes)
+    memory_used = sum(n.memory_used_bytes for n in nodes)
+    memory_available = memory_allocatable - memory_used
+    memory_util = (
+        (memory_used / memory_allocatable * 100) if memory_allocatable > 0 else 0.0
+    )
+
+    # Aggregate GPU
+    gpu_total = sum(n.gpu_total for n in nodes)
+    gpu_allocatable = sum(n.gpu_allocatable for n in nodes)
+    gpu_used = sum(n.gpu_used for n in nodes)
+    gpu_available = gpu_allocatable - gpu_used
+    gpu_util = (gpu_used / gpu_allocatable * 100) if gpu_allocatable > 0 else 0.0
+
+    # Aggregate Pods
+    pods_total = pod_count if pod_count is not None else sum(len(n.pods) for n in nodes)
+
+    # Count ready nodes
+    ready_nodes = sum(1 for n in nodes if n.conditions_ready)
+
+    # GPU by type
+    gpu_type_map: Dict[str, Dict] = {}
+    for n in nodes:
+        if n.gpu_total > 0:
+            t = n.gpu_type
+            if t not in gpu_type_map:
+                gpu_type_map[t] = {"total": 0, "allocatable": 0, "used": 0, "node_count": 0}
+            gpu_type_map[t]["total"] += n.gpu_total
+            gpu_type_map[t]["allocatable"] += n.gpu_allocatable
+            gpu_type_map[t]["used"] += n.gpu_used
+            gpu_type_map[t]["node_count"] += 1
+
+    gpu_by_type = []
+    for gtype, stats in sorted(gpu_type_map.items()):
+        avail = stats["allocatable"] - stats["used"]
+        util = (stats["used"] / stats["allocatable"] * 100) if stats["allocatable"] > 0 else 0.0
+        gpu_by_type.append(GpuTypeStat(
+            gpu_type=gtype,
+            total=stats["total"],
+            allocatable=stats["allocatable"],
+            used=stats["used"],
+            available=avail,
+            utilization_percent=round(util, 1),
+            node_count=stats["node_count"],
+        ))
+
+    return ClusterSummary(
+        cpu=ResourceStat(
+            total=cpu_total,
+            allocatable=cpu_allocatable,
+            used=cpu_used,
+            available=cpu_available,
+            utilization_percent=round(cpu_util, 1),
+            unit="millicores",
+            total_display=f"{millicores_to_cores(cpu_total):.1f} cores",
+            used_display=f"{millicores_to_cores(cpu_used):.1f} cores",
+            available_display=f"{millicores_to_cores(cpu_available):.1f} cores",
+        ),
+        memory=ResourceStat(
+            total=memory_total,
+            allocatable=memory_allocatable,
+            used=memory_used,
+            available=memory_available,
+            utilization_percent=round(memory_util, 1),
+            unit="bytes",
+            total_display=bytes_to_human_readable(memory_total),
+            used_display=bytes_to_human_readable(memory_used),
+            available_display=bytes_to_human_readable(memory_available),
+        ),
+        gpu=ResourceStat(
+            total=gpu_total,
+            allocatable=gpu_allocatable,
+            used=gpu_used,
+            available=gpu_available,
+            utilization_percent=round(gpu_util, 1),
+            unit="GPUs",
+            total_display=str(gpu_total),
+            used_display=str(gpu_used),
+            available_display=str(gpu_available),
+        ),
+        pods=ResourceStat(
+            total=pods_total,
+            allocatable=pods_total,
+            used=pods_total,
+            available=0,
+            utilization_percent=0.0,
+            unit="pods",
+            total_display=str(pods_total),
+            used_display=str(pods_total),
+            available_display="0",
+        ),
+        node_count=len(nodes),
+        ready_node_count=ready_nodes,
+        gpu_by_type=gpu_by_type,
+    )
+
+
+
+def build_namespace_usage(nodes: List[NodeRecord]) -> List[NamespaceUsage]:
+    """Pods and requested resources per namespace, sorted by namespace.
+    Measured usage is summed over the pods that have it."""
+    usage: Dict[str, NamespaceUsage] = {}
+    for n in nodes:
+        for p in n.pods:
+            ns = usage.get(p.namespace)
+            if ns is None:
+                ns = usage[p.namespace] = NamespaceUsage(namespace=p.namespace)
+            ns.pod_count += 1
+            ns.gpu_request += p.gpu_request
+            ns.cpu_request_millicores += p.cpu_request_millicores
+            ns.memory_request_bytes += p.memory_request_bytes
+            if p.cpu_usage_millicores is not None:
+                ns.cpu_usage_millicores = (ns.cpu_usage_millicores or 0) + p.cpu_usage_millicores
+            if p.memory_usage_bytes is not None:
+                ns.memory_usage_bytes = (ns.memory_usage_bytes or 0) + p.memory_usage_bytes
+    return [usage[name] for name in sorted(usage)]
+
+
+def build_workload_usage(nodes: List[NodeRecord]) -> List[WorkloadUsage]:
+    """Pods and resources per top-level workload (namespace, kind, name),
+    most requested GPUs first, then CPU."""
+    usage: Dict[Tuple[str, str, str], WorkloadUsage] = {}
+    node_sets: Dict[Tuple[str, str, str], set] = {}
+    owner_sets: Dict[Tuple[str, str, str], set] = {}
+    gpu_samples: Dict[Tuple[str, str, str], List[float]] = {}
+    for n in nodes:
+        for p in n.pods:
+            key = (p.namespace, p.workload_kind, p.workload_name)
+            wl = usage.get(key)
+            if wl is None:
+                wl = usage[key] = WorkloadUsage(
+                    namespace=p.namespace, kind=p.workload_kind, name=p.workload_name
+                )
+                node_sets[key] = set()
+                owner_sets[key] = set()
+            wl.pod_count += 1
+            wl.gpu_request += p.gpu_request
+            wl.cpu_request_millicores += p.cpu_request_millicores
+            wl.memory_request_bytes += p.memory_request_bytes
+            if p.cpu_usage_millicores is not None:
+                wl.cpu_usage_millicores = (wl.cpu_usage_millicores or 0) + p.cpu_usage_millicores
+            if p.memory_usage_bytes is not None:
+                wl.memory_usage_bytes = (wl.memory_usage_bytes or 0) + p.memory_usage_bytes
+            if p.gpu_utilization_percent is not None:
+                gpu_samples.setdefault(key, []).append(p.gpu_utilization_percent)
+            node_sets[key].add(n.name)
+            owner_sets[key].add(f"{p.owner_kind}/{p.owner_name}")
+    for key, wl in usage.items():
+        wl.node_count = len(node_sets[key])
+        wl.owners = sorted(owner_sets[key])
+        samples = gpu_samples.get(key)
+        if samples:
+            wl.gpu_utilization_percent = round(sum(samples) / len(samples), 1)
+    return sorted(
+        usage.values(),
+        key=lambda wl: (-wl.gpu_request, -wl.cpu_request_millicores, wl.namespace, wl.kind, wl.name),
+    )
 
 # ---------------------------------------------------------------------------
-# Client cache (one K8sClient per context)
+# Client registry (one K8sClient per context, bounded)
 # ---------------------------------------------------------------------------
-_clients: Dict[str, K8sClient] = {}
+class UnknownContextError(LookupError):
+    """Raised for a context name that is not in the kubeconfig."""
+
+
+class ClientRegistry:
+    """LRU of K8sClients with idle-time eviction and a snapshot memory budget.
+
+    Evicting a client closes its connection pool and drops the snapshots it
+    holds in this process; the most recently used client is always kept.
+    """
+
+    def __init__(
+        self,
+        max_clients: int = CLIENT_CACHE_MAX,
+        idle_ttl: int = CLIENT_IDLE_TTL,
+        memory_budget: int = CACHE_MEMORY_BUDGET_MB * 1024 * 1024,
+    ):
+        self._max_clients = max_clients
+        self._idle_ttl = idle_ttl
+        self._memory_budget = memory_budget
+        # cache_key -> (client, last_used monotonic time), oldest first
+        self._clients: "OrderedDict[str, Tuple[K8sClient, float]]" = OrderedDict()
+        # cache_key -> lock held while its client is built
+        self._creating: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, context: Optional[str]) -> K8sClient:
+        cache_key = context or "__default__"
+        k8s = self._touch(cache_key)
+        if k8s is None:
+            # Built outside the registry lock (it loads the kubeconfig), once
+            # per context even when several requests miss at the same time
+            with self._lock:
+                creating = self._creating.setdefault(cache_key, threading.Lock())
+            with creating:
+                k8s = self._touch(cache_key)
+                if k8s is None:
+                    k8s = K8sClient(context=context)
+                    with self._lock:
+                        self._clients[cache_key] = (k8s, time.monotonic())
+                        victims = self._evict(time.monotonic())
+                    self._close(victims)
+            with self._lock:
+                self._creating.pop(cache_key, None)
+        return k8s
+
+    def _touch(self, cache_key: str) -> Optional[K8sClient]:
+        """Mark *cache_key*'s client used and evict; None if there is none."""
+        with self._lock:
+            item = self._clients.get(cache_key)
+            if item is None:
+                return None
+            now = time.monotonic()
+            self._clients[cache_key] = (item[0], now)
+            self._clients.move_to_end(cache_key)
+            victims = self._evict(now)
+        self._close(victims)
+        return item[0]
+
+    def _evict(self, now: float) -> List[Tuple[str, K8sClient, str]]:
+        """Remove clients to evict (under the lock); the caller closes them
+        once the lock is released."""
+        victims = []
+        for cache_key, (k8s, last_used) in list(self._clients.items())[:-1]:
+            if now - last_used > self._idle_ttl:
+                del self._clients[cache_key]
+                victims.append((cache_key, k8s, "idle"))
+
+        while len(self._clients) > 1 and (
+            len(self._clients) > self._max_clients
+            or self.approx_bytes() > self._memory_budget
+        ):
+            cache_key, (k8s, _) = self._clients.popitem(last=False)
+            victims.append((cache_key, k8s, "over budget"))
+        return victims
+
+    @staticmethod
+    def _close(victims: List[Tuple[str, K8sClient, str]]) -> None:
+        for cache_key, k8s, reason in victims:
+            logger.info("Evicting K8s client for %s (%s)", cache_key, reason)
+            try:
+                k8s.close()
+            except Exception:
+                logger.exception("Error closing K8s client for %s", cache_key)
+
+    def approx_bytes(self) -> int:
+        return sum(k8s.approx_bytes for k8s, _ in self._clients.values())
+
+    def clients(self) -> List[K8sClient]:
+        with self._lock:
+            return [k8s for k8s, _ in self._clients.values()]
+
+    def peek(self, context: Optional[str]) -> Optional[K8sClient]:
+        """Return the live client for *context* without marking it used."""
+        with self._lock:
+            item = self._clients.get(context or "__default__")
+        return item[0] if item else None
+
+
+_clients = ClientRegistry()
+
+
+def live_contexts() -> List[Optional[str]]:
+    """Contexts that currently have a client (None for the default)."""
+    return [k8s._context for k8s in _clients.clients()]
+
+
+def peek_k8s_client(context: Optional[str]) -> Optional[K8sClient]:
+    """Live client for *context*, if any; does not count as a use, so
+    background work never keeps an idle context from being evicted."""
+    return _clients.peek(context)
+
+
+def connection_stats() -> List[ConnectionStats]:
+    """Connection pool statistics for every live client."""
+    return [k8s.connection_stats() for k8s in _clients.clients()]
+
+
+def validate_context(context: Optional[str]) -> None:
+    """Raise UnknownContextError unless *context* is None (the default
+    context) or a context listed in the kubeconfig."""
+    if context is None:
+        return
+    clusters, _ = list_clusters()
+    if not any(c.name == context for c in clusters):
+        raise UnknownContextError(context)
 
 
 def get_k8s_client(context: Optional[str] = None) -> K8sClient:
-    """Get or create a cached K8sClient for the given context."""
-    cache_key = context or "__default__"
-    if cache_key not in _clients:
-        _clients[cache_key] = K8sClient(context=context)
-    return _clients[cache_key]
+    """Get or create a cached K8sClient for the given context.
+
+    Unknown contexts are rejected before any client is built.
+    """
+    validate_context(context)
+    return _clients.get(context)
+
+
+def preload_snapshots(
+    client_fn: Optional[Callable[[Optional[str]], K8sClient]] = None
+) -> None:
+    """Load persisted snapshots into the cache so the first request for each
+    context is answered from disk while the real refresh runs.
+
+    *client_fn* maps a context to the client to load through; by default
+    the request-path registry.
+    """
+    for cache_key in snapshot_store.saved_keys():
+        context, _, key = cache_key.rpartition(":")
+        if key not in _SNAPSHOT_CODECS:
+            continue
+        context = None if context == "__default__" else context
+        try:
+            validate_context(context)
+            (client_fn or _clients.get)(context)._load(key)
+        except UnknownContextError:
+            logger.info("Skipping persisted snapshot for unknown context %s", context)
+        except Exception:
+            logger.exception("Failed to preload snapshot %s", cache_key)
+
+
+def required_contexts() -> List[str]:
+    """Contexts that must have a snapshot before /readyz reports ready."""
+    if not READY_REQUIRE_WARM:
+        return []
+    if READY_REQUIRE_WARM == "all":
+        clusters, _ = list_clusters()
+        return [c.name for c in clusters]
+    return [name.strip() for name in READY_REQUIRE_WARM.split(",") if name.strip()]
+
+
+def context_readiness() -> List[ContextReadiness]:
+    """Snapshot warmth, age and last fetch error for every configured context.
+
+    Read from the cache backend only; never builds a client or fetches.
+    """
+    clusters, _ = list_clusters()
+    required = set(required_contexts())
+    backend = get_cache_backend()
+    now = time.time()
+    result = []
+    for name in ["__default__"] + [c.name for c in clusters]:
+        entries = [
+            backend.get(_snapshot_key(name, key))
+            for key in ("nodes_with_pods", "cluster_summary")
+        ]
+        entry = max(filter(None, entries), key=lambda e: e.fetched_at, default=None)
+        error = _fetch_errors.get(name)
+        k8s = _clients.peek(None if name == "__default__" else name)
+        result.append(
+            ContextReadiness(
+                context=name,
+                warm=entry is not None,
+                required=name in required,
+                age_seconds=round(now - entry.fetched_at, 1) if entry else None,
+                last_error=error[0] if error else None,
+                last_error_age_seconds=round(now - error[1], 1) if error else None,
+                circuit=k8s.breaker.state if k8s else "closed",
+            )
+        )
+    return result
+
+
+def warm_up() -> None:
+    """Load the kubernetes client and fill the caches needed for readiness.
+
+    Persisted snapshots are loaded first, so this returns quickly when a
+    recent snapshot is on disk; otherwise it waits for the first fetch of
+    the default context and of every context in READY_REQUIRE_WARM.
+    """
+    preload_snapshots()
+    contexts: List[Optional[str]] = [None] + required_contexts()
+
+    def _warm(context: Optional[str]) -> None:
+        try:
+            get_k8s_client(context=context).get_cluster_summary()
+        except Exception:
+            logger.exception("Warm-up failed for context %s", context or "(default)")
+
+    with ThreadPoolExecutor(max_workers=len(contexts)) as pool:
+        list(pool.map(_warm, contexts))
+
+
+def read_snapshot_json(context: Optional[str], key: str) -> Optional[CacheEntry]:
+    """Return a serialized snapshot straight from the shared cache backend.
+
+    Used by multi-worker readers, which never build a K8sClient or talk to
+    the K8s API; the entry's value is the JSON payload.  Returns None until
+    the refresher has stored the snapshot.
+    """
+    backend = get_cache_backend()
+    if not backend.serialized:
+        raise RuntimeError("Snapshot readers need a serialized CACHE_BACKEND (file or redis)")
+    return backend.get(_snapshot_key(context, key))
+
+
+# Reader-side indexes: (context, name) -> (version, fetched_at, value)
+_reader_derived: Dict[Tuple[str, str], tuple] = {}
+
+
+def read_snapshot_derived(
+    context: Optional[str],
+    name: str,
+    build: Callable[[List[NodeRecord]], Any],
+    update: Optional[Callable[[Any, List[NodeRecord]], Any]] = None,
+) -> Optional[Tuple[CacheEntry, Any]]:
+    """Multi-worker counterpart of K8sClient.get_derived(): decode the
+    refresher's nodes snapshot and apply *build*, once per version."""
+    entry = read_snapshot_json(context, "nodes_with_pods")
+    if entry is None:
+        return None
+    context = context or "__default__"
+    version = (entry.version, entry.fetched_at)
+    memo = _reader_derived.get((context, name))
+    if memo is None or memo[:2] != version:
+        # The decoded records are shared by all indexes of this version
+        decoded = _reader_derived.get((context, ""))
+        if decoded is None or decoded[:2] != version:
+            decoded = version + (load_nodes(entry.value),)
+            _reader_derived[(context, "")] = decoded
+        if memo is not None and update is not None:
+            value = update(memo[2], decoded[2])
+        else:
+            value = build(decoded[2])
+        memo = version + (value,)
+        _reader_derived[(context, name)] = memo
+    return entry, memo[2]
+
+
+# ---------------------------------------------------------------------------
+# Snapshot history (SNAPSHOT_HISTORY), for diffs
+# ---------------------------------------------------------------------------
+def snapshot_history(context: Optional[str]) -> List[int]:
+    """Fetch times of the node snapshots kept for *context*, oldest first."""
+    return snapshot_store.history(_snapshot_key(context, "nodes_with_pods"))
+
+
+@functools.lru_cache(maxsize=4)
+def _decoded_history(cache_key: str, at: Optional[float]) -> Optional[tuple]:
+    stored = snapshot_store.load_history(cache_key, at)
+    if stored is None:
+        return None
+    payload, fetched_at = stored
+    return load_nodes(payload), fetched_at
+
+
+def load_snapshot_history(
+    context: Optional[str], at: Optional[float] = None
+) -> Optional[Tuple[List[NodeRecord], float]]:
+    """``(nodes, fetched_at)`` of the newest kept snapshot taken at or
+    before *at* (default: the oldest kept), or None."""
+    times = snapshot_history(context)
+    if at is not None:
+        times = [t for t in times if t <= at][-1:]
+    if not times:
+        return None
+    # Keyed by the resolved entry so repeated diffs reuse the decoded copy
+    return _decoded_history(_snapshot_key(context, "nodes_with_pods"), times[0])
 
 
 # ---------------------------------------------------------------------------
@@ -379,6 +1495,8 @@ def list_clusters() -> Tuple[List[ClusterInfo], Optional[str]]:
     Returns (clusters, active_context_name).
     For in-cluster mode, returns a single 'in-cluster' entry.
     """
+    from kubernetes import config
+
     now = time.monotonic()
     if "clusters" in _cluster_cache:
         value, ts = _cluster_cache["clusters"]
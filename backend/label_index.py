@@ -0,0 +1,172 @@
+"""Inverted label index and Kubernetes label selectors over a snapshot.
+
+A LabelIndex maps label key -> value -> ids of the nodes (or pods) that
+carry it, so selectors are answered with set intersections and
+differences rather than by scanning every object.  Supported selector
+syntax is the Kubernetes one::
+
+    key=value  key==value  key!=value  key in (a,b)  key notin (a,b)
+    key  !key
+
+Requirements are comma-separated and all must match.  As in Kubernetes,
+``!=`` and ``notin`` also match objects without the key.
+"""
+
+import re
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple
+
+import orjson
+
+from k8s_client import build_cluster_summary
+from records import NodeRecord, PodRecord
+
+_KEY = r"[A-Za-z0-9][-A-Za-z0-9_./]*"
+_VALUE = r"(?:[A-Za-z0-9][-A-Za-z0-9_.]*)?"
+_SET_RE = re.compile(rf"^({_KEY})\s+(in|notin)\s*\(([^)]*)\)$")
+_EQ_RE = re.compile(rf"^({_KEY})\s*(==|=|!=)\s*({_VALUE})$")
+_EXISTS_RE = re.compile(rf"^(!?)\s*({_KEY})$")
+_VALUE_RE = re.compile(rf"^{_VALUE}$")
+
+
+class Requirement(NamedTuple):
+    key: str
+    op: str  # "in", "notin", "exists", "!exists"
+    values: Tuple[str, ...] = ()
+
+
+def _split(selector: str) -> List[str]:
+    """Split on commas outside parentheses."""
+    terms, depth, start = [], 0, 0
+    for i, ch in enumerate(selector):
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            terms.append(selector[start:i])
+            start = i + 1
+    terms.append(selector[start:])
+    return [t.strip() for t in terms]
+
+
+def parse_selector(selector: str) -> List[Requirement]:
+    """Parse a label selector; raise ValueError if it is malformed.  An
+    empty selector matches everything."""
+    if not selector.strip():
+        return []
+    requirements = []
+    for term in _split(selector):
+        m = _SET_RE.match(term)
+        if m:
+            values = tuple(v.strip() for v in m.group(3).split(","))
+            if not all(v and _VALUE_RE.match(v) for v in values):
+                raise ValueError(f"Invalid values in selector term: {term!r}")
+            requirements.append(Requirement(m.group(1), m.group(2), values))
+            continue
+        m = _EQ_RE.match(term)
+        if m:
+            op = "notin" if m.group(2) == "!=" else "in"
+            requirements.append(Requirement(m.group(1), op, (m.group(3),)))
+            continue
+        m = _EXISTS_RE.match(term)
+        if m:
+            requirements.append(
+                Requirement(m.group(2), "!exists" if m.group(1) else "exists")
+            )
+            continue
+        raise ValueError(f"Invalid selector term: {term!r}")
+    return requirements
+
+
+class _Inverted:
+    __slots__ = ("values", "keys", "size")
+
+    def __init__(self, labelled: Iterable[Dict[str, str]]):
+        # key -> value -> ids, and key -> ids having the key
+        self.values: Dict[str, Dict[str, Set[int]]] = {}
+        self.keys: Dict[str, Set[int]] = {}
+        size = 0
+        for i, labels in enumerate(labelled):
+            size += 1
+            for key, value in labels.items():
+                self.values.setdefault(key, {}).setdefault(value, set()).add(i)
+                self.keys.setdefault(key, set()).add(i)
+        self.size = size
+
+    def match(self, requirements: List[Requirement]) -> List[int]:
+        include: List[Set[int]] = []
+        exclude: List[Set[int]] = []
+        for r in requirements:
+            if r.op in ("exists", "!exists"):
+                ids = self.keys.get(r.key, set())
+            else:
+                by_value = self.values.get(r.key, {})
+                sets = [by_value[v] for v in r.values if v in by_value]
+                ids = sets[0] if len(sets) == 1 else set().union(*sets)
+            (include if r.op in ("in", "exists") else exclude).append(ids)
+
+        if include:
+            include.sort(key=len)
+            result = set(include[0])
+            for ids in include[1:]:
+                if not result:
+                    break
+                result &= ids
+        else:
+            result = set(range(self.size))
+        for ids in exclude:
+            result -= ids
+        return sorted(result)
+
+
+class LabelIndex:
+    """Label indexes over the nodes and pods of one snapshot."""
+
+    def __init__(self, nodes: List[NodeRecord]):
+        self.nodes = nodes
+        # Pods in node order, with the name of the node they run on
+        self.pods: List[Tuple[str, PodRecord]] = [
+            (n.name, p) for n in nodes for p in n.pods
+        ]
+        self._nodes = _Inverted(n.labels for n in nodes)
+        self._pods = _Inverted(p.labels for _, p in self.pods)
+
+    def select_nodes(self, requirements: List[Requirement]) -> List[NodeRecord]:
+        return [self.nodes[i] for i in self._nodes.match(requirements)]
+
+    def select_pods(self, requirements: List[Requirement]) -> List[Tuple[str, PodRecord]]:
+        return [self.pods[i] for i in self._pods.match(requirements)]
+
+
+def select_json(
+    index: LabelIndex,
+    selector: str,
+    requirements: List[Requirement],
+    kind: str,
+    include_items: bool = True,
+) -> bytes:
+    """SelectorResult for *requirements* as JSON bytes."""
+    result = {"kind": kind, "selector": selector}
+    if kind == "nodes":
+        nodes = index.select_nodes(requirements)
+        result.update(
+            count=len(nodes),
+            gpu_requested=sum(n.gpu_used for n in nodes),
+            cpu_requested_millicores=sum(n.cpu_used_millicores for n in nodes),
+            memory_requested_bytes=sum(n.memory_used_bytes for n in nodes),
+            summary=build_cluster_summary(nodes).model_dump(),
+            nodes=nodes if include_items else [],
+            pods=[],
+        )
+    else:
+        pods = index.select_pods(requirements)
+        result.update(
+            count=len(pods),
+            gpu_requested=sum(p.gpu_request for _, p in pods),
+            cpu_requested_millicores=sum(p.cpu_request_millicores for _, p in pods),
+            memory_requested_bytes=sum(p.memory_request_bytes for _, p in pods),
+            summary=None,
+            nodes=[],
+            pods=[{"node": node, "pod": p} for node, p in pods] if include_items else [],
+        )
+    return orjson.dumps(result)
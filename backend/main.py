@@ -1,21 +1,95 @@
 import asyncio
 import logging
 import os
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import List
+from typing import List, Literal, Optional, Tuple
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
-from k8s_client import get_k8s_client, list_clusters
-from models import ClusterInfo, ClusterSummary, NodeDetail
+from cache_backend import CacheEntry
+from circuit_breaker import CircuitOpenError, ClusterUnreachableError
+from executors import ContextOverloadedError, executor_stats, run_in_context
+from k8s_client import (
+    UnknownContextError,
+    build_workload_usage,
+    connection_stats,
+    context_readiness,
+    get_k8s_client,
+    list_clusters,
+    live_contexts,
+    load_snapshot_history,
+    peek_k8s_client,
+    read_snapshot_derived,
+    read_snapshot_json,
+    snapshot_history,
+    validate_context,
+    warm_up,
+)
+from models import (
+    ClusterInfo,
+    ClusterSummary,
+    ConnectionStats,
+    ExecutorStats,
+    GpuCapacity,
+    GpuFragmentation,
+    IdleGpuReport,
+    NodeDetail,
+    PendingQueue,
+    Readiness,
+    RefreshTiming,
+    ScopeStatus,
+    SelectorResult,
+    SnapshotDiff,
+    SnapshotHistory,
+    WorkloadUsage,
+)
+import export
+from fragmentation import Fragmentation
+from gpu_cube import GpuCube
+from label_index import LabelIndex, parse_selector, select_json
+from metrics import METRICS_ENABLED
+from records import iter_nodes_json
+from scheduler import REFRESH_MAX_INTERVAL, REFRESH_SCHEDULER, RefreshScheduler
+from snapshot_diff import diff_snapshots
 
 logging.basicConfig(level=logging.INFO)
 
-app = FastAPI(title="K8s GPU Dashboard", version="2.0.0")
+# Set for uvicorn workers in multi-worker mode: serve snapshots written by
+# the refresher process instead of fetching from the K8s API.
+SNAPSHOT_READER = os.getenv("SNAPSHOT_READER", "0") == "1"
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NodesFormat = Literal["json", "stream", "ndjson"]
+_NODES_RESPONSES = {200: {"content": {NDJSON_MEDIA_TYPE: {}}}}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The kubernetes client, kubeconfig and first snapshots load in the
+    # background so /healthz answers as soon as uvicorn is up; in
+    # multi-worker mode the refresher does this instead.
+    app.state.warm_up = None
+    app.state.scheduler = None
+    if not SNAPSHOT_READER:
+        app.state.warm_up = asyncio.create_task(asyncio.to_thread(warm_up))
+        if REFRESH_SCHEDULER:
+            # Keeps contexts that users are looking at fresh in the background
+            app.state.scheduler = RefreshScheduler(live_contexts, peek_k8s_client)
+            app.state.scheduler.start()
+    yield
+    if app.state.scheduler is not None:
+        app.state.scheduler.stop()
+
+
+app = FastAPI(title="K8s GPU Dashboard", version="2.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -26,6 +100,38 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(UnknownContextError)
+async def unknown_context_handler(request: Request, exc: UnknownContextError):
+    return JSONResponse(status_code=404, content={"detail": f"Unknown cluster: {exc}"})
+
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, int(exc.retry_after)))},
+    )
+
+
+@app.exception_handler(ClusterUnreachableError)
+async def cluster_unreachable_handler(request: Request, exc: ClusterUnreachableError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, int(exc.retry_after)))},
+    )
+
+
+@app.exception_handler(ContextOverloadedError)
+async def context_overloaded_handler(request: Request, exc: ContextOverloadedError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(int(exc.retry_after))},
+    )
+
+
 # ---------------------------------------------------------------------------
 # Health check — lightweight, no K8s API dependency
 # ---------------------------------------------------------------------------
@@ -34,20 +140,261 @@ async def healthz():
     return {"status": "ok"}
 
 
+@app.get("/readyz", response_model=Readiness)
+async def readyz():
+    """Ready once warm-up has run and every READY_REQUIRE_WARM context has a
+    snapshot; in multi-worker mode, once the default snapshot exists."""
+    contexts = await asyncio.to_thread(context_readiness)
+    if SNAPSHOT_READER:
+        ready = contexts[0].warm
+    else:
+        ready = app.state.warm_up is not None and app.state.warm_up.done()
+    ready = ready and all(c.warm for c in contexts if c.required)
+    body = Readiness(status="ready" if ready else "warming", contexts=contexts)
+    if not ready:
+        return JSONResponse(status_code=503, content=body.model_dump())
+    return body
+
+
+# ---------------------------------------------------------------------------
+# Snapshot responses — X-Snapshot-Age is the snapshot's age in seconds, and
+# X-Snapshot-Stale is set when it is older than the context's refresh
+# interval (e.g. the cluster is unreachable and the last good snapshot is
+# being served).
+# ---------------------------------------------------------------------------
+def _snapshot_headers(response: Response, fetched_at: float, ttl: float) -> None:
+    age = time.time() - fetched_at
+    response.headers["X-Snapshot-Age"] = str(int(age))
+    if age >= ttl:
+        response.headers["X-Snapshot-Stale"] = "true"
+
+
+def _same_records(nodes: list) -> list:
+    return nodes
+
+
+async def _snapshot_entry(
+    context: Optional[str], key: str, as_json: bool = True
+) -> Tuple[CacheEntry, float]:
+    """Return the snapshot entry for *key* and the age at which it counts as
+    stale.  With *as_json* the value is JSON bytes, otherwise the snapshot's
+    records."""
+    if SNAPSHOT_READER:
+        await asyncio.to_thread(validate_context, context)
+        if as_json:
+            entry = await asyncio.to_thread(read_snapshot_json, context, key)
+        else:
+            # Decoded once per snapshot version and shared with the reader's
+            # indexes (nodes only, like the derived values)
+            result = await asyncio.to_thread(
+                read_snapshot_derived, context, "records", _same_records
+            )
+            entry = result[0]._replace(value=result[1]) if result is not None else None
+        if entry is None:
+            raise HTTPException(
+                status_code=503,
+                detail="Snapshot not available yet",
+                headers={"Retry-After": "5"},
+            )
+        return entry, REFRESH_MAX_INTERVAL
+    k8s = get_k8s_client(context=context)
+    if as_json:
+        entry = await run_in_context(context, k8s.get_json_entry, key)
+    elif key == "nodes_with_pods":
+        entry = await run_in_context(context, k8s.get_nodes_entry)
+    else:
+        entry = await run_in_context(context, k8s.get_summary_entry)
+    return entry, k8s.ttl
+
+
+async def _serve_snapshot(context: Optional[str], key: str) -> Response:
+    """Return the snapshot as pre-serialized JSON bytes.
+
+    The snapshot is built from trusted data, so it is written straight to
+    the response instead of being re-validated against the endpoint's
+    response_model, which still documents the schema.  In multi-worker
+    mode the refresher's bytes are served as-is.
+    """
+    entry, ttl = await _snapshot_entry(context, key)
+    response = Response(content=entry.value, media_type="application/json")
+    _snapshot_headers(response, entry.fetched_at, ttl)
+    return response
+
+
+async def _serve_nodes(context: Optional[str], output: str, request: Request) -> Response:
+    """Node list as cached JSON bytes, or streamed node by node as a JSON
+    array (``format=stream``) or NDJSON (``format=ndjson`` or an
+    ``Accept: application/x-ndjson`` header)."""
+    if output == "json" and NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        output = "ndjson"
+    if output == "json":
+        return await _serve_snapshot(context, "nodes_with_pods")
+    entry, ttl = await _snapshot_entry(context, "nodes_with_pods", as_json=False)
+    ndjson = output == "ndjson"
+    response = StreamingResponse(
+        iter_nodes_json(entry.value, ndjson=ndjson),
+        media_type=NDJSON_MEDIA_TYPE if ndjson else "application/json",
+    )
+    _snapshot_headers(response, entry.fetched_at, ttl)
+    return response
+
+
+async def _run_blocking(context: Optional[str], fn, *args):
+    if SNAPSHOT_READER:
+        return await asyncio.to_thread(fn, *args)
+    return await run_in_context(context, fn, *args)
+
+
+async def _snapshot_derived(
+    context: Optional[str], name: str, build, update=None
+) -> Tuple[CacheEntry, object, float]:
+    """Return the nodes entry, *build* applied to its snapshot (memoized per
+    snapshot version) and the entry's staleness threshold."""
+    if SNAPSHOT_READER:
+        await asyncio.to_thread(validate_context, context)
+        result = await asyncio.to_thread(
+            read_snapshot_derived, context, name, build, update
+        )
+        if result is None:
+            raise HTTPException(
+                status_code=503,
+                detail="Snapshot not available yet",
+                headers={"Retry-After": "5"},
+            )
+        return result + (REFRESH_MAX_INTERVAL,)
+    k8s = get_k8s_client(context=context)
+    entry, value = await run_in_context(context, k8s.get_derived, name, build, update)
+    return entry, value, k8s.ttl
+
+
+async def _serve_selection(
+    context: Optional[str], selector: str, kind: str, include_items: bool
+) -> Response:
+    try:
+        requirements = parse_selector(selector)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    entry, index, ttl = await _snapshot_derived(context, "label_index", LabelIndex)
+    body = await _run_blocking(
+        context, select_json, index, selector, requirements, kind, include_items
+    )
+    response = Response(content=body, media_type="application/json")
+    _snapshot_headers(response, entry.fetched_at, ttl)
+    return response
+
+
+async def _serve_gpu_capacity(
+    context: Optional[str], filters: dict, group_by: Optional[str], response: Response
+) -> GpuCapacity:
+    entry, cube, ttl = await _snapshot_derived(
+        context, "gpu_cube", GpuCube, update=GpuCube.update
+    )
+    _snapshot_headers(response, entry.fetched_at, ttl)
+    return cube.query({k: v for k, v in filters.items() if v is not None}, group_by)
+
+
+async def _serve_fragmentation(
+    context: Optional[str], response: Response
+) -> List[GpuFragmentation]:
+    entry, fragmentation, ttl = await _snapshot_derived(
+        context, "fragmentation", Fragmentation, update=Fragmentation.update
+    )
+    _snapshot_headers(response, entry.fetched_at, ttl)
+    return fragmentation.report()
+
+
+async def _serve_workloads(
+    context: Optional[str], namespace: Optional[str], limit: Optional[int], response: Response
+) -> List[WorkloadUsage]:
+    entry, workloads, ttl = await _snapshot_derived(context, "workloads", build_workload_usage)
+    _snapshot_headers(response, entry.fetched_at, ttl)
+    if namespace is not None:
+        workloads = [wl for wl in workloads if wl.namespace == namespace]
+    return workloads[:limit]
+
+
+async def _serve_export(
+    context: Optional[str], table: str, fmt: str, at: Optional[float] = None
+) -> Response:
+    """One table of the snapshot, or of the kept snapshot at or before *at*,
+    streamed as Parquet or an Arrow IPC stream."""
+    if not export.AVAILABLE:
+        raise HTTPException(
+            status_code=501, detail="Export requires the 'pyarrow' package (pip install pyarrow)"
+        )
+    if at is None:
+        entry, tables, ttl = await _snapshot_derived(context, "export_tables", export.build_tables)
+        fetched_at = entry.fetched_at
+    else:
+        await asyncio.to_thread(validate_context, context)
+        kept = await run_in_context(context, load_snapshot_history, context, at)
+        if kept is None:
+            raise HTTPException(
+                status_code=404,
+                detail="No kept snapshot at or before 'at' "
+                       "(requires SNAPSHOT_DIR and SNAPSHOT_HISTORY)",
+            )
+        # Not cached: kept snapshots are exported rarely, and their decoded
+        # records already are
+        tables = await run_in_context(context, export.build_tables, kept[0])
+        # A kept snapshot is old by choice, never stale
+        fetched_at, ttl = kept[1], float("inf")
+    media_type, extension = export.FORMATS[fmt]
+    name = f"{context or 'default'}-{table}"
+    if at is not None:
+        name += f"-{int(fetched_at)}"
+    response = StreamingResponse(
+        export.iter_table(tables[table], fmt),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{extension}"'},
+    )
+    _snapshot_headers(response, fetched_at, ttl)
+    return response
+
+
+async def _serve_diff(
+    context: Optional[str], base: Optional[float], target: Optional[float], limit: int
+) -> SnapshotDiff:
+    """Diff between two kept snapshots, or a kept one and the current one."""
+    await asyncio.to_thread(validate_context, context)
+    old = await run_in_context(context, load_snapshot_history, context, base)
+    if old is None:
+        raise HTTPException(
+            status_code=404,
+            detail="No kept snapshot at or before 'base' "
+                   "(requires SNAPSHOT_DIR and SNAPSHOT_HISTORY)",
+        )
+    if target is None:
+        entry, nodes, _ = await _snapshot_derived(context, "records", lambda nodes: nodes)
+        new = (nodes, entry.fetched_at)
+    else:
+        new = await run_in_context(context, load_snapshot_history, context, target)
+        if new is None:
+            raise HTTPException(status_code=404, detail="No kept snapshot at or before 'target'")
+    return await run_in_context(context, diff_snapshots, old[0], new[0], limit, old[1], new[1])
+
+
+async def _serve_idle_gpus(context: Optional[str]) -> Response:
+    if not METRICS_ENABLED:
+        raise HTTPException(
+            status_code=501, detail="GPU utilization is not collected (METRICS_ENABLED=0)"
+        )
+    return await _serve_snapshot(context, "idle_gpus")
+
+
 # ---------------------------------------------------------------------------
-# API endpoints — all blocking K8s calls run in a thread pool via
-# asyncio.to_thread() so the event loop stays responsive for health probes.
+# API endpoints — blocking snapshot work runs on the context's own bounded
+# executor (executors.py) so the event loop stays responsive for health
+# probes and a slow cluster cannot starve the others.
 # ---------------------------------------------------------------------------
 @app.get("/api/cluster-summary", response_model=ClusterSummary)
 async def get_cluster_summary():
-    k8s = get_k8s_client()
-    return await asyncio.to_thread(k8s.get_cluster_summary)
+    return await _serve_snapshot(None, "cluster_summary")
 
 
-@app.get("/api/nodes", response_model=List[NodeDetail])
-async def get_nodes():
-    k8s = get_k8s_client()
-    return await asyncio.to_thread(k8s.get_nodes_with_pods)
+@app.get("/api/nodes", response_model=List[NodeDetail], responses=_NODES_RESPONSES)
+async def get_nodes(request: Request, output: NodesFormat = Query("json", alias="format")):
+    return await _serve_nodes(None, output, request)
 
 
 @app.get("/api/clusters", response_model=List[ClusterInfo])
@@ -56,16 +403,228 @@ async def get_clusters():
     return clusters
 
 
-@app.get("/api/clusters/{cluster_name}/nodes", response_model=List[NodeDetail])
-async def get_cluster_nodes(cluster_name: str):
-    k8s = get_k8s_client(context=cluster_name)
-    return await asyncio.to_thread(k8s.get_nodes_with_pods)
+@app.get(
+    "/api/clusters/{cluster_name}/nodes",
+    response_model=List[NodeDetail],
+    responses=_NODES_RESPONSES,
+)
+async def get_cluster_nodes(
+    cluster_name: str,
+    request: Request,
+    output: NodesFormat = Query("json", alias="format"),
+):
+    return await _serve_nodes(cluster_name, output, request)
 
 
 @app.get("/api/clusters/{cluster_name}/summary", response_model=ClusterSummary)
 async def get_cluster_summary_by_name(cluster_name: str):
-    k8s = get_k8s_client(context=cluster_name)
-    return await asyncio.to_thread(k8s.get_cluster_summary)
+    return await _serve_snapshot(cluster_name, "cluster_summary")
+
+
+@app.get("/api/select", response_model=SelectorResult)
+async def select_default(
+    selector: str = "",
+    kind: Literal["nodes", "pods"] = "pods",
+    items: bool = True,
+):
+    """Nodes or pods matching a Kubernetes label selector, e.g.
+    ``team=ml-platform,env in (prod,staging)``; ``items=false`` returns
+    only counts and aggregate resources."""
+    return await _serve_selection(None, selector, kind, items)
+
+
+@app.get("/api/clusters/{cluster_name}/select", response_model=SelectorResult)
+async def select_cluster(
+    cluster_name: str,
+    selector: str = "",
+    kind: Literal["nodes", "pods"] = "pods",
+    items: bool = True,
+):
+    return await _serve_selection(cluster_name, selector, kind, items)
+
+
+GpuDimension = Literal["gpu_type", "zone", "pool", "ready"]
+
+
+@app.get("/api/gpu-capacity", response_model=GpuCapacity)
+async def gpu_capacity_default(
+    response: Response,
+    gpu_type: Optional[str] = None,
+    zone: Optional[str] = None,
+    pool: Optional[str] = None,
+    ready: Optional[Literal["true", "false"]] = None,
+    group_by: Optional[GpuDimension] = None,
+):
+    """GPU capacity for any combination of GPU type, zone, node pool and
+    ready state (omitted = all), optionally grouped by one dimension."""
+    filters = {"gpu_type": gpu_type, "zone": zone, "pool": pool, "ready": ready}
+    return await _serve_gpu_capacity(None, filters, group_by, response)
+
+
+@app.get("/api/clusters/{cluster_name}/gpu-capacity", response_model=GpuCapacity)
+async def gpu_capacity_cluster(
+    cluster_name: str,
+    response: Response,
+    gpu_type: Optional[str] = None,
+    zone: Optional[str] = None,
+    pool: Optional[str] = None,
+    ready: Optional[Literal["true", "false"]] = None,
+    group_by: Optional[GpuDimension] = None,
+):
+    filters = {"gpu_type": gpu_type, "zone": zone, "pool": pool, "ready": ready}
+    return await _serve_gpu_capacity(cluster_name, filters, group_by, response)
+
+
+@app.get("/api/gpu-fragmentation", response_model=List[GpuFragmentation])
+async def gpu_fragmentation_default(response: Response):
+    """Per GPU type: free GPUs per node, the largest request placeable on
+    one node, and free GPUs stranded by CPU or memory exhaustion."""
+    return await _serve_fragmentation(None, response)
+
+
+@app.get(
+    "/api/clusters/{cluster_name}/gpu-fragmentation",
+    response_model=List[GpuFragmentation],
+)
+async def gpu_fragmentation_cluster(cluster_name: str, response: Response):
+    return await _serve_fragmentation(cluster_name, response)
+
+
+@app.get("/api/workloads", response_model=List[WorkloadUsage])
+async def workloads_default(
+    response: Response,
+    namespace: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=0),
+):
+    """Pods and resources per top-level workload (Deployment, CronJob,
+    StatefulSet, operator resource, ...), most requested GPUs first."""
+    return await _serve_workloads(None, namespace, limit, response)
+
+
+@app.get("/api/clusters/{cluster_name}/workloads", response_model=List[WorkloadUsage])
+async def workloads_cluster(
+    cluster_name: str,
+    response: Response,
+    namespace: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=0),
+):
+    return await _serve_workloads(cluster_name, namespace, limit, response)
+
+
+ExportTable = Literal["nodes", "pods", "containers"]
+ExportFormat = Literal["parquet", "arrow"]
+
+
+@app.get("/api/export/{table}")
+async def export_default(
+    table: ExportTable,
+    output: ExportFormat = Query("parquet", alias="format"),
+    at: Optional[float] = None,
+):
+    """Flat nodes, pods or containers table of the snapshot for offline
+    analysis (pandas, DuckDB, Spark).  With *at* (epoch seconds), of the
+    kept snapshot at or before it instead."""
+    return await _serve_export(None, table, output, at)
+
+
+@app.get("/api/clusters/{cluster_name}/export/{table}")
+async def export_cluster(
+    cluster_name: str,
+    table: ExportTable,
+    output: ExportFormat = Query("parquet", alias="format"),
+    at: Optional[float] = None,
+):
+    return await _serve_export(cluster_name, table, output, at)
+
+
+@app.get("/api/diff", response_model=SnapshotDiff)
+async def diff_default(
+    base: Optional[float] = None,
+    target: Optional[float] = None,
+    limit: int = Query(1000, ge=0),
+):
+    """Pods, owners and namespaces that appeared, disappeared or changed
+    requests between the kept snapshot at or before *base* (epoch seconds;
+    default: the oldest kept) and the one at or before *target* (default:
+    the current snapshot)."""
+    return await _serve_diff(None, base, target, limit)
+
+
+@app.get("/api/clusters/{cluster_name}/diff", response_model=SnapshotDiff)
+async def diff_cluster(
+    cluster_name: str,
+    base: Optional[float] = None,
+    target: Optional[float] = None,
+    limit: int = Query(1000, ge=0),
+):
+    return await _serve_diff(cluster_name, base, target, limit)
+
+
+@app.get("/api/snapshot-history", response_model=SnapshotHistory)
+async def snapshot_history_default():
+    times = await asyncio.to_thread(snapshot_history, None)
+    return SnapshotHistory(cluster="default", fetched_at=times)
+
+
+@app.get("/api/clusters/{cluster_name}/snapshot-history", response_model=SnapshotHistory)
+async def snapshot_history_cluster(cluster_name: str):
+    await asyncio.to_thread(validate_context, cluster_name)
+    times = await asyncio.to_thread(snapshot_history, cluster_name)
+    return SnapshotHistory(cluster=cluster_name, fetched_at=times)
+
+
+@app.get("/api/idle-gpus", response_model=IdleGpuReport)
+async def idle_gpus_default():
+    """Pods whose GPUs stayed below IDLE_GPU_THRESHOLD utilization for the
+    whole IDLE_GPU_WINDOW, ranked by wasted GPU-hours."""
+    return await _serve_idle_gpus(None)
+
+
+@app.get("/api/clusters/{cluster_name}/idle-gpus", response_model=IdleGpuReport)
+async def idle_gpus_cluster(cluster_name: str):
+    return await _serve_idle_gpus(cluster_name)
+
+
+@app.get("/api/pending", response_model=PendingQueue)
+async def pending_default():
+    """Unscheduled pods with their requests, wait and scheduler reason,
+    pending GPU demand against free capacity per GPU type, and wait-time
+    percentiles."""
+    return await _serve_snapshot(None, "pending")
+
+
+@app.get("/api/clusters/{cluster_name}/pending", response_model=PendingQueue)
+async def pending_cluster(cluster_name: str):
+    return await _serve_snapshot(cluster_name, "pending")
+
+
+@app.get("/api/scope", response_model=ScopeStatus)
+async def scope_default():
+    """Namespaces covered by the snapshot (K8S_NAMESPACES) and which of
+    them failed to list."""
+    return await _serve_snapshot(None, "scope")
+
+
+@app.get("/api/clusters/{cluster_name}/scope", response_model=ScopeStatus)
+async def scope_cluster(cluster_name: str):
+    return await _serve_snapshot(cluster_name, "scope")
+
+
+@app.get("/api/refresh-schedule", response_model=List[RefreshTiming])
+async def get_refresh_schedule():
+    if app.state.scheduler is None:
+        return []
+    return app.state.scheduler.timings()
+
+
+@app.get("/api/executors", response_model=List[ExecutorStats])
+async def get_executors():
+    return executor_stats()
+
+
+@app.get("/api/connections", response_model=List[ConnectionStats])
+async def get_connections():
+    return connection_stats()
 
 
 # ---------------------------------------------------------------------------
@@ -82,7 +641,28 @@ if static_dir.exists():
             return FileResponse(file_path)
         return FileResponse(static_dir / "index.html")
 
+
+def _run_multi_worker(host: str, port: int, workers: int) -> None:
+    """One refresher process fills a shared cache; *workers* serve it."""
+    os.environ.setdefault("CACHE_BACKEND", "file")
+    os.environ.setdefault("CACHE_DIR", "/dev/shm/k8s-dashboard")
+    refresher = subprocess.Popen(
+        [sys.executable, "-m", "refresher"],
+        cwd=str(Path(__file__).parent),
+        env=os.environ.copy(),
+    )
+    os.environ["SNAPSHOT_READER"] = "1"
+    try:
+        uvicorn.run("main:app", host=host, port=port, workers=workers)
+    finally:
+        refresher.terminate()
+
+
 if __name__ == "__main__":
     host = os.getenv("DASHBOARD_HOST", "0.0.0.0")
     port = int(os.getenv("DASHBOARD_PORT", "8000"))
-    uvicorn.run(app, host=host, port=port)
+    workers = int(os.getenv("WORKERS", "1"))
+    if workers > 1:
+        _run_multi_worker(host, port, workers)
+    else:
+        uvicorn.run(app, host=host, port=port)
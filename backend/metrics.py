@@ -0,0 +1,247 @@
+"""Measured CPU, memory and GPU utilization (optional).
+
+``gpu_used`` and ``cpu_used_millicores`` are based on requests, so an idle
+GPU held by a pod looks fully used.  With ``METRICS_ENABLED=1`` every
+snapshot refresh also collects:
+
+- CPU and memory usage of nodes and pods from metrics-server
+  (``metrics.k8s.io``),
+- GPU utilization from every NVIDIA DCGM exporter pod, scraped through the
+  API server's pod proxy with at most ``METRICS_SCRAPE_CONCURRENCY``
+  scrapes in flight (fewer when the context's connection pool has no room
+  for them next to the node and pod lists).  The Prometheus text is parsed line by line as it
+  streams in, keeping only ``DCGM_FI_DEV_GPU_UTIL`` samples.
+
+The result is joined onto the snapshot's node and pod records.  Metrics are
+best effort: a missing metrics-server or an unreachable exporter is logged
+and leaves the affected fields empty.
+"""
+
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from models import parse_k8s_quantity
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration from environment
+# ---------------------------------------------------------------------------
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0") == "1"
+DCGM_EXPORTER_NAMESPACE = os.getenv("DCGM_EXPORTER_NAMESPACE", "")  # empty = all namespaces
+DCGM_EXPORTER_SELECTOR = os.getenv("DCGM_EXPORTER_SELECTOR", "app=nvidia-dcgm-exporter")
+DCGM_EXPORTER_PORT = int(os.getenv("DCGM_EXPORTER_PORT", "9400"))
+METRICS_SCRAPE_CONCURRENCY = int(os.getenv("METRICS_SCRAPE_CONCURRENCY", "8"))
+METRICS_SCRAPE_TIMEOUT = float(os.getenv("METRICS_SCRAPE_TIMEOUT", "10"))  # seconds
+
+GPU_UTIL_METRIC = "DCGM_FI_DEV_GPU_UTIL"
+
+_LABEL_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+_CPU_SUFFIXES = {"n": 1e-6, "u": 1e-3, "m": 1.0}
+
+
+@dataclass(slots=True)
+class Usage:
+    cpu_millicores: Optional[int] = None
+    memory_bytes: Optional[int] = None
+    gpu_utilization_percent: Optional[float] = None
+
+
+@dataclass
+class MetricsSnapshot:
+    collected_at: float
+    nodes: Dict[str, Usage] = field(default_factory=dict)
+    # (namespace, name) -> usage
+    pods: Dict[Tuple[str, str], Usage] = field(default_factory=dict)
+
+
+# ---------------------------------------------------------------------------
+# Prometheus text format
+# ---------------------------------------------------------------------------
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Split a stream of byte chunks into lines without buffering it all."""
+    rest = b""
+    for chunk in chunks:
+        lines = (rest + chunk).split(b"\n")
+        rest = lines.pop()
+        yield from lines
+    if rest:
+        yield rest
+
+
+def parse_prometheus_text(
+    lines: Iterable[bytes], names: Set[str]
+) -> Iterator[Tuple[str, Dict[str, str], float]]:
+    """Yield ``(metric, labels, value)`` for samples of the metrics in
+    *names*; other lines are skipped without being parsed."""
+    prefixes = tuple(name.encode() for name in names)
+    for raw in lines:
+        if not raw.startswith(prefixes):
+            continue
+        line = raw.decode("utf-8", "replace").strip()
+        brace = line.find("{")
+        if brace >= 0:
+            end = line.rfind("}")
+            name = line[:brace]
+            labels = {
+                k: v.replace('\\"', '"').replace("\\\\", "\\")
+                for k, v in _LABEL_RE.findall(line[brace + 1:end])
+            }
+            rest = line[end + 1:].split()
+        else:
+            name, *rest = line.split()
+            labels = {}
+        if name not in names or not rest:
+            continue
+        try:
+            value = float(rest[0])
+        except ValueError:
+            continue
+        if value == value:  # skip NaN
+            yield name, labels, value
+
+
+def _cpu_millicores(quantity: str) -> int:
+    """metrics-server reports CPU in nanocores ("123456n")."""
+    factor = _CPU_SUFFIXES.get(quantity[-1:])
+    if factor is None:
+        return int(float(quantity) * 1000)
+    return int(float(quantity[:-1]) * factor)
+
+
+def _mean(values: List[float]) -> float:
+    return round(sum(values) / len(values), 1)
+
+
+# ---------------------------------------------------------------------------
+# Collection
+# ---------------------------------------------------------------------------
+class MetricsCollector:
+    """Collects a MetricsSnapshot over *core*'s connection pool, holding at
+    most *concurrency* of its connections (metrics-server included)."""
+
+    def __init__(
+        self, core, connect_timeout: float, concurrency: int = METRICS_SCRAPE_CONCURRENCY
+    ):
+        from kubernetes import client
+
+        self._core = core
+        self._custom = client.CustomObjectsApi(api_client=core.api_client)
+        self._timeout = (connect_timeout, METRICS_SCRAPE_TIMEOUT)
+        self.concurrency = max(1, concurrency)
+
+    def collect(self) -> MetricsSnapshot:
+        snapshot = MetricsSnapshot(collected_at=time.time())
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            resource = pool.submit(self._resource_metrics, snapshot)
+            scrapes = [pool.submit(self._scrape_dcgm, pod) for pod in self._exporters()]
+            resource.result()
+            for future in scrapes:
+                result = future.result()
+                if result is None:
+                    continue
+                node, node_values, pod_values = result
+                if node_values:
+                    usage = snapshot.nodes.setdefault(node, Usage())
+                    usage.gpu_utilization_percent = _mean(node_values)
+                for key, values in pod_values.items():
+                    usage = snapshot.pods.setdefault(key, Usage())
+                    usage.gpu_utilization_percent = _mean(values)
+        return snapshot
+
+    def _resource_metrics(self, snapshot: MetricsSnapshot) -> None:
+        try:
+            nodes = self._custom.list_cluster_custom_object(
+                "metrics.k8s.io", "v1beta1", "nodes", _request_timeout=self._timeout
+            )
+            pods = self._custom.list_cluster_custom_object(
+                "metrics.k8s.io", "v1beta1", "pods", _request_timeout=self._timeout
+            )
+        except Exception as exc:
+            logger.warning("metrics.k8s.io unavailable: %s", exc)
+            return
+        for item in nodes.get("items", []):
+            usage = snapshot.nodes.setdefault(item["metadata"]["name"], Usage())
+            usage.cpu_millicores = _cpu_millicores(item["usage"]["cpu"])
+            usage.memory_bytes = parse_k8s_quantity(item["usage"]["memory"])
+        for item in pods.get("items", []):
+            meta = item["metadata"]
+            containers = item.get("containers", [])
+            usage = snapshot.pods.setdefault((meta["namespace"], meta["name"]), Usage())
+            usage.cpu_millicores = sum(_cpu_millicores(c["usage"]["cpu"]) for c in containers)
+            usage.memory_bytes = sum(parse_k8s_quantity(c["usage"]["memory"]) for c in containers)
+
+    def _exporters(self) -> list:
+        try:
+            if DCGM_EXPORTER_NAMESPACE:
+                result = self._core.list_namespaced_pod(
+                    DCGM_EXPORTER_NAMESPACE,
+                    label_selector=DCGM_EXPORTER_SELECTOR,
+                    _request_timeout=self._timeout,
+                )
+            else:
+                result = self._core.list_pod_for_all_namespaces(
+                    label_selector=DCGM_EXPORTER_SELECTOR, _request_timeout=self._timeout
+                )
+        except Exception as exc:
+            logger.warning("Listing DCGM exporters failed: %s", exc)
+            return []
+        return [
+            p for p in result.items if p.spec.node_name and p.status.phase == "Running"
+        ]
+
+    def _scrape_dcgm(
+        self, exporter
+    ) -> Optional[Tuple[str, List[float], Dict[Tuple[str, str], List[float]]]]:
+        """GPU utilization samples of one exporter: the node's GPUs, and
+        per pod the GPUs it is using."""
+        meta = exporter.metadata
+        try:
+            response = self._core.connect_get_namespaced_pod_proxy_with_path(
+                f"{meta.name}:{DCGM_EXPORTER_PORT}",
+                meta.namespace,
+                "metrics",
+                _preload_content=False,
+                _request_timeout=self._timeout,
+            )
+        except Exception as exc:
+            logger.warning("Scraping %s/%s failed: %s", meta.namespace, meta.name, exc)
+            return None
+        node_values: List[float] = []
+        pod_values: Dict[Tuple[str, str], List[float]] = {}
+        try:
+            lines = iter_lines(response.stream(64 * 1024))
+            for _, labels, value in parse_prometheus_text(lines, {GPU_UTIL_METRIC}):
+                node_values.append(value)
+                pod = labels.get("pod") or labels.get("exported_pod")
+                namespace = labels.get("namespace") or labels.get("exported_namespace")
+                if pod and namespace:
+                    pod_values.setdefault((namespace, pod), []).append(value)
+        except Exception as exc:
+            logger.warning("Reading metrics of %s/%s failed: %s", meta.namespace, meta.name, exc)
+            return None
+        finally:
+            response.release_conn()
+        return exporter.spec.node_name, node_values, pod_values
+
+
+def join_usage(nodes: list, snapshot: MetricsSnapshot) -> None:
+    """Copy measured usage from *snapshot* onto freshly built node and pod
+    records (before they are shared)."""
+    for node in nodes:
+        usage = snapshot.nodes.get(node.name)
+        if usage is not None:
+            node.cpu_usage_millicores = usage.cpu_millicores
+            node.memory_usage_bytes = usage.memory_bytes
+            node.gpu_utilization_percent = usage.gpu_utilization_percent
+        for pod in node.pods:
+            usage = snapshot.pods.get((pod.namespace, pod.name))
+            if usage is not None:
+                pod.cpu_usage_millicores = usage.cpu_millicores
+                pod.memory_usage_bytes = usage.memory_bytes
+                pod.gpu_utilization_percent = usage.gpu_utilization_percent
@@ -51,11 +51,17 @@ def _make_pod(
     labels=None,
     containers=None,
 ):
+    # Deployment pods are owned by a ReplicaSet named "<deployment>-<hash>"
+    workload_kind, workload_name = owner_kind, owner_name
+    if owner_kind == "ReplicaSet":
+        workload_kind, workload_name = "Deployment", owner_name.rsplit("-", 1)[0]
     return {
         "name": name,
         "namespace": ns,
         "owner_kind": owner_kind,
         "owner_name": owner_name,
+        "workload_kind": workload_kind,
+        "workload_name": workload_name,
         "phase": phase,
         "gpu_request": gpu_req,
         "gpu_limit": gpu_lim,
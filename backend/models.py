@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List, Dict
+from typing import Any, Optional, List, Dict
 
 
 def parse_k8s_quantity(quantity_str: str) -> int:
@@ -99,6 +99,13 @@ class PodDetail(BaseModel):
     ip: Optional[str] = None
     qos_class: Optional[str] = None  # Guaranteed, Burstable, BestEffort
     labels: Dict[str, str] = {}
+    # Measured usage (METRICS_ENABLED=1); None when not collected
+    cpu_usage_millicores: Optional[int] = None
+    memory_usage_bytes: Optional[int] = None
+    gpu_utilization_percent: Optional[float] = None
+    # Top-level controller: Deployment, CronJob, an operator's resource, ...
+    workload_kind: str = ""
+    workload_name: str = ""
 
 
 class ResourceStat(BaseModel):
@@ -157,9 +164,301 @@ class NodeDetail(BaseModel):
     os: str = ""
     arch: str = ""
     kubelet_version: str = ""
+    # Measured usage (METRICS_ENABLED=1); None when not collected
+    cpu_usage_millicores: Optional[int] = None
+    memory_usage_bytes: Optional[int] = None
+    gpu_utilization_percent: Optional[float] = None
 
 
 class ClusterInfo(BaseModel):
     """Info about an available Kubernetes cluster context."""
     name: str
     is_active: bool = False
+
+
+class ConnectionStats(BaseModel):
+    """Connection pool usage for one cluster context."""
+    context: str
+    pool_maxsize: int = 0
+    connections_opened: int = 0
+    requests: int = 0
+    connections_reused: int = 0
+
+
+class ContextReadiness(BaseModel):
+    """Cache warmth of one cluster context, reported by /readyz."""
+    context: str
+    warm: bool = False
+    required: bool = False  # listed in READY_REQUIRE_WARM
+    age_seconds: Optional[float] = None
+    last_error: Optional[str] = None
+    last_error_age_seconds: Optional[float] = None
+    circuit: str = "closed"  # closed, open, half_open
+
+
+class Readiness(BaseModel):
+    status: str  # ready, warming
+    contexts: List[ContextReadiness] = []
+
+
+class RefreshTiming(BaseModel):
+    """Adaptive background refresh state for one cluster context."""
+    context: str
+    interval_seconds: float
+    next_refresh_in_seconds: float
+    refreshing: bool = False
+    last_duration_seconds: Optional[float] = None
+    last_refresh_age_seconds: Optional[float] = None
+    last_churn_percent: Optional[float] = None  # pods added/removed/changed phase
+    refresh_count: int = 0
+
+
+class ExecutorStats(BaseModel):
+    """Queue depth and wait times of one context's request executor."""
+    context: str
+    workers: int
+    queue_limit: int
+    running: int = 0
+    queued: int = 0
+    submitted: int = 0
+    rejected: int = 0
+    avg_wait_ms: float = 0.0  # moving average of time spent queued
+    max_wait_ms: float = 0.0
+    avg_run_ms: float = 0.0
+
+
+class PodMatch(BaseModel):
+    """A pod and the node it runs on."""
+    node: str
+    pod: PodDetail
+
+
+class SelectorResult(BaseModel):
+    """Nodes or pods matching a label selector, with aggregate resources."""
+    kind: str  # nodes, pods
+    selector: str
+    count: int = 0
+    # Summed pod requests (kind=pods) or used resources (kind=nodes)
+    gpu_requested: int = 0
+    cpu_requested_millicores: int = 0
+    memory_requested_bytes: int = 0
+    summary: Optional[ClusterSummary] = None  # kind=nodes
+    nodes: List[NodeDetail] = []
+    pods: List[PodMatch] = []
+
+
+class GpuCapacityCell(BaseModel):
+    """GPU capacity of one cell of the type x zone x pool x ready cube;
+    "*" means all values of that dimension."""
+    gpu_type: str = "*"
+    zone: str = "*"
+    pool: str = "*"
+    ready: str = "*"  # true, false, *
+    node_count: int = 0
+    gpu_total: int = 0
+    gpu_allocatable: int = 0
+    gpu_used: int = 0
+    gpu_available: int = 0
+    utilization_percent: float = 0.0
+
+
+class GpuCapacity(BaseModel):
+    group_by: Optional[str] = None
+    total: GpuCapacityCell
+    groups: List[GpuCapacityCell] = []
+
+
+class FreeGpuBucket(BaseModel):
+    free_gpus: int
+    node_count: int
+
+
+class GpuFragmentation(BaseModel):
+    """How free GPUs of one type are spread over ready nodes."""
+    gpu_type: str
+    node_count: int = 0
+    free_gpus: int = 0
+    free_histogram: List[FreeGpuBucket] = []
+    largest_placeable_request: int = 0  # GPUs one pod can still get on one node
+    stranded_gpus: int = 0  # free, but the node is out of CPU or memory
+    stranded_by_cpu: int = 0
+    stranded_by_memory: int = 0
+
+
+class IdleGpuPod(BaseModel):
+    """A pod holding GPUs that have been near-idle for the whole window."""
+    name: str
+    namespace: str
+    node: str
+    owner_kind: str
+    owner_name: str
+    gpu_type: str = "N/A"
+    gpu_request: int = 0
+    idle_seconds: float = 0.0  # since the first of the consecutive idle samples
+    wasted_gpu_hours: float = 0.0  # gpu_request x idle time
+    mean_utilization_percent: float = 0.0  # over the samples in the window
+    samples: int = 0
+
+
+class IdleGpuReport(BaseModel):
+    """Idle GPU pods ranked by wasted GPU-hours (METRICS_ENABLED=1)."""
+    window_seconds: int = 0
+    threshold_percent: float = 0.0
+    tracked_pods: int = 0  # GPU pods with utilization samples
+    idle_gpus: int = 0
+    wasted_gpu_hours: float = 0.0
+    pods: List[IdleGpuPod] = []
+
+
+class NamespaceUsage(BaseModel):
+    """Requested (and, with METRICS_ENABLED=1, measured) usage of one namespace."""
+    namespace: str
+    pod_count: int = 0
+    gpu_request: int = 0
+    cpu_request_millicores: int = 0
+    memory_request_bytes: int = 0
+    cpu_usage_millicores: Optional[int] = None
+    memory_usage_bytes: Optional[int] = None
+
+
+class WorkloadUsage(BaseModel):
+    """Requested (and measured) usage of one top-level workload."""
+    namespace: str
+    kind: str  # Deployment, CronJob, StatefulSet, an operator's kind, ...
+    name: str
+    pod_count: int = 0
+    node_count: int = 0
+    gpu_request: int = 0
+    cpu_request_millicores: int = 0
+    memory_request_bytes: int = 0
+    cpu_usage_millicores: Optional[int] = None
+    memory_usage_bytes: Optional[int] = None
+    gpu_utilization_percent: Optional[float] = None  # mean over its GPU pods
+    owners: List[str] = []  # direct owners of its pods ("kind/name")
+
+
+class FieldChange(BaseModel):
+    field: str
+    old: Any = None
+    new: Any = None
+
+
+class PodRef(BaseModel):
+    """A pod that appeared or disappeared between two snapshots."""
+    name: str
+    namespace: str
+    node: str
+    owner_kind: str
+    owner_name: str
+    phase: str
+    gpu_request: int = 0
+    cpu_request_millicores: int = 0
+    memory_request_bytes: int = 0
+
+
+class PodChange(BaseModel):
+    name: str
+    namespace: str
+    node: str  # in the newer snapshot
+    changes: List[FieldChange] = []
+
+
+class NodeChange(BaseModel):
+    name: str
+    changes: List[FieldChange] = []
+
+
+class ResourceDelta(BaseModel):
+    """Change of requested resources for a namespace, owner or the cluster
+    (newer minus older)."""
+    key: str  # namespace, "namespace/OwnerKind/owner" or "total"
+    pods_added: int = 0
+    pods_removed: int = 0
+    pods_changed: int = 0
+    gpu_request: int = 0
+    cpu_request_millicores: int = 0
+    memory_request_bytes: int = 0
+
+
+class SnapshotDiff(BaseModel):
+    """Differences between two snapshots of one cluster.  Item lists are
+    capped at ``limit`` entries; ``total`` and ``nodes_changed_count``
+    count everything."""
+    base_fetched_at: Optional[float] = None
+    target_fetched_at: Optional[float] = None
+    total: ResourceDelta = ResourceDelta(key="total")
+    nodes_added: List[str] = []
+    nodes_removed: List[str] = []
+    nodes_changed: List[NodeChange] = []
+    nodes_changed_count: int = 0
+    pods_added: List[PodRef] = []
+    pods_removed: List[PodRef] = []
+    pods_changed: List[PodChange] = []
+    namespaces: List[ResourceDelta] = []  # largest GPU change first
+    owners: List[ResourceDelta] = []
+
+
+class SnapshotHistory(BaseModel):
+    """Snapshots kept for diffs (SNAPSHOT_HISTORY)."""
+    cluster: str
+    fetched_at: List[int] = []  # epoch seconds, oldest first
+
+
+class NamespaceStatus(BaseModel):
+    """Outcome of listing the pods of one namespace."""
+    namespace: str
+    ok: bool = True
+    pod_count: int = 0
+    error: Optional[str] = None
+
+
+class ScopeStatus(BaseModel):
+    """What the current snapshot covers (K8S_NAMESPACES)."""
+    namespaces_scoped: bool = False  # False: all namespaces
+    namespaces: List[NamespaceStatus] = []
+    nodes_listed: bool = True  # False: nodes were not readable
+
+
+class PendingPod(BaseModel):
+    """A pod not yet bound to a node."""
+    name: str
+    namespace: str
+    workload_kind: str = ""
+    workload_name: str = ""
+    gpu_type: str = ""  # required through nodeSelector / node affinity; "any" if unconstrained
+    gpu_request: int = 0
+    cpu_request_millicores: int = 0
+    memory_request_bytes: int = 0
+    created_at: Optional[str] = None
+    wait_seconds: float = 0.0
+    reason: Optional[str] = None  # PodScheduled condition: Unschedulable, SchedulingGated, ...
+    message: Optional[str] = None  # e.g. "0/12 nodes are available: 12 Insufficient nvidia.com/gpu"
+
+
+class GpuTypePressure(BaseModel):
+    """Pending GPU demand of one GPU type against its free capacity."""
+    gpu_type: str
+    pending_pods: int = 0
+    gpu_requested: int = 0
+    free_gpus: int = 0  # on ready nodes; for "any", across all types
+    largest_free_on_node: int = 0
+    shortfall: int = 0  # requested beyond free
+    unplaceable_pods: int = 0  # request larger than the free GPUs of any single node
+
+
+class WaitPercentiles(BaseModel):
+    count: int = 0
+    p50: Optional[float] = None  # seconds
+    p90: Optional[float] = None
+    p99: Optional[float] = None
+    max: Optional[float] = None
+
+
+class PendingQueue(BaseModel):
+    """Unscheduled pods as of one snapshot, longest waiting first."""
+    pod_count: int = 0
+    gpu_pod_count: int = 0
+    pods: List[PendingPod] = []  # at most PENDING_MAX_PODS
+    gpu_types: List[GpuTypePressure] = []  # largest shortfall first
+    waiting: WaitPercentiles = WaitPercentiles()  # pods still pending
+    scheduled: WaitPercentiles = WaitPercentiles()  # recently scheduled pods
@@ -0,0 +1,333 @@
+"""Top-level workload of a pod, from a watched graph of controllers.
+
+A pod's first owner reference names its direct controller: a ReplicaSet
+with a hash suffix for a Deployment, a Job for a CronJob, a StatefulSet for
+an operator's custom resource.  An OwnerGraph lists ReplicaSets, Jobs and
+StatefulSets once per kind (in pages) and then follows a watch on each, so
+resolving a pod needs no API call.  It keeps, per object that has a
+controller, only the controller's (kind, name), so following a chain is a
+dict lookup per level and chains are at most a few levels deep.
+
+Objects of other kinds (Deployments, CronJobs, custom resources, ...) are
+the top of their chain.  Until a kind is synced, or when listing it is
+forbidden, pods resolve to their direct owner.
+
+Each watch holds a pooled connection for as long as it runs.  For a context
+whose pods are listed per namespace, ``OwnerGraph.create`` therefore asks
+the API server (SelfSubjectAccessReview) whether the kinds may be watched
+cluster-wide, which takes three watches.  If not, it watches per namespace
+(three watches each) only up to ``OWNER_MAX_NAMESPACES`` namespaces, and
+otherwise leaves pods resolved to their direct owner.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from records import intern
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration from environment
+# ---------------------------------------------------------------------------
+OWNER_GRAPH_ENABLED = os.getenv("OWNER_GRAPH_ENABLED", "1") == "1"
+OWNER_WATCH_TIMEOUT = int(os.getenv("OWNER_WATCH_TIMEOUT", "300"))  # seconds per watch call
+OWNER_LIST_PAGE_SIZE = int(os.getenv("OWNER_LIST_PAGE_SIZE", "500"))
+OWNER_SYNC_WAIT = float(os.getenv("OWNER_SYNC_WAIT", "5"))  # first snapshot waits this long
+# Namespace-scoped mode without cluster-wide RBAC: watch per namespace up to
+# this many namespaces (3 connections each), else no graph
+OWNER_MAX_NAMESPACES = int(os.getenv("OWNER_MAX_NAMESPACES", "0"))
+
+# kind -> (API class, list in all namespaces, list in one namespace)
+KINDS = {
+    "ReplicaSet": (
+        "AppsV1Api", "list_replica_set_for_all_namespaces", "list_namespaced_replica_set",
+    ),
+    "Job": ("BatchV1Api", "list_job_for_all_namespaces", "list_namespaced_job"),
+    "StatefulSet": (
+        "AppsV1Api", "list_stateful_set_for_all_namespaces", "list_namespaced_stateful_set",
+    ),
+}
+
+# kind -> (API group, resource) for access reviews
+_RESOURCES = {
+    "ReplicaSet": ("apps", "replicasets"),
+    "Job": ("batch", "jobs"),
+    "StatefulSet": ("apps", "statefulsets"),
+}
+
+# Guards against reference cycles
+_MAX_DEPTH = 8
+
+Owner = Tuple[str, str]  # (kind, name)
+
+
+def can_watch_cluster_wide(api_client, timeout) -> bool:
+    """Whether RBAC lets this identity list and watch every kind in all
+    namespaces, per SelfSubjectAccessReview."""
+    from kubernetes import client
+
+    api = client.AuthorizationV1Api(api_client=api_client)
+    for group, resource in _RESOURCES.values():
+        for verb in ("list", "watch"):
+            review = client.V1SelfSubjectAccessReview(
+                spec=client.V1SelfSubjectAccessReviewSpec(
+                    resource_attributes=client.V1ResourceAttributes(
+                        group=group, resource=resource, verb=verb
+                    )
+                )
+            )
+            result = api.create_self_subject_access_review(review, _request_timeout=timeout)
+            if not result.status.allowed:
+                return False
+    return True
+
+
+def watch_connections(namespaces: Optional[List[str]] = None) -> int:
+    """Most pooled connections the watches of ``OwnerGraph.create`` can hold
+    for a context listed in *namespaces* (all when None)."""
+    if not OWNER_GRAPH_ENABLED:
+        return 0
+    scopes = 1
+    if namespaces and len(namespaces) <= OWNER_MAX_NAMESPACES:
+        scopes = len(namespaces)
+    return len(KINDS) * scopes
+
+
+def controller_ref(owner_references) -> Optional[object]:
+    """The owner reference marked as controller, else the first one."""
+    if not owner_references:
+        return None
+    for ref in owner_references:
+        if ref.controller:
+            return ref
+    return owner_references[0]
+
+
+class _KindWatch:
+    """Controller of every object of one kind, in all namespaces or in
+    one, kept current by list + watch."""
+
+    def __init__(self, graph: "OwnerGraph", kind: str, api, namespace: Optional[str]):
+        self._graph = graph
+        self.kind = kind
+        self.namespace = namespace
+        _, list_all, list_namespaced = KINDS[kind]
+        if namespace is None:
+            self._list = getattr(api, list_all)
+            self._args: tuple = ()
+        else:
+            self._list = getattr(api, list_namespaced)
+            self._args = (namespace,)
+        # "namespace/name" -> controller (kind, name); objects without one are left out
+        self.parents: Dict[str, Owner] = {}
+        self.synced = threading.Event()
+        self.resource_version: Optional[str] = None
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def label(self) -> str:
+        return f"{self.kind}/{self.namespace}" if self.namespace else self.kind
+
+    def _apply(self, event_type: str, obj) -> None:
+        meta = obj.metadata
+        key = f"{meta.namespace}/{meta.name}"
+        ref = controller_ref(meta.owner_references) if event_type != "DELETED" else None
+        if ref is None:
+            self.parents.pop(key, None)
+        else:
+            self.parents[key] = (intern(ref.kind), intern(ref.name))
+
+    def _relist(self, timeout) -> None:
+        parents: Dict[str, Owner] = {}
+        continue_token = None
+        while True:
+            page = self._list(
+                *self._args,
+                limit=OWNER_LIST_PAGE_SIZE,
+                _continue=continue_token,
+                _request_timeout=timeout,
+            )
+            for obj in page.items:
+                ref = controller_ref(obj.metadata.owner_references)
+                if ref is not None:
+                    key = f"{obj.metadata.namespace}/{obj.metadata.name}"
+                    parents[key] = (intern(ref.kind), intern(ref.name))
+            continue_token = page.metadata._continue
+            if not continue_token:
+                break
+        # Swapped whole: readers never see a half-built map
+        self.parents = parents
+        self.resource_version = page.metadata.resource_version
+        self.synced.set()
+        logger.info(
+            "Owner graph for %s synced: %d %s with a controller",
+            self._graph.name, len(parents), self.label,
+        )
+
+    def _watch(self, connect_timeout: float) -> None:
+        from kubernetes import watch
+
+        w = watch.Watch()
+        for event in w.stream(
+            self._list,
+            *self._args,
+            resource_version=self.resource_version,
+            allow_watch_bookmarks=True,
+            timeout_seconds=OWNER_WATCH_TIMEOUT,
+            _request_timeout=(connect_timeout, OWNER_WATCH_TIMEOUT + 30),
+        ):
+            if self._graph.stopped:
+                w.stop()
+                return
+            if event["type"] == "ERROR":
+                # Unexpected watch error: resynchronize from a fresh list
+                raise RuntimeError(f"watch error: {event['raw_object']}")
+            if event["type"] != "BOOKMARK":
+                self._apply(event["type"], event["object"])
+                self._graph.events += 1
+            self.resource_version = w.resource_version
+
+    def run(self, connect_timeout: float, read_timeout: float) -> None:
+        from kubernetes.client.exceptions import ApiException
+
+        backoff = 1.0
+        needs_list = True
+        while not self._graph.stopped:
+            try:
+                if needs_list:
+                    self._relist((connect_timeout, read_timeout))
+                    needs_list = False
+                self._watch(connect_timeout)
+                backoff = 1.0
+            except ApiException as exc:
+                if exc.status == 410:
+                    # resourceVersion too old: start over from a fresh list
+                    needs_list = True
+                    continue
+                if exc.status == 403:
+                    # Not granted (see the Helm chart's RBAC); retried rarely
+                    backoff = 600.0
+                logger.warning(
+                    "Owner watch of %s for %s failed: %s", self.label, self._graph.name, exc.reason
+                )
+                self._graph.wait(backoff)
+                backoff = min(backoff * 2, 600.0)
+            except Exception:
+                logger.exception("Owner watch of %s for %s failed", self.label, self._graph.name)
+                needs_list = True
+                self._graph.wait(backoff)
+                backoff = min(backoff * 2, 60.0)
+
+
+class OwnerGraph:
+    """Controllers of ReplicaSets, Jobs and StatefulSets for one context.
+
+    *api_client* is the context's ApiClient; with *namespaces* each kind is
+    listed and watched per namespace instead of cluster-wide.
+    """
+
+    def __init__(
+        self,
+        api_client,
+        name: str,
+        connect_timeout: float,
+        read_timeout: float,
+        namespaces: Optional[List[str]] = None,
+    ):
+        from kubernetes import client
+
+        self.name = name
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        self._stop = threading.Event()
+        self._waited = False
+        self.events = 0
+        self.synced_at: Optional[float] = None
+        apis = {}
+        # (kind, namespace or None) -> watch
+        self._watches: Dict[Tuple[str, Optional[str]], _KindWatch] = {}
+        for kind, (api_class, _, _) in KINDS.items():
+            api = apis.get(api_class)
+            if api is None:
+                api = apis[api_class] = getattr(client, api_class)(api_client=api_client)
+            for namespace in namespaces or [None]:
+                self._watches[(kind, namespace)] = _KindWatch(self, kind, api, namespace)
+
+    @classmethod
+    def create(
+        cls,
+        api_client,
+        name: str,
+        connect_timeout: float,
+        read_timeout: float,
+        namespaces: Optional[List[str]] = None,
+    ) -> Optional["OwnerGraph"]:
+        """Graph for a context whose pods are listed in *namespaces* (all
+        when None): cluster-wide when RBAC allows it, else per namespace for
+        at most OWNER_MAX_NAMESPACES namespaces, else None.  Raises if the
+        access review fails."""
+        if namespaces:
+            if can_watch_cluster_wide(api_client, (connect_timeout, read_timeout)):
+                namespaces = None
+            elif len(namespaces) > OWNER_MAX_NAMESPACES:
+                logger.info(
+                    "Owner graph for %s disabled: %d namespaces and no cluster-wide access "
+                    "(OWNER_MAX_NAMESPACES=%d); pods resolve to their direct owner",
+                    name, len(namespaces), OWNER_MAX_NAMESPACES,
+                )
+                return None
+        return cls(api_client, name, connect_timeout, read_timeout, namespaces=namespaces)
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def wait(self, seconds: float) -> None:
+        self._stop.wait(seconds)
+
+    def start(self) -> None:
+        for watch in self._watches.values():
+            watch.thread = threading.Thread(
+                target=watch.run,
+                args=(self._connect_timeout, self._read_timeout),
+                name=f"owners-{self.name}-{watch.label}",
+                daemon=True,
+            )
+            watch.thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def wait_synced(self, timeout: float) -> bool:
+        """Wait up to *timeout* for every kind to be listed, on the first
+        call only; later calls return at once."""
+        if not self._waited:
+            self._waited = True
+            deadline = time.monotonic() + timeout
+            for watch in self._watches.values():
+                if not watch.synced.wait(max(0.0, deadline - time.monotonic())):
+                    break
+        synced = all(w.synced.is_set() for w in self._watches.values())
+        if synced and self.synced_at is None:
+            self.synced_at = time.time()
+        return synced
+
+    def tracked(self) -> int:
+        return sum(len(w.parents) for w in self._watches.values())
+
+    def resolve(self, namespace: str, kind: str, name: str) -> Owner:
+        """Top of the controller chain starting at *kind*/*name*."""
+        watches = self._watches
+        for _ in range(_MAX_DEPTH):
+            watch = watches.get((kind, None)) or watches.get((kind, namespace))
+            if watch is None:
+                break
+            parent = watch.parents.get(f"{namespace}/{name}")
+            if parent is None:
+                break
+            kind, name = parent
+        return kind, name
@@ -0,0 +1,220 @@
+"""Queue of pods waiting for a node, and GPU demand against free capacity.
+
+Pods without ``spec.nodeName`` have no node to be listed under in the
+nodes snapshot.  On each snapshot a PendingQueueTracker receives them
+instead and brings its state up to date incrementally: only pods that
+entered or left the queue (or changed their requests) touch the per-GPU-
+type demand counters and the list of pending pods ordered by creation
+time, from which the longest waiting pods and wait percentiles are read
+without sorting.  Pods that left the queue for a node contribute their
+wait to a bounded history of the last ``PENDING_WAIT_SAMPLES`` waits.
+
+A pod's GPU type is the one it requires through ``nodeSelector`` or
+required node affinity on a GPU type label; GPU pods without such a
+constraint are counted under ``"any"``.
+"""
+
+import bisect
+import math
+import os
+import threading
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from models import GpuTypePressure, PendingPod, PendingQueue, WaitPercentiles
+from records import NodeRecord, PodRecord
+
+# ---------------------------------------------------------------------------
+# Configuration from environment
+# ---------------------------------------------------------------------------
+PENDING_MAX_PODS = int(os.getenv("PENDING_MAX_PODS", "500"))          # pods listed per report
+PENDING_WAIT_SAMPLES = int(os.getenv("PENDING_WAIT_SAMPLES", "1024"))  # scheduled waits kept
+
+ANY_GPU_TYPE = "any"
+
+# Queue changes above which the order is rebuilt instead of bisected
+_BULK = 64
+
+
+@dataclass(slots=True)
+class PendingPodRecord:
+    pod: PodRecord
+    gpu_type: str = ""  # "" for pods without GPU requests
+    created: float = 0.0  # epoch seconds
+    reason: Optional[str] = None
+    message: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.pod.namespace}/{self.pod.name}"
+
+
+class _Demand:
+    __slots__ = ("pods", "gpus", "sizes")
+
+    def __init__(self):
+        self.pods = 0
+        self.gpus = 0
+        self.sizes: Counter = Counter()  # GPUs requested -> pods
+
+
+def _percentiles(n: int, value_at: Callable[[int], float]) -> WaitPercentiles:
+    """Nearest-rank percentiles of *n* values; ``value_at(i)`` is the i-th
+    smallest."""
+    if not n:
+        return WaitPercentiles()
+
+    def pick(q: float) -> float:
+        return round(value_at(max(0, math.ceil(q * n) - 1)), 1)
+
+    return WaitPercentiles(count=n, p50=pick(0.5), p90=pick(0.9), p99=pick(0.99), max=pick(1.0))
+
+
+class PendingQueueTracker:
+    def __init__(self):
+        # "namespace/name" -> pending pod
+        self._pods: Dict[str, PendingPodRecord] = {}
+        # (created, key) of every pending pod, oldest first
+        self._order: List[Tuple[float, str]] = []
+        self._demand: Dict[str, _Demand] = {}
+        # gpu type -> (free GPUs on ready nodes, largest free on one node)
+        self._free: Dict[str, Tuple[int, int]] = {}
+        # Seconds that recently scheduled pods spent pending
+        self._waits: deque = deque(maxlen=PENDING_WAIT_SAMPLES)
+        self._lock = threading.Lock()
+        self.observed_at: Optional[float] = None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._pods
+
+    def __len__(self) -> int:
+        return len(self._pods)
+
+    def _reorder(self, added: List[Tuple[float, str]], removed: set) -> None:
+        """Keep the creation order sorted: bisect for a few changes, one
+        filter and sort pass (nearly sorted, so linear) for many."""
+        order = self._order
+        if len(added) + len(removed) > _BULK:
+            if removed:
+                order = [entry for entry in order if entry not in removed]
+            order.extend(added)
+            order.sort()
+            self._order = order
+            return
+        for entry in removed:
+            i = bisect.bisect_left(order, entry)
+            if i < len(order) and order[i] == entry:
+                del order[i]
+        for entry in added:
+            bisect.insort(order, entry)
+
+    def _apply(self, record: PendingPodRecord, sign: int) -> None:
+        gpus = record.pod.gpu_request
+        if gpus <= 0:
+            return
+        demand = self._demand.get(record.gpu_type)
+        if demand is None:
+            demand = self._demand[record.gpu_type] = _Demand()
+        demand.pods += sign
+        demand.gpus += sign * gpus
+        demand.sizes[gpus] += sign
+        if demand.sizes[gpus] == 0:
+            del demand.sizes[gpus]
+        if demand.pods == 0:
+            del self._demand[record.gpu_type]
+
+    def observe(
+        self,
+        pending: List[PendingPodRecord],
+        scheduled_waits: List[float],
+        nodes: List[NodeRecord],
+        at: float,
+    ) -> None:
+        """Bring the queue up to date with the unscheduled pods of a
+        snapshot fetched at *at*.  *scheduled_waits* are the waits of pods
+        of the previous queue that are now bound to a node."""
+        free: Dict[str, List[int]] = {}
+        for node in nodes:
+            if node.gpu_allocatable <= 0 or not node.conditions_ready:
+                continue
+            available = max(0, node.gpu_allocatable - node.gpu_used)
+            for gpu_type in (node.gpu_type, ANY_GPU_TYPE):
+                stats = free.setdefault(gpu_type, [0, 0])
+                stats[0] += available
+                stats[1] = max(stats[1], available)
+
+        current = {record.key: record for record in pending}
+        added: List[Tuple[float, str]] = []
+        removed = set()
+        with self._lock:
+            for key, old in list(self._pods.items()):
+                new = current.get(key)
+                if new is None or (new.created, new.gpu_type, new.pod.gpu_request) != (
+                    old.created, old.gpu_type, old.pod.gpu_request
+                ):
+                    self._apply(old, -1)
+                    removed.add((old.created, key))
+                    del self._pods[key]
+            for key, new in current.items():
+                if key not in self._pods:
+                    self._apply(new, 1)
+                    added.append((new.created, key))
+                # Latest requests and scheduler reason
+                self._pods[key] = new
+            self._reorder(added, removed)
+            self._waits.extend(scheduled_waits)
+            self._free = {t: (s[0], s[1]) for t, s in free.items()}
+            self.observed_at = at
+
+    def report(self) -> PendingQueue:
+        now = self.observed_at or 0.0
+        with self._lock:
+            order = self._order
+            pods = []
+            for created, key in order[:PENDING_MAX_PODS]:
+                record = self._pods[key]
+                pod = record.pod
+                pods.append(PendingPod(
+                    name=pod.name,
+                    namespace=pod.namespace,
+                    workload_kind=pod.workload_kind,
+                    workload_name=pod.workload_name,
+                    gpu_type=record.gpu_type,
+                    gpu_request=pod.gpu_request,
+                    cpu_request_millicores=pod.cpu_request_millicores,
+                    memory_request_bytes=pod.memory_request_bytes,
+                    created_at=pod.created_at,
+                    wait_seconds=round(max(0.0, now - created), 1),
+                    reason=record.reason,
+                    message=record.message,
+                ))
+            pressure = []
+            for gpu_type, demand in self._demand.items():
+                free, largest = self._free.get(gpu_type, (0, 0))
+                pressure.append(GpuTypePressure(
+                    gpu_type=gpu_type,
+                    pending_pods=demand.pods,
+                    gpu_requested=demand.gpus,
+                    free_gpus=free,
+                    largest_free_on_node=largest,
+                    shortfall=max(0, demand.gpus - free),
+                    unplaceable_pods=sum(
+                        count for size, count in demand.sizes.items() if size > largest
+                    ),
+                ))
+            count = len(order)
+            # Newest pods wait the least: reversed creation order is ascending wait
+            waiting = _percentiles(count, lambda i: max(0.0, now - order[count - 1 - i][0]))
+            scheduled_waits = sorted(self._waits)
+            scheduled = _percentiles(len(scheduled_waits), scheduled_waits.__getitem__)
+            gpu_pods = sum(d.pods for d in self._demand.values())
+        pressure.sort(key=lambda p: (-p.shortfall, -p.gpu_requested, p.gpu_type))
+        return PendingQueue(
+            pod_count=count,
+            gpu_pod_count=gpu_pods,
+            pods=pods,
+            gpu_types=pressure,
+            waiting=waiting,
+            scheduled=scheduled,
+        )
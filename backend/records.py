@@ -0,0 +1,214 @@
+"""Compact internal records for cached snapshots.
+
+A snapshot of a large cluster holds 100k+ pods, and most of their strings
+repeat: namespaces, owner kinds, phases, QoS classes, images, label keys
+and values.  Snapshots are therefore kept as slotted dataclasses rather
+than pydantic models.  Pods with identical labels (e.g. all replicas of one
+owner) share a single label dict.
+
+Repeated strings are shared two ways.  The few distinct values of a
+fixed vocabulary (namespaces, phases, kinds, QoS classes, GPU types, OS and
+kubelet versions, label keys) are interned with :func:`intern`.  Values
+that churn with workloads (owner and workload names, label values, images,
+reasons) are deduplicated through the snapshot's :class:`LabelPool`
+instead: interned strings are never freed on Python 3.12+, so interning a
+new Job or ReplicaSet name every refresh would leak it for the life of the
+process.  The records have the same field names as the API models in
+models.py and are only converted to them when a response is built.
+
+Records and their label dicts are shared between snapshots and requests,
+so treat them as read-only.
+"""
+
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import orjson
+
+
+def intern(value: Optional[str]) -> Optional[str]:
+    """Intern a low-cardinality value; see the module docstring."""
+    return sys.intern(value) if value is not None else None
+
+
+@dataclass(slots=True)
+class ContainerRecord:
+    name: str
+    state: str
+    ready: bool = False
+    restart_count: int = 0
+    image: str = ""
+    reason: Optional[str] = None
+    message: Optional[str] = None
+    started_at: Optional[str] = None
+
+
+@dataclass(slots=True)
+class PodRecord:
+    name: str
+    namespace: str
+    owner_kind: str
+    owner_name: str
+    phase: str
+    gpu_request: int = 0
+    gpu_limit: int = 0
+    cpu_request_millicores: int = 0
+    cpu_limit_millicores: int = 0
+    memory_request_bytes: int = 0
+    memory_limit_bytes: int = 0
+    containers: Tuple[ContainerRecord, ...] = ()
+    created_at: Optional[str] = None
+    ip: Optional[str] = None
+    qos_class: Optional[str] = None
+    labels: Dict[str, str] = field(default_factory=dict)
+    cpu_usage_millicores: Optional[int] = None
+    memory_usage_bytes: Optional[int] = None
+    gpu_utilization_percent: Optional[float] = None
+    # Top of the owner chain (owner_graph.py)
+    workload_kind: str = ""
+    workload_name: str = ""
+
+
+@dataclass(slots=True)
+class NodeRecord:
+    name: str
+    gpu_type: str = "N/A"
+    gpu_total: int = 0
+    gpu_allocatable: int = 0
+    gpu_used: int = 0
+    cpu_total_millicores: int = 0
+    cpu_allocatable_millicores: int = 0
+    cpu_used_millicores: int = 0
+    memory_total_bytes: int = 0
+    memory_allocatable_bytes: int = 0
+    memory_used_bytes: int = 0
+    labels: Dict[str, str] = field(default_factory=dict)
+    pods: List[PodRecord] = field(default_factory=list)
+    conditions_ready: bool = True
+    os: str = ""
+    arch: str = ""
+    kubelet_version: str = ""
+    cpu_usage_millicores: Optional[int] = None
+    memory_usage_bytes: Optional[int] = None
+    gpu_utilization_percent: Optional[float] = None
+
+
+class LabelPool:
+    """Hands out one shared dict per distinct label set, and one shared copy
+    of each churning string (see :meth:`share`).
+
+    Use one pool per snapshot build so label sets and names of deleted
+    workloads are freed with the snapshot.
+    """
+
+    __slots__ = ("_dicts", "_strings")
+
+    def __init__(self):
+        self._dicts: Dict[tuple, Dict[str, str]] = {}
+        self._strings: Dict[str, str] = {}
+
+    def share(self, value: Optional[str]) -> Optional[str]:
+        """The pool's copy of *value*, for high-cardinality strings that
+        must not be interned."""
+        if value is None:
+            return None
+        return self._strings.setdefault(value, value)
+
+    def get(self, labels: Optional[Dict[str, str]]) -> Dict[str, str]:
+        if not labels:
+            return _NO_LABELS
+        key = tuple(labels.items())
+        shared = self._dicts.get(key)
+        if shared is None:
+            shared = {sys.intern(k): self.share(v) for k, v in key}
+            self._dicts[key] = shared
+        return shared
+
+
+_NO_LABELS: Dict[str, str] = {}
+
+
+# ---------------------------------------------------------------------------
+# JSON codec for API responses, shared cache backends and the on-disk
+# snapshot store.  The wire format is exactly the List[NodeDetail] API
+# schema; orjson serializes the dataclasses natively, without validation.
+# ---------------------------------------------------------------------------
+def dump_nodes(nodes: List[NodeRecord]) -> bytes:
+    return orjson.dumps(nodes)
+
+
+def iter_nodes_json(
+    nodes: Iterable, ndjson: bool = False, chunk_size: int = 64 * 1024
+) -> Iterator[bytes]:
+    """Encode *nodes* one at a time as a JSON array, or as NDJSON (one node
+    per line), yielding chunks of about *chunk_size* bytes."""
+    buf = bytearray() if ndjson else bytearray(b"[")
+    for i, node in enumerate(nodes):
+        if i and not ndjson:
+            buf += b","
+        buf += orjson.dumps(node)
+        if ndjson:
+            buf += b"\n"
+        if len(buf) >= chunk_size:
+            yield bytes(buf)
+            buf.clear()
+    if not ndjson:
+        buf += b"]"
+    if buf:
+        yield bytes(buf)
+
+
+def _container(data: dict, pool: LabelPool) -> ContainerRecord:
+    return ContainerRecord(
+        name=pool.share(data["name"]),
+        state=intern(data["state"]),
+        ready=data.get("ready", False),
+        restart_count=data.get("restart_count", 0),
+        image=pool.share(data.get("image", "")),
+        reason=pool.share(data.get("reason")),
+        message=data.get("message"),
+        started_at=data.get("started_at"),
+    )
+
+
+def _pod(data: dict, pool: LabelPool) -> PodRecord:
+    return PodRecord(
+        name=data["name"],
+        namespace=intern(data["namespace"]),
+        owner_kind=intern(data["owner_kind"]),
+        owner_name=pool.share(data["owner_name"]),
+        phase=intern(data["phase"]),
+        gpu_request=data.get("gpu_request", 0),
+        gpu_limit=data.get("gpu_limit", 0),
+        cpu_request_millicores=data.get("cpu_request_millicores", 0),
+        cpu_limit_millicores=data.get("cpu_limit_millicores", 0),
+        memory_request_bytes=data.get("memory_request_bytes", 0),
+        memory_limit_bytes=data.get("memory_limit_bytes", 0),
+        containers=tuple(_container(c, pool) for c in data.get("containers", ())),
+        created_at=data.get("created_at"),
+        ip=data.get("ip"),
+        qos_class=intern(data.get("qos_class")),
+        labels=pool.get(data.get("labels")),
+        cpu_usage_millicores=data.get("cpu_usage_millicores"),
+        memory_usage_bytes=data.get("memory_usage_bytes"),
+        gpu_utilization_percent=data.get("gpu_utilization_percent"),
+        # Snapshots taken before owner resolution: the direct owner
+        workload_kind=intern(data.get("workload_kind") or data["owner_kind"]),
+        workload_name=pool.share(data.get("workload_name") or data["owner_name"]),
+    )
+
+
+def load_nodes(payload: bytes) -> List[NodeRecord]:
+    pool = LabelPool()
+    nodes = []
+    for data in orjson.loads(payload):
+        data["labels"] = {
+            sys.intern(k): pool.share(v) for k, v in data.get("labels", {}).items()
+        }
+        data["pods"] = [_pod(p, pool) for p in data.get("pods", ())]
+        for name in ("gpu_type", "os", "arch", "kubelet_version"):
+            if name in data:
+                data[name] = sys.intern(data[name])
+        nodes.append(NodeRecord(**data))
+    return nodes
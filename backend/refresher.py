@@ -0,0 +1,64 @@
+"""Snapshot refresher for multi-worker deployments.
+
+Keeps every kubeconfig context's snapshot fresh in the shared cache backend,
+each on its own adaptive interval (see scheduler.py), so uvicorn workers
+(started with ``SNAPSHOT_READER=1``) only read the pre-serialized payloads
+and never call the K8s API themselves.
+
+Snapshots persisted in ``SNAPSHOT_DIR`` are loaded into the shared backend
+before the first refresh, so readers serve them while it runs.
+
+Started automatically by ``python main.py`` when ``WORKERS > 1``; can also
+run on its own with ``python -m refresher``.
+"""
+
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from k8s_client import K8sClient, list_clusters, preload_snapshots
+from scheduler import RefreshScheduler
+
+logger = logging.getLogger(__name__)
+
+# The refresher keeps every kubeconfig context warm, so it holds one client
+# per context instead of going through the bounded request-path registry.
+_clients: Dict[Optional[str], K8sClient] = {}
+# context -> lock held while its client is built
+_creating: Dict[Optional[str], threading.Lock] = {}
+_lock = threading.Lock()
+
+
+def _contexts() -> List[Optional[str]]:
+    clusters, _ = list_clusters()
+    # None is the default context behind /api/nodes and /api/cluster-summary
+    return [None] + [c.name for c in clusters]
+
+
+def _client(context: Optional[str]) -> K8sClient:
+    k8s = _clients.get(context)
+    if k8s is None:
+        # The scheduler's workers ask concurrently: build each context's
+        # client once, outside the lock (it loads the kubeconfig)
+        with _lock:
+            creating = _creating.setdefault(context, threading.Lock())
+        with creating:
+            k8s = _clients.get(context)
+            if k8s is None:
+                k8s = K8sClient(context=context)
+                with _lock:
+                    _clients[context] = k8s
+        with _lock:
+            _creating.pop(context, None)
+    return k8s
+
+
+def run() -> None:
+    """Refresh all contexts forever, each on its own adaptive interval."""
+    preload_snapshots(_client)
+    RefreshScheduler(_contexts, _client).run_forever()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run()
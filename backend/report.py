@@ -0,0 +1,261 @@
+"""Headless cluster report for cron jobs.
+
+Fetches every kubeconfig context (or the ones given with ``--context``)
+concurrently through K8sClient, without starting the web server, and
+writes four tables:
+
+- ``summary``: one row per cluster (nodes, pods, CPU / memory / GPU),
+- ``namespaces``: pods and requested resources per cluster and namespace,
+- ``gpu_types``: GPU capacity per cluster and GPU type,
+- ``workloads``: pods and resources per cluster and top-level workload.
+
+Usage::
+
+    python -m report [--context NAME ...] [--format json|csv|markdown]
+                     [--tables summary,namespaces,gpu_types,workloads] [-o FILE]
+                     [--since-snapshot [DIR]]
+
+Each cluster is listed exactly once, into a private in-memory cache that is
+never persisted, so a report run next to the server (same ``CACHE_BACKEND``
+or ``SNAPSHOT_DIR``) cannot overwrite the server's snapshots.  No watches
+are started either (owner graph, usage index), so ``workloads`` groups
+pods by their direct controller, e.g. a Deployment's ReplicaSet.
+``--since-snapshot`` reads the snapshots persisted in ``SNAPSHOT_DIR`` (or
+DIR) instead of calling the K8s API.  CSV output separates tables with a
+blank line and a ``# <table>`` line.  Clusters that fail are reported on
+stderr (and in JSON / Markdown output) and make the exit status 1.
+"""
+
+import argparse
+import csv
+import io
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional
+
+import snapshot_store
+from cache_backend import MemoryCacheBackend
+from k8s_client import (
+    K8sClient,
+    build_cluster_summary,
+    build_namespace_usage,
+    build_workload_usage,
+    list_clusters,
+)
+from records import NodeRecord, load_nodes
+
+logger = logging.getLogger("report")
+
+TABLES = ("summary", "namespaces", "gpu_types", "workloads")
+_NODES_KEY = "nodes_with_pods"
+
+
+class ClusterSnapshot(NamedTuple):
+    cluster: str
+    fetched_at: Optional[float] = None
+    nodes: Optional[List[NodeRecord]] = None
+    error: Optional[str] = None
+
+
+# ---------------------------------------------------------------------------
+# Collection
+# ---------------------------------------------------------------------------
+def _fetch(context: str) -> ClusterSnapshot:
+    client = K8sClient(context=context, backend=MemoryCacheBackend(), watches=False)
+    try:
+        # One list of nodes and pods: no cache, lease or summary refresh
+        fetched_at = time.time()
+        nodes = client._fetch_nodes_with_pods()
+    except Exception as exc:
+        logger.debug("Fetching %s failed", context, exc_info=True)
+        return ClusterSnapshot(context, error=f"{type(exc).__name__}: {exc}")
+    finally:
+        client.close()
+    return ClusterSnapshot(context, fetched_at, nodes)
+
+
+def fetch_clusters(contexts: List[str], parallel: int) -> List[ClusterSnapshot]:
+    """Snapshots of *contexts* from the K8s API, fetched concurrently."""
+    with ThreadPoolExecutor(max_workers=max(1, min(parallel, len(contexts)))) as pool:
+        return list(pool.map(_fetch, contexts))
+
+
+def load_persisted(contexts: Optional[List[str]]) -> List[ClusterSnapshot]:
+    """Snapshots from the on-disk snapshot store (all of them, or the ones
+    of *contexts*)."""
+    stored = {}
+    for key in snapshot_store.saved_keys():
+        context, _, name = key.rpartition(":")
+        if name == _NODES_KEY:
+            stored[context] = key
+    snapshots = []
+    for context in contexts or sorted(stored):
+        key = stored.get(context)
+        result = snapshot_store.load(key) if key else None
+        if result is None:
+            snapshots.append(ClusterSnapshot(context, error="No persisted snapshot"))
+            continue
+        payload, fetched_at = result
+        snapshots.append(ClusterSnapshot(context, fetched_at, load_nodes(payload)))
+    return snapshots
+
+
+# ---------------------------------------------------------------------------
+# Tables
+# ---------------------------------------------------------------------------
+def build_tables(snapshots: List[ClusterSnapshot]) -> Dict[str, List[dict]]:
+    tables: Dict[str, List[dict]] = {name: [] for name in TABLES}
+    for snap in snapshots:
+        if snap.nodes is None:
+            continue
+        summary = build_cluster_summary(snap.nodes)
+        tables["summary"].append({
+            "cluster": snap.cluster,
+            "fetched_at": datetime.fromtimestamp(snap.fetched_at, timezone.utc).isoformat(),
+            "node_count": summary.node_count,
+            "ready_node_count": summary.ready_node_count,
+            "pod_count": summary.pods.total,
+            "cpu_allocatable_millicores": summary.cpu.allocatable,
+            "cpu_requested_millicores": summary.cpu.used,
+            "cpu_utilization_percent": summary.cpu.utilization_percent,
+            "memory_allocatable_bytes": summary.memory.allocatable,
+            "memory_requested_bytes": summary.memory.used,
+            "memory_utilization_percent": summary.memory.utilization_percent,
+            "gpu_total": summary.gpu.total,
+            "gpu_allocatable": summary.gpu.allocatable,
+            "gpu_requested": summary.gpu.used,
+            "gpu_available": summary.gpu.available,
+            "gpu_utilization_percent": summary.gpu.utilization_percent,
+        })
+        tables["namespaces"].extend(
+            {"cluster": snap.cluster, **ns.model_dump()}
+            for ns in build_namespace_usage(snap.nodes)
+        )
+        tables["gpu_types"].extend(
+            {"cluster": snap.cluster, **stat.model_dump()} for stat in summary.gpu_by_type
+        )
+        tables["workloads"].extend(
+            {"cluster": snap.cluster, **wl.model_dump(), "owners": " ".join(wl.owners)}
+            for wl in build_workload_usage(snap.nodes)
+        )
+    return tables
+
+
+# ---------------------------------------------------------------------------
+# Output formats
+# ---------------------------------------------------------------------------
+def render_json(tables: Dict[str, List[dict]], errors: List[dict]) -> str:
+    return json.dumps({**tables, "errors": errors}, indent=2) + "\n"
+
+
+def render_csv(tables: Dict[str, List[dict]], errors: List[dict]) -> str:
+    out = io.StringIO()
+    for i, (name, rows) in enumerate(tables.items()):
+        if len(tables) > 1:
+            out.write(("\n" if i else "") + f"# {name}\n")
+        if rows:
+            writer = csv.DictWriter(out, fieldnames=list(rows[0]), lineterminator="\n")
+            writer.writeheader()
+            writer.writerows(rows)
+    return out.getvalue()
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    return str(value).replace("|", "\\|")
+
+
+def render_markdown(tables: Dict[str, List[dict]], errors: List[dict]) -> str:
+    lines = []
+    for name, rows in tables.items():
+        lines += [f"## {name}", ""]
+        if not rows:
+            lines += ["_No data_", ""]
+            continue
+        columns = list(rows[0])
+        lines.append("| " + " | ".join(columns) + " |")
+        lines.append("|" + "---|" * len(columns))
+        for row in rows:
+            lines.append("| " + " | ".join(_cell(row[c]) for c in columns) + " |")
+        lines.append("")
+    if errors:
+        lines += ["## errors", ""]
+        lines += [f"- `{e['cluster']}`: {e['error']}" for e in errors]
+        lines.append("")
+    return "\n".join(lines)
+
+
+RENDERERS = {"json": render_json, "csv": render_csv, "markdown": render_markdown}
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m report", description="Write cluster usage reports."
+    )
+    parser.add_argument(
+        "--context", action="append", dest="contexts", metavar="NAME",
+        help="kubeconfig context to report (repeatable; default: all)",
+    )
+    parser.add_argument("--format", choices=sorted(RENDERERS), default="json")
+    parser.add_argument(
+        "--tables", default=",".join(TABLES),
+        help=f"comma-separated subset of {', '.join(TABLES)}",
+    )
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument(
+        "--parallel", type=int, default=8, help="clusters fetched at once (default: 8)"
+    )
+    parser.add_argument(
+        "--since-snapshot", nargs="?", const="", metavar="DIR",
+        help="read persisted snapshots from DIR (default: SNAPSHOT_DIR) instead of the API",
+    )
+    args = parser.parse_args(argv)
+    args.tables = [t.strip() for t in args.tables.split(",") if t.strip()]
+    unknown = set(args.tables) - set(TABLES)
+    if unknown:
+        parser.error(f"unknown tables: {', '.join(sorted(unknown))}")
+    if args.since_snapshot is not None:
+        args.since_snapshot = args.since_snapshot or snapshot_store.SNAPSHOT_DIR
+        if not args.since_snapshot:
+            parser.error("--since-snapshot needs DIR when SNAPSHOT_DIR is not set")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+    args = _parse_args(argv)
+    started = time.monotonic()
+    if args.since_snapshot is not None:
+        snapshot_store.SNAPSHOT_DIR = args.since_snapshot
+        snapshots = load_persisted(args.contexts)
+    else:
+        # Neither read nor overwrite the server's persisted snapshots
+        snapshot_store.SNAPSHOT_DIR = ""
+        contexts = args.contexts or [c.name for c in list_clusters()[0]]
+        snapshots = fetch_clusters(contexts, args.parallel)
+
+    tables = build_tables(snapshots)
+    tables = {name: tables[name] for name in args.tables}
+    errors = [{"cluster": s.cluster, "error": s.error} for s in snapshots if s.error]
+    for e in errors:
+        logger.error("%s: %s", e["cluster"], e["error"])
+    output = RENDERERS[args.format](tables, errors)
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            f.write(output)
+    else:
+        sys.stdout.write(output)
+    logger.info("Reported %d clusters in %.1fs", len(snapshots), time.monotonic() - started)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
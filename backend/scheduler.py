@@ -0,0 +1,207 @@
+"""Per-context background refresh with adaptive intervals.
+
+Each context is refreshed on its own interval, starting from ``CACHE_TTL``
+and adapted after every refresh:
+
+- backs off (x1.5) when no pod was added, removed or changed phase,
+- speeds up (/2) when more than ``REFRESH_CHURN_FAST`` of pods churned,
+- otherwise drifts back toward ``CACHE_TTL``,
+- never refreshes more often than ``REFRESH_COST_FACTOR`` x the last fetch
+  time, so slow lists on huge clusters are spaced out.
+
+Contexts without a snapshot yet are refreshed as soon as they are seen;
+every later run is jittered so refreshes across many clusters don't line up.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, FrozenSet, List, Optional
+
+from circuit_breaker import CircuitOpenError, ClusterUnreachableError
+from k8s_client import CACHE_TTL
+from models import RefreshTiming
+from records import NodeRecord
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration from environment
+# ---------------------------------------------------------------------------
+REFRESH_SCHEDULER = os.getenv("REFRESH_SCHEDULER", "1") == "1"
+REFRESH_BASE_INTERVAL = float(CACHE_TTL)
+REFRESH_MIN_INTERVAL = float(os.getenv("REFRESH_MIN_INTERVAL", "10"))
+REFRESH_MAX_INTERVAL = float(os.getenv("REFRESH_MAX_INTERVAL", "300"))
+REFRESH_COST_FACTOR = float(os.getenv("REFRESH_COST_FACTOR", "10"))
+REFRESH_CHURN_FAST = float(os.getenv("REFRESH_CHURN_FAST", "0.05"))   # fraction of pods
+REFRESH_JITTER = float(os.getenv("REFRESH_JITTER", "0.1"))            # +/- fraction
+REFRESH_CONCURRENCY = int(os.getenv("REFRESH_CONCURRENCY", "4"))
+
+# Request-path TTL is this multiple of the scheduled interval, so requests
+# only refresh on their own if the scheduler falls behind.
+_TTL_SLACK = 2
+
+
+def _fingerprint(nodes: List[NodeRecord]) -> FrozenSet[int]:
+    return frozenset(
+        hash((p.namespace, p.name, p.phase, n.name)) for n in nodes for p in n.pods
+    )
+
+
+class _Schedule:
+    __slots__ = (
+        "context", "interval", "next_run", "running", "last_duration",
+        "last_refresh_at", "last_churn", "refresh_count", "fingerprint",
+    )
+
+    def __init__(self, context: Optional[str], cold: bool):
+        self.context = context
+        self.interval = REFRESH_BASE_INTERVAL
+        # Cold contexts refresh now; warm ones spread over one interval
+        delay = 0.0 if cold else random.uniform(0, self.interval)
+        self.next_run = time.monotonic() + delay
+        self.running = False
+        self.last_duration: Optional[float] = None
+        self.last_refresh_at: Optional[float] = None
+        self.last_churn: Optional[float] = None
+        self.refresh_count = 0
+        self.fingerprint: Optional[FrozenSet[int]] = None
+
+
+class RefreshScheduler:
+    """Refreshes the contexts returned by *contexts_fn* on a daemon thread.
+
+    *client_fn* maps a context to its K8sClient (or None if it went away).
+    """
+
+    def __init__(
+        self,
+        contexts_fn: Callable[[], List[Optional[str]]],
+        client_fn: Callable[[Optional[str]], object],
+        concurrency: int = REFRESH_CONCURRENCY,
+    ):
+        self._contexts_fn = contexts_fn
+        self._client_fn = client_fn
+        self._concurrency = concurrency
+        self._schedules: Dict[Optional[str], _Schedule] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.run_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run_forever(self) -> None:
+        logger.info("Refresh scheduler started")
+        with ThreadPoolExecutor(max_workers=self._concurrency) as pool:
+            while not self._stop.wait(1.0):
+                try:
+                    self._sync_contexts()
+                except Exception:
+                    logger.exception("Failed to list contexts for refresh")
+                now = time.monotonic()
+                with self._lock:
+                    due = [
+                        s for s in self._schedules.values()
+                        if not s.running and s.next_run <= now
+                    ]
+                    for s in due:
+                        s.running = True
+                for s in due:
+                    pool.submit(self._run, s)
+
+    def _is_cold(self, context: Optional[str]) -> bool:
+        """True unless *context* already has a nodes snapshot."""
+        try:
+            k8s = self._client_fn(context)
+            return k8s is None or k8s.cached_nodes() is None
+        except Exception:
+            logger.exception("Checking the snapshot of %s failed", context or "(default)")
+            return True
+
+    def _sync_contexts(self) -> None:
+        contexts = set(self._contexts_fn())
+        with self._lock:
+            new = contexts - self._schedules.keys()
+        # Outside the lock: may read the snapshot from a shared backend
+        cold = {context: self._is_cold(context) for context in new}
+        with self._lock:
+            for context in new:
+                self._schedules[context] = _Schedule(context, cold[context])
+            for context in self._schedules.keys() - contexts:
+                del self._schedules[context]
+
+    def _run(self, s: _Schedule) -> None:
+        churn = None
+        started = time.monotonic()
+        try:
+            k8s = self._client_fn(s.context)
+            if k8s is None:
+                return
+            k8s.refresh()
+            s.last_duration = time.monotonic() - started
+            s.last_refresh_at = time.time()
+            s.refresh_count += 1
+            nodes = k8s.cached_nodes()
+            fingerprint = _fingerprint(nodes) if nodes is not None else None
+            if s.fingerprint is not None and fingerprint is not None:
+                changed = len(fingerprint ^ s.fingerprint)
+                churn = changed / max(1, len(fingerprint), len(s.fingerprint))
+            s.fingerprint = fingerprint
+            s.last_churn = churn
+            s.interval = self._next_interval(s.interval, s.last_duration, churn)
+            k8s.ttl = s.interval * _TTL_SLACK
+        except CircuitOpenError as exc:
+            logger.debug("Skipping refresh: %s", exc)
+        except ClusterUnreachableError as exc:
+            logger.warning("Scheduled refresh failed: %s (%s)", exc, exc.__cause__)
+        except Exception:
+            logger.exception("Scheduled refresh failed for %s", s.context or "(default)")
+        finally:
+            jitter = random.uniform(1 - REFRESH_JITTER, 1 + REFRESH_JITTER)
+            s.next_run = time.monotonic() + s.interval * jitter
+            s.running = False
+
+    @staticmethod
+    def _next_interval(interval: float, duration: float, churn: Optional[float]) -> float:
+        if churn is not None:
+            if churn == 0:
+                interval *= 1.5
+            elif churn >= REFRESH_CHURN_FAST:
+                interval /= 2
+            else:
+                interval += (REFRESH_BASE_INTERVAL - interval) / 2
+        interval = max(interval, duration * REFRESH_COST_FACTOR)
+        return min(max(interval, REFRESH_MIN_INTERVAL), REFRESH_MAX_INTERVAL)
+
+    def timings(self) -> List[RefreshTiming]:
+        now = time.monotonic()
+        wall = time.time()
+        with self._lock:
+            schedules = list(self._schedules.values())
+        return [
+            RefreshTiming(
+                context=s.context or "__default__",
+                interval_seconds=round(s.interval, 1),
+                next_refresh_in_seconds=round(max(0.0, s.next_run - now), 1),
+                refreshing=s.running,
+                last_duration_seconds=(
+                    round(s.last_duration, 3) if s.last_duration is not None else None
+                ),
+                last_refresh_age_seconds=(
+                    round(wall - s.last_refresh_at, 1) if s.last_refresh_at else None
+                ),
+                last_churn_percent=(
+                    round(s.last_churn * 100, 2) if s.last_churn is not None else None
+                ),
+                refresh_count=s.refresh_count,
+            )
+            for s in sorted(schedules, key=lambda s: s.context or "")
+        ]
@@ -0,0 +1,193 @@
+"""Differences between two snapshots of a cluster.
+
+Nodes are matched by name and pods by namespace/name, through one dict per
+snapshot, so a diff is linear in the number of pods.  A pod counts as
+changed when it moved to another node or any of :data:`POD_FIELDS`
+differs; request deltas are rolled up per namespace, per owner and for the
+whole cluster.
+"""
+
+from operator import attrgetter
+from typing import Dict, List, Optional, Tuple
+
+from models import (
+    FieldChange,
+    NodeChange,
+    PodChange,
+    PodRef,
+    ResourceDelta,
+    SnapshotDiff,
+)
+from records import NodeRecord, PodRecord
+
+POD_FIELDS = (
+    "owner_kind", "owner_name", "phase",
+    "gpu_request", "gpu_limit",
+    "cpu_request_millicores", "cpu_limit_millicores",
+    "memory_request_bytes", "memory_limit_bytes",
+    "qos_class",
+)
+NODE_FIELDS = (
+    "gpu_type", "gpu_total", "gpu_allocatable",
+    "cpu_allocatable_millicores", "memory_allocatable_bytes",
+    "conditions_ready", "kubelet_version",
+)
+
+_pod_fields = attrgetter(*POD_FIELDS)
+_node_fields = attrgetter(*NODE_FIELDS)
+
+# pods added, removed, changed, gpu, cpu, memory
+_Delta = List[int]
+
+
+def _pods(nodes: List[NodeRecord]) -> Tuple[Dict[str, PodRecord], Dict[str, str]]:
+    """Pods and their node names by "namespace/name".  String keys and no
+    per-pod tuples keep the garbage collector out of large diffs."""
+    pods: Dict[str, PodRecord] = {}
+    pod_nodes: Dict[str, str] = {}
+    for n in nodes:
+        node = n.name
+        for p in n.pods:
+            key = f"{p.namespace}/{p.name}"
+            pods[key] = p
+            pod_nodes[key] = node
+    return pods, pod_nodes
+
+
+def _changes(old, new, fields, getter) -> List[tuple]:
+    old_values, new_values = getter(old), getter(new)
+    if old_values == new_values:
+        return []
+    return [
+        (f, a, b) for f, a, b in zip(fields, old_values, new_values) if a != b
+    ]
+
+
+def _fields(changes: List[tuple]) -> List[FieldChange]:
+    return [FieldChange(field=f, old=old, new=new) for f, old, new in changes]
+
+
+def _pod_ref(node: str, pod: PodRecord) -> PodRef:
+    return PodRef(
+        name=pod.name,
+        namespace=pod.namespace,
+        node=node,
+        owner_kind=pod.owner_kind,
+        owner_name=pod.owner_name,
+        phase=pod.phase,
+        gpu_request=pod.gpu_request,
+        cpu_request_millicores=pod.cpu_request_millicores,
+        memory_request_bytes=pod.memory_request_bytes,
+    )
+
+
+class _Rollup:
+    """Request deltas per namespace, per owner and in total."""
+
+    def __init__(self):
+        self.total: _Delta = [0] * 6
+        self.namespaces: Dict[str, _Delta] = {}
+        self.owners: Dict[str, _Delta] = {}
+
+    def add(self, pod: PodRecord, sign: int, counter: Optional[int]) -> None:
+        owner = f"{pod.namespace}/{pod.owner_kind}/{pod.owner_name}"
+        namespace = self.namespaces.get(pod.namespace)
+        if namespace is None:
+            namespace = self.namespaces[pod.namespace] = [0] * 6
+        by_owner = self.owners.get(owner)
+        if by_owner is None:
+            by_owner = self.owners[owner] = [0] * 6
+        for delta in (self.total, namespace, by_owner):
+            if counter is not None:
+                delta[counter] += 1
+            delta[3] += sign * pod.gpu_request
+            delta[4] += sign * pod.cpu_request_millicores
+            delta[5] += sign * pod.memory_request_bytes
+
+
+def _delta(key: str, delta: _Delta) -> ResourceDelta:
+    return ResourceDelta(
+        key=key,
+        pods_added=delta[0],
+        pods_removed=delta[1],
+        pods_changed=delta[2],
+        gpu_request=delta[3],
+        cpu_request_millicores=delta[4],
+        memory_request_bytes=delta[5],
+    )
+
+
+def _ranked(groups: Dict[str, _Delta], limit: Optional[int]) -> List[ResourceDelta]:
+    """Groups that changed, largest GPU (then CPU, memory) change first."""
+    changed = [(k, d) for k, d in groups.items() if any(d)]
+    changed.sort(key=lambda kd: (-abs(kd[1][3]), -abs(kd[1][4]), -abs(kd[1][5]), kd[0]))
+    return [_delta(k, d) for k, d in changed[:limit]]
+
+
+def diff_snapshots(
+    base: List[NodeRecord],
+    target: List[NodeRecord],
+    limit: Optional[int] = None,
+    base_fetched_at: Optional[float] = None,
+    target_fetched_at: Optional[float] = None,
+) -> SnapshotDiff:
+    """What changed from *base* to *target*; item lists hold at most
+    *limit* entries (None: all)."""
+    old_nodes = {n.name: n for n in base}
+    new_nodes = {n.name: n for n in target}
+    nodes_changed = []
+    for name, new in new_nodes.items():
+        old = old_nodes.get(name)
+        if old is not None:
+            changes = _changes(old, new, NODE_FIELDS, _node_fields)
+            if changes:
+                nodes_changed.append((name, changes))
+
+    old_pods, old_pod_nodes = _pods(base)
+    new_pods, new_pod_nodes = _pods(target)
+    rollup = _Rollup()
+    added, removed, changed = [], [], []
+    for key, pod in new_pods.items():
+        old_pod = old_pods.get(key)
+        if old_pod is None:
+            rollup.add(pod, 1, 0)
+            added.append(key)
+            continue
+        changes = _changes(old_pod, pod, POD_FIELDS, _pod_fields)
+        old_node, node = old_pod_nodes[key], new_pod_nodes[key]
+        if old_node != node:
+            changes.insert(0, ("node", old_node, node))
+        if changes:
+            rollup.add(old_pod, -1, None)
+            rollup.add(pod, 1, 2)
+            changed.append((key, changes))
+    for key, pod in old_pods.items():
+        if key not in new_pods:
+            rollup.add(pod, -1, 1)
+            removed.append(key)
+
+    return SnapshotDiff(
+        base_fetched_at=base_fetched_at,
+        target_fetched_at=target_fetched_at,
+        total=_delta("total", rollup.total),
+        nodes_added=sorted(new_nodes.keys() - old_nodes.keys())[:limit],
+        nodes_removed=sorted(old_nodes.keys() - new_nodes.keys())[:limit],
+        nodes_changed=[
+            NodeChange(name=name, changes=_fields(changes))
+            for name, changes in nodes_changed[:limit]
+        ],
+        nodes_changed_count=len(nodes_changed),
+        pods_added=[_pod_ref(new_pod_nodes[k], new_pods[k]) for k in added[:limit]],
+        pods_removed=[_pod_ref(old_pod_nodes[k], old_pods[k]) for k in removed[:limit]],
+        pods_changed=[
+            PodChange(
+                name=new_pods[k].name,
+                namespace=new_pods[k].namespace,
+                node=new_pod_nodes[k],
+                changes=_fields(changes),
+            )
+            for k, changes in changed[:limit]
+        ],
+        namespaces=_ranked(rollup.namespaces, limit),
+        owners=_ranked(rollup.owners, limit),
+    )
@@ -0,0 +1,154 @@
+"""Persistent on-disk snapshots for fast cold starts.
+
+When ``SNAPSHOT_DIR`` is set, the last snapshot of each cluster is written
+there after every refresh as zlib-compressed JSON.  On startup the stored
+payload is loaded back into the cache and served as stale while the first
+real refresh runs, so a restarted backend answers immediately instead of
+waiting for a full list of a large cluster.
+
+With ``SNAPSHOT_HISTORY`` > 0, node snapshots are also copied to
+``SNAPSHOT_DIR/history`` at most once per ``SNAPSHOT_HISTORY_INTERVAL``
+seconds, keeping the newest ``SNAPSHOT_HISTORY`` per cluster for diffs.
+"""
+
+import json
+import logging
+import os
+import zlib
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration from environment
+# ---------------------------------------------------------------------------
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "")             # empty disables persistence
+SNAPSHOT_COMPRESS_LEVEL = int(os.getenv("SNAPSHOT_COMPRESS_LEVEL", "1"))
+SNAPSHOT_HISTORY = int(os.getenv("SNAPSHOT_HISTORY", "0"))       # past snapshots kept per key
+SNAPSHOT_HISTORY_INTERVAL = int(os.getenv("SNAPSHOT_HISTORY_INTERVAL", "3600"))  # seconds
+
+_MAGIC = b"K8SDASH1\n"
+_SUFFIX = ".snapshot"
+
+
+def enabled() -> bool:
+    return bool(SNAPSHOT_DIR)
+
+
+def _safe(key: str) -> str:
+    return "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in key)
+
+
+def _path(key: str) -> str:
+    return os.path.join(SNAPSHOT_DIR, _safe(key) + _SUFFIX)
+
+
+def _history_dir() -> str:
+    return os.path.join(SNAPSHOT_DIR, "history")
+
+
+def _history_path(key: str, fetched_at: int) -> str:
+    return os.path.join(_history_dir(), f"{_safe(key)}@{fetched_at}{_SUFFIX}")
+
+
+def save(key: str, payload: bytes, fetched_at: float, keep_history: bool = False) -> None:
+    """Atomically write the JSON *payload* for *key*; with *keep_history*
+    also add it to the key's history when one is due."""
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    _write(_path(key), key, payload, fetched_at)
+    if keep_history and SNAPSHOT_HISTORY > 0:
+        times = history(key)
+        if times and fetched_at - times[-1] < SNAPSHOT_HISTORY_INTERVAL:
+            return
+        os.makedirs(_history_dir(), exist_ok=True)
+        _write(_history_path(key, int(fetched_at)), key, payload, fetched_at)
+        for old in (times + [int(fetched_at)])[:-SNAPSHOT_HISTORY]:
+            try:
+                os.remove(_history_path(key, old))
+            except OSError:
+                pass
+
+
+def _write(path: str, key: str, payload: bytes, fetched_at: float) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    header = {"key": key, "fetched_at": fetched_at, "encoding": "zlib+json"}
+    try:
+        with open(tmp, "wb") as f:
+            f.write(_MAGIC)
+            f.write(json.dumps(header).encode() + b"\n")
+            f.write(zlib.compress(payload, SNAPSHOT_COMPRESS_LEVEL))
+        os.replace(tmp, path)
+    except OSError:
+        logger.exception("Failed to persist snapshot %s", key)
+
+
+def _read(path: str, with_payload: bool = True) -> Optional[Tuple[dict, bytes]]:
+    try:
+        with open(path, "rb") as f:
+            if f.readline() != _MAGIC:
+                logger.warning("Ignoring %s: not a snapshot file", path)
+                return None
+            header = json.loads(f.readline())
+            payload = zlib.decompress(f.read()) if with_payload else b""
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, zlib.error):
+        logger.exception("Ignoring unreadable snapshot %s", path)
+        return None
+    return header, payload
+
+
+def load(key: str) -> Optional[Tuple[bytes, float]]:
+    """Return ``(json_payload, fetched_at)`` for *key*, or None."""
+    if not enabled():
+        return None
+    result = _read(_path(key))
+    if result is None:
+        return None
+    header, payload = result
+    return payload, header["fetched_at"]
+
+
+def history(key: str) -> List[int]:
+    """Fetch times (epoch seconds) of the history snapshots of *key*, oldest
+    first."""
+    if not enabled() or not os.path.isdir(_history_dir()):
+        return []
+    prefix = _safe(key) + "@"
+    times = []
+    for name in os.listdir(_history_dir()):
+        if name.startswith(prefix) and name.endswith(_SUFFIX):
+            try:
+                times.append(int(name[len(prefix):-len(_SUFFIX)]))
+            except ValueError:
+                continue
+    return sorted(times)
+
+
+def load_history(key: str, at: Optional[float] = None) -> Optional[Tuple[bytes, float]]:
+    """Return ``(json_payload, fetched_at)`` of the newest history snapshot
+    of *key* taken at or before *at* (default: the oldest kept), or None."""
+    times = history(key)
+    if at is not None:
+        times = [t for t in times if t <= at]
+        times = times[-1:]
+    if not times:
+        return None
+    result = _read(_history_path(key, times[0]))
+    if result is None:
+        return None
+    header, payload = result
+    return payload, header["fetched_at"]
+
+
+def saved_keys() -> List[str]:
+    """Cache keys of all snapshots on disk."""
+    if not enabled() or not os.path.isdir(SNAPSHOT_DIR):
+        return []
+    keys = []
+    for name in os.listdir(SNAPSHOT_DIR):
+        if name.endswith(_SUFFIX):
+            result = _read(os.path.join(SNAPSHOT_DIR, name), with_payload=False)
+            if result is not None:
+                keys.append(result[0]["key"])
+    return keys
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The backend is a flat set of modules run from its own directory
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(BACKEND_DIR, "tests", "fixtures")
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
@@ -0,0 +1,256 @@
+import os
+import threading
+import time
+
+import pytest
+
+from cache_backend import FileCacheBackend, MemoryCacheBackend, RedisCacheBackend
+
+
+@pytest.fixture
+def file_dir(tmp_path):
+    return str(tmp_path / "cache")
+
+
+def _age(path: str, seconds: float) -> None:
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def _lease_path(directory: str, key: str) -> str:
+    return os.path.join(directory, key + ".lease")
+
+
+# ---------------------------------------------------------------------------
+# Behaviour shared by every backend
+# ---------------------------------------------------------------------------
+@pytest.fixture(params=["memory", "file"])
+def replicas(request, tmp_path):
+    """Two backends standing in for two replicas sharing one cache."""
+    if request.param == "memory":
+        backend = MemoryCacheBackend()
+        return backend, backend
+    directory = str(tmp_path / "shared")
+    return FileCacheBackend(directory), FileCacheBackend(directory)
+
+
+def test_put_get_bumps_version(replicas):
+    a, b = replicas
+    assert a.get("ctx:nodes") is None
+    first = a.put("ctx:nodes", b"[1]", fetched_at=100.0)
+    second = b.put("ctx:nodes", b"[2]")
+    assert (first.version, first.fetched_at) == (1, 100.0)
+    assert second.version == 2
+    entry = a.get("ctx:nodes")
+    assert (entry.value, entry.version) == (b"[2]", 2)
+    a.delete("ctx:nodes")
+    assert b.get("ctx:nodes") is None
+
+
+def test_lease_is_exclusive_until_released(replicas):
+    a, b = replicas
+    assert a.acquire_lease("ctx:nodes")
+    assert not b.acquire_lease("ctx:nodes")
+    assert a.renew_lease("ctx:nodes")
+    a.release_lease("ctx:nodes")
+    assert b.acquire_lease("ctx:nodes")
+
+
+def test_keep_lease_renews_until_the_block_ends(replicas, monkeypatch):
+    a, _ = replicas
+    renewed = threading.Event()
+    renew = a.renew_lease
+
+    def spy(key, ttl):
+        renewed.set()
+        return renew(key, ttl)
+
+    monkeypatch.setattr(a, "renew_lease", spy)
+    assert a.acquire_lease("ctx:nodes", ttl=1)
+    with a.keep_lease("ctx:nodes", ttl=0.03):
+        assert renewed.wait(2)
+    renewed.clear()
+    time.sleep(0.1)
+    assert not renewed.is_set()
+
+
+# ---------------------------------------------------------------------------
+# File backend
+# ---------------------------------------------------------------------------
+def test_file_release_keeps_another_owners_lease(file_dir):
+    a, b = FileCacheBackend(file_dir), FileCacheBackend(file_dir)
+    assert a.acquire_lease("k")
+    b.release_lease("k")
+    assert not b.renew_lease("k")
+    assert os.path.exists(_lease_path(file_dir, "k"))
+
+
+def test_file_stale_lease_is_broken(file_dir):
+    dead, live = FileCacheBackend(file_dir), FileCacheBackend(file_dir)
+    assert dead.acquire_lease("k", ttl=60)
+    _age(_lease_path(file_dir, "k"), 120)
+    assert live.acquire_lease("k", ttl=60)
+    # The dead owner can neither renew nor release the new lease
+    assert not dead.renew_lease("k")
+    dead.release_lease("k")
+    assert not FileCacheBackend(file_dir).acquire_lease("k", ttl=60)
+    # No broken lease files are left behind
+    assert sorted(os.listdir(file_dir)) == ["k.lease"]
+
+
+def test_file_renewed_lease_is_not_broken(file_dir):
+    holder, other = FileCacheBackend(file_dir), FileCacheBackend(file_dir)
+    assert holder.acquire_lease("k", ttl=60)
+    _age(_lease_path(file_dir, "k"), 120)
+    assert holder.renew_lease("k", ttl=60)
+    assert not other.acquire_lease("k", ttl=60)
+
+
+def test_file_lease_replaced_during_break_is_handed_back(file_dir, monkeypatch):
+    dead, breaker, fresh = (FileCacheBackend(file_dir) for _ in range(3))
+    path = _lease_path(file_dir, "k")
+    assert dead.acquire_lease("k", ttl=60)
+    _age(path, 120)
+
+    # Another replica breaks the stale lease and takes a new one between
+    # this replica's stat and its rename
+    rename = os.rename
+
+    def racing_rename(src, dst):
+        if src == path:
+            os.remove(path)
+            assert fresh.acquire_lease("k", ttl=60)
+        monkeypatch.setattr(os, "rename", rename)
+        rename(src, dst)
+
+    monkeypatch.setattr(os, "rename", racing_rename)
+    assert not breaker.acquire_lease("k", ttl=60)
+    assert fresh.renew_lease("k")
+    assert sorted(os.listdir(file_dir)) == ["k.lease"]
+
+
+def test_file_concurrent_breakers_elect_one_leader(file_dir):
+    dead = FileCacheBackend(file_dir)
+    assert dead.acquire_lease("k", ttl=60)
+    _age(_lease_path(file_dir, "k"), 120)
+    backends = [FileCacheBackend(file_dir) for _ in range(16)]
+    start = threading.Barrier(len(backends))
+    results = []
+
+    def contend(backend):
+        start.wait()
+        results.append(backend.acquire_lease("k", ttl=60))
+
+    threads = [threading.Thread(target=contend, args=(b,)) for b in backends]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results.count(True) == 1
+
+
+def test_file_get_sees_other_replicas_writes(file_dir):
+    a, b = FileCacheBackend(file_dir), FileCacheBackend(file_dir)
+    a.put("k", b"one")
+    assert b.get("k").value == b"one"
+    a.put("k", b"two")
+    assert b.get("k").value == b"two"
+    # Writes leave no temp files behind
+    assert sorted(os.listdir(file_dir)) == ["k.snap"]
+
+
+# ---------------------------------------------------------------------------
+# Redis backend (fakeredis, with Lua support, when installed)
+# ---------------------------------------------------------------------------
+@pytest.fixture
+def redis_replicas(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    import redis
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        redis.Redis, "from_url", classmethod(lambda cls, url: fakeredis.FakeRedis(server=server))
+    )
+    return RedisCacheBackend(), RedisCacheBackend()
+
+
+def test_redis_snapshots_and_leases(redis_replicas):
+    a, b = redis_replicas
+    a.put("k", b"one", fetched_at=5.0)
+    entry = b.get("k")
+    assert (entry.value, entry.fetched_at, entry.version) == (b"one", 5.0, 1)
+    assert a.acquire_lease("k")
+    assert not b.acquire_lease("k")
+    assert not b.renew_lease("k")
+    b.release_lease("k")
+    assert a.renew_lease("k")
+    a.release_lease("k")
+    assert b.acquire_lease("k")
+
+
+def test_memory_lease_is_only_released_by_its_owner():
+    backend = MemoryCacheBackend()
+    backend._leases["k"] = ("other-replica", time.monotonic() + 60)
+    assert not backend.renew_lease("k")
+    backend.release_lease("k")
+    assert not backend.acquire_lease("k")
+
+
+# ---------------------------------------------------------------------------
+# K8sClients sharing a backend
+# ---------------------------------------------------------------------------
+@pytest.fixture
+def clients(monkeypatch):
+    """Two clients of one context sharing a memory backend, with an expired
+    nodes snapshot in it."""
+    from types import SimpleNamespace
+
+    kubernetes = pytest.importorskip("kubernetes")
+    import k8s_client
+
+    monkeypatch.setattr(kubernetes.config, "load_incluster_config", lambda **kwargs: None)
+    monkeypatch.setattr(
+        kubernetes.client,
+        "CoreV1Api",
+        lambda **kwargs: SimpleNamespace(api_client=SimpleNamespace(close=lambda: None)),
+    )
+    backend = MemoryCacheBackend()
+    backend.put(k8s_client._snapshot_key("ctx", "nodes_with_pods"), [], time.time() - 3600)
+    return [k8s_client.K8sClient("ctx", backend=backend) for _ in range(2)]
+
+
+def test_one_client_refreshes_an_expired_entry(clients):
+    fetches = []
+    fetching, release = threading.Event(), threading.Event()
+
+    def fetch():
+        fetches.append(threading.current_thread().name)
+        fetching.set()
+        release.wait(5)
+        return []
+
+    start = threading.Barrier(len(clients) * 4)
+    served = []
+
+    def get(k8s):
+        start.wait()
+        served.append(k8s._get_entry("nodes_with_pods", fetch, ttl=30))
+
+    threads = [threading.Thread(target=get, args=(k8s,)) for k8s in clients * 4]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # Everyone got the stale snapshot at once while one refresh is running
+    assert [entry.version for entry in served] == [1] * len(threads)
+    # The refresh runs in the background: wait for it to start
+    assert fetching.wait(5)
+    time.sleep(0.05)
+    assert len(fetches) == 1
+    release.set()
+    deadline = time.monotonic() + 5
+    while clients[1]._get_entry("nodes_with_pods", fetch, ttl=30).version == 1:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert len(fetches) == 1
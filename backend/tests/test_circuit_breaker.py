@@ -0,0 +1,137 @@
+import pytest
+
+import circuit_breaker
+import k8s_client
+from circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    ClusterUnreachableError,
+)
+from k8s_client import K8sClient
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock)
+    # No jitter: backoffs are exact
+    monkeypatch.setattr(circuit_breaker.random, "uniform", lambda a, b: 1.0)
+    monkeypatch.setattr(circuit_breaker, "BREAKER_FAILURE_THRESHOLD", 2)
+    monkeypatch.setattr(circuit_breaker, "BREAKER_BASE_BACKOFF", 5.0)
+    monkeypatch.setattr(circuit_breaker, "BREAKER_MAX_BACKOFF", 30.0)
+    return clock
+
+
+def test_opens_at_the_failure_threshold(clock):
+    breaker = CircuitBreaker("ctx")
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.retry_after() == 5.0
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_half_open_lets_one_trial_through(clock):
+    breaker = CircuitBreaker("ctx")
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now += 5.0
+    assert breaker.state == HALF_OPEN
+    breaker.raise_if_open()  # does not claim the trial
+    breaker.before_call()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_backoff_doubles_up_to_the_cap(clock):
+    breaker = CircuitBreaker("ctx")
+    breaker.record_failure()
+    backoffs = []
+    for _ in range(5):
+        breaker.record_failure()
+        backoffs.append(breaker.retry_after())
+        clock.now += backoffs[-1]
+        breaker.before_call()
+    assert backoffs == [5.0, 10.0, 20.0, 30.0, 30.0]
+
+
+def test_success_resets(clock):
+    breaker = CircuitBreaker("ctx")
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += breaker.retry_after()
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    # Counting starts over, from the base backoff
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.retry_after() == 5.0
+
+
+def _client():
+    k8s = object.__new__(K8sClient)
+    k8s._context = "ctx"
+    k8s.breaker = CircuitBreaker("ctx")
+    return k8s
+
+
+def _raise(exc):
+    def fetch():
+        raise exc
+    return fetch
+
+
+def test_errors_from_the_api_server_leave_the_circuit_closed(clock):
+    ApiException = pytest.importorskip("kubernetes.client.exceptions").ApiException
+
+    k8s = _client()
+    for status in (401, 403, 404, 500):
+        with pytest.raises(ApiException):
+            k8s._fetch_and_store("nodes_with_pods", _raise(ApiException(status=status)))
+    with pytest.raises(ValueError):
+        k8s._fetch_and_store("nodes_with_pods", _raise(ValueError("bad quantity")))
+    assert k8s.breaker.state == CLOSED
+    k8s_client._fetch_errors.pop("ctx", None)
+
+
+def test_connection_errors_open_the_circuit(clock):
+    NewConnectionError = pytest.importorskip("urllib3.exceptions").NewConnectionError
+
+    k8s = _client()
+    for _ in range(2):
+        with pytest.raises(ClusterUnreachableError):
+            k8s._fetch_and_store(
+                "nodes_with_pods", _raise(NewConnectionError(None, "refused"))
+            )
+    assert k8s.breaker.state == OPEN
+    k8s_client._fetch_errors.pop("ctx", None)
+
+
+def test_answered_trial_closes_the_circuit(clock):
+    ApiException = pytest.importorskip("kubernetes.client.exceptions").ApiException
+
+    k8s = _client()
+    k8s.breaker.record_failure()
+    k8s.breaker.record_failure()
+    clock.now += k8s.breaker.retry_after()
+    with pytest.raises(ApiException):
+        k8s._fetch_and_store("nodes_with_pods", _raise(ApiException(status=403)))
+    assert k8s.breaker.state == CLOSED
+    k8s_client._fetch_errors.pop("ctx", None)
@@ -0,0 +1,79 @@
+import threading
+import time
+
+import pytest
+
+import k8s_client
+from k8s_client import ClientRegistry, K8sClient
+
+
+class _FakeClient:
+    built = 0
+
+    def __init__(self, context=None, registry=None):
+        type(self).built += 1
+        self._context = context
+        self.approx_bytes = 0
+        self.closed = False
+        self.closed_under_lock = None
+        self._registry = registry
+
+    def close(self):
+        self.closed = True
+        self.closed_under_lock = self._registry._lock.locked()
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = ClientRegistry(max_clients=2, idle_ttl=3600, memory_budget=1 << 30)
+    _FakeClient.built = 0
+
+    def build(context=None):
+        # Slow enough for concurrent misses to overlap
+        time.sleep(0.05)
+        return _FakeClient(context, registry)
+
+    monkeypatch.setattr(k8s_client, "K8sClient", build)
+    return registry
+
+
+def test_concurrent_misses_build_one_client(registry):
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get("a"))) for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert _FakeClient.built == 1
+    assert all(k8s is results[0] for k8s in results)
+
+
+def test_evicted_clients_are_closed_outside_the_lock(registry):
+    a = registry.get("a")
+    registry.get("b")
+    registry.get("c")
+    assert a.closed and a.closed_under_lock is False
+    assert [k8s._context for k8s in registry.clients()] == ["b", "c"]
+    assert registry.peek("a") is None
+
+
+def test_idle_clients_are_evicted_but_not_the_latest(registry):
+    registry._idle_ttl = 0
+    a = registry.get("a")
+    time.sleep(0.01)
+    b = registry.get("b")
+    assert a.closed and not b.closed
+    assert registry.clients() == [b]
+
+
+def test_closed_client_does_not_store(monkeypatch):
+    k8s = K8sClient.__new__(K8sClient)
+    k8s.closed = True
+    backend = k8s_client.get_cache_backend()
+    monkeypatch.setattr(backend, "put", lambda *args, **kwargs: pytest.fail("stored"))
+
+    entry = k8s._store("nodes_with_pods", [], fetched_at=12.0)
+
+    assert (entry.value, entry.fetched_at) == ([], 12.0)
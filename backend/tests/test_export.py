@@ -0,0 +1,73 @@
+import asyncio
+import io
+
+import pytest
+
+import export
+from records import ContainerRecord, NodeRecord, PodRecord
+
+pa = pytest.importorskip("pyarrow")
+
+
+def _nodes():
+    pod = PodRecord(
+        "train-0", "ml", "Job", "train-1", "Running",
+        gpu_request=4, labels={"team": "vision"},
+        containers=(ContainerRecord("trainer", "running", ready=True),),
+        workload_kind="CronJob", workload_name="train",
+    )
+    return [NodeRecord("gpu-1", gpu_type="H100", gpu_total=8, pods=[pod]), NodeRecord("cpu-1")]
+
+
+def test_build_tables_flattens_the_snapshot():
+    tables = export.build_tables(_nodes())
+    assert {name: t.num_rows for name, t in tables.items()} == {
+        "nodes": 2, "pods": 1, "containers": 1,
+    }
+    pods = tables["pods"].to_pylist()
+    assert pods[0]["node"] == "gpu-1"
+    assert pods[0]["workload_name"] == "train"
+    assert pods[0]["labels"] == [("team", "vision")]
+    assert tables["nodes"].column("pod_count").to_pylist() == [1, 0]
+
+
+@pytest.mark.parametrize("fmt", sorted(export.FORMATS))
+def test_iter_table_round_trips(fmt, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_BATCH_ROWS", 1)
+    table = export.build_tables(_nodes())["nodes"]
+    data = b"".join(export.iter_table(table, fmt))
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        read = pq.read_table(io.BytesIO(data))
+    else:
+        read = pa.ipc.open_stream(data).read_all()
+    assert read.to_pylist() == table.to_pylist()
+
+
+def test_export_of_a_kept_snapshot(tmp_path, monkeypatch):
+    import main
+    import snapshot_store
+    from fastapi import HTTPException
+    from k8s_client import _snapshot_key
+    from records import dump_nodes
+
+    monkeypatch.setattr(snapshot_store, "SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(snapshot_store, "SNAPSHOT_HISTORY", 2)
+    key = _snapshot_key(None, "nodes_with_pods")
+    snapshot_store.save(key, dump_nodes(_nodes()), 1_700_000_000.0, keep_history=True)
+    snapshot_store.save(key, dump_nodes(_nodes()[1:]), 1_700_003_600.0, keep_history=True)
+
+    async def fetch(at):
+        response = await main._serve_export(None, "nodes", "arrow", at)
+        return response, b"".join([chunk async for chunk in response.body_iterator])
+
+    response, data = asyncio.run(fetch(1_700_003_599.0))
+    assert pa.ipc.open_stream(data).read_all().column("name").to_pylist() == ["gpu-1", "cpu-1"]
+    assert "default-nodes-1700000000.arrow" in response.headers["Content-Disposition"]
+    assert "X-Snapshot-Stale" not in response.headers
+    _, data = asyncio.run(fetch(1_700_003_600.0))
+    assert pa.ipc.open_stream(data).read_all().column("name").to_pylist() == ["cpu-1"]
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(fetch(1_699_999_999.0))
+    assert raised.value.status_code == 404
@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import BACKEND_DIR
+
+# Loaded on first use (the first K8s call, export or Redis connection), so
+# workers and health checks start without them
+_LAZY = ("kubernetes", "pyarrow", "redis")
+
+
+@pytest.mark.parametrize("module", ["main", "k8s_client", "report", "refresher", "export"])
+def test_import_does_not_load_heavy_dependencies(module):
+    code = (
+        f"import sys; import {module}; "
+        f"print(','.join(m for m in {_LAZY!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == ""
+
+
+# Seconds from `import main` to the first /healthz response.  Startup takes
+# well under a second; an eager kubeconfig load or a warm-up that blocks
+# the lifespan (connect timeouts to every context) takes far longer.
+_STARTUP_BUDGET = 3.0
+
+_FIRST_RESPONSE = f"""
+import threading, time, sys
+from fastapi.testclient import TestClient
+start = time.perf_counter()
+import main
+release = threading.Event()
+main.warm_up = lambda: release.wait(60)
+with TestClient(main.app) as http:
+    status = http.get("/healthz").status_code
+    elapsed = time.perf_counter() - start
+    warming = not main.app.state.warm_up.done()
+    loaded = [m for m in {_LAZY!r} if m in sys.modules]
+    release.set()
+print(status, warming, round(elapsed, 3), ",".join(loaded))
+"""
+
+
+def test_healthz_answers_before_warm_up_within_budget():
+    result = subprocess.run(
+        [sys.executable, "-c", _FIRST_RESPONSE],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "REFRESH_SCHEDULER": "0", "SNAPSHOT_READER": "0"},
+    )
+    status, warming, elapsed, *loaded = result.stdout.split()
+    assert (status, warming, loaded) == ("200", "True", [])
+    assert float(elapsed) < _STARTUP_BUDGET
@@ -0,0 +1,12 @@
+from k8s_client import _bare_node_record, build_cluster_summary
+from records import NodeRecord, PodRecord
+
+
+def test_nodes_known_only_from_their_pods_are_not_counted_ready():
+    pod = PodRecord("train-0", "ml", "Job", "train", "Running", gpu_request=2)
+    bare = _bare_node_record("gpu-1", [pod])
+    assert not bare.conditions_ready
+    assert bare.gpu_used == 2
+
+    summary = build_cluster_summary([bare, NodeRecord("gpu-2")])
+    assert (summary.node_count, summary.ready_node_count) == (2, 1)
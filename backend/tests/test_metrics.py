@@ -0,0 +1,235 @@
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+import metrics
+from conftest import FIXTURES_DIR
+from metrics import (
+    GPU_UTIL_METRIC,
+    MetricsCollector,
+    MetricsSnapshot,
+    Usage,
+    _cpu_millicores,
+    iter_lines,
+    join_usage,
+    parse_prometheus_text,
+)
+from records import NodeRecord, PodRecord
+
+
+class _Response:
+    def __init__(self, data: bytes):
+        self._data = data
+        self.released = False
+
+    def stream(self, amt):
+        # Small chunks, so samples straddle chunk boundaries
+        return iter(_chunks(self._data, 13))
+
+    def release_conn(self):
+        self.released = True
+
+
+class _Core:
+    def __init__(self, response):
+        self.api_client = None
+        self.response = response
+
+    def connect_get_namespaced_pod_proxy_with_path(self, name, namespace, path, **kwargs):
+        return self.response
+
+
+def _exporter():
+    return SimpleNamespace(
+        metadata=SimpleNamespace(name="dcgm-exporter-x1", namespace="gpu-operator"),
+        spec=SimpleNamespace(node_name="gpu-node-1"),
+    )
+
+
+@pytest.fixture
+def exporter_text() -> bytes:
+    with open(os.path.join(FIXTURES_DIR, "dcgm_exporter.txt"), "rb") as f:
+        return f.read()
+
+
+def _chunks(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_parse_keeps_only_requested_metric(exporter_text):
+    samples = list(parse_prometheus_text(exporter_text.split(b"\n"), {GPU_UTIL_METRIC}))
+    # NaN, the _EXTRA suffix, other metrics and comments are dropped
+    assert [(name, labels["gpu"], value) for name, labels, value in samples] == [
+        (GPU_UTIL_METRIC, "0", 97.0),
+        (GPU_UTIL_METRIC, "1", 89.0),
+        (GPU_UTIL_METRIC, "2", 3.0),
+        (GPU_UTIL_METRIC, "3", 0.0),
+    ]
+    assert samples[0][1]["pod"] == "train-0"
+    assert samples[0][1]["namespace"] == "ml"
+    assert samples[2][1]["exported_pod"] == "nb-7f9c"
+
+
+def test_parse_unescapes_label_values():
+    line = b'DCGM_FI_DEV_GPU_UTIL{modelName="NVIDIA \\"H100\\" {80GB}",path="C:\\\\x"} 12.5'
+    [(_, labels, value)] = parse_prometheus_text([line], {GPU_UTIL_METRIC})
+    assert labels == {"modelName": 'NVIDIA "H100" {80GB}', "path": "C:\\x"}
+    assert value == 12.5
+
+
+def test_parse_without_labels_and_with_timestamp():
+    lines = [
+        b"DCGM_FI_DEV_GPU_UTIL 42 1700000000000",
+        b"DCGM_FI_DEV_GPU_UTIL",
+        b"DCGM_FI_DEV_GPU_UTIL x",
+    ]
+    assert list(parse_prometheus_text(lines, {GPU_UTIL_METRIC})) == [(GPU_UTIL_METRIC, {}, 42.0)]
+
+
+@pytest.mark.parametrize("size", [1, 7, 64, 1 << 20])
+def test_iter_lines_is_independent_of_chunking(exporter_text, size):
+    expected = exporter_text.rstrip(b"\n").split(b"\n")
+    assert list(iter_lines(_chunks(exporter_text, size))) == expected
+
+
+def test_iter_lines_keeps_unterminated_last_line():
+    assert list(iter_lines([b"a\nb", b"c"])) == [b"a", b"bc"]
+
+
+@pytest.mark.parametrize(
+    "quantity, millicores",
+    [("123456789n", 123), ("250000u", 250), ("1500m", 1500), ("2", 2000), ("0.5", 500)],
+)
+def test_cpu_millicores(quantity, millicores):
+    assert _cpu_millicores(quantity) == millicores
+
+
+def test_scrape_groups_utilization_by_node_and_pod(exporter_text):
+    response = _Response(exporter_text)
+    collector = MetricsCollector(_Core(response), connect_timeout=1.0)
+
+    node, node_values, pod_values = collector._scrape_dcgm(_exporter())
+
+    assert node == "gpu-node-1"
+    assert node_values == [97.0, 89.0, 3.0, 0.0]
+    # exported_* labels name the pod when the exporter relabels them
+    assert pod_values == {("ml", "train-0"): [97.0, 89.0], ("research", "nb-7f9c"): [3.0]}
+    assert response.released
+
+
+def test_join_usage_copies_matching_usage_only():
+    measured = PodRecord("train-0", "ml", "Job", "train", "Running")
+    other = PodRecord("train-0", "other", "Job", "train", "Running")
+    node = NodeRecord("gpu-node-1", pods=[measured, other])
+    unmeasured = NodeRecord("gpu-node-2")
+    snapshot = MetricsSnapshot(
+        collected_at=0.0,
+        nodes={
+            "gpu-node-1": Usage(
+                cpu_millicores=3200, memory_bytes=1 << 30, gpu_utilization_percent=47.2
+            ),
+        },
+        pods={("ml", "train-0"): Usage(cpu_millicores=1900, gpu_utilization_percent=93.0)},
+    )
+
+    join_usage([node, unmeasured], snapshot)
+
+    assert (node.cpu_usage_millicores, node.memory_usage_bytes, node.gpu_utilization_percent) == (
+        3200, 1 << 30, 47.2,
+    )
+    assert (measured.cpu_usage_millicores, measured.memory_usage_bytes) == (1900, None)
+    assert measured.gpu_utilization_percent == 93.0
+    assert other.cpu_usage_millicores is None and other.gpu_utilization_percent is None
+    assert unmeasured.cpu_usage_millicores is None
+
+
+class _ApiServer(BaseHTTPRequestHandler):
+    """Answers pod proxy requests like the API server: the exporter text,
+    streamed in small chunks.  The ``slow-*`` exporter never answers in
+    time."""
+
+    protocol_version = "HTTP/1.1"
+    body = b""
+    paths: list = []
+
+    def do_GET(self):
+        type(self).paths.append(self.path)
+        if "/pods/slow-" in self.path:
+            time.sleep(2)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in _chunks(self.body, 97):
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api_server(exporter_text, monkeypatch):
+    client = pytest.importorskip("kubernetes.client")
+    monkeypatch.setattr(metrics, "METRICS_SCRAPE_TIMEOUT", 0.5)
+    monkeypatch.setattr(_ApiServer, "body", exporter_text)
+    monkeypatch.setattr(_ApiServer, "paths", [])
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ApiServer)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    configuration = client.Configuration()
+    configuration.host = f"http://127.0.0.1:{server.server_address[1]}"
+    configuration.retries = 0
+    api_client = client.ApiClient(configuration)
+    yield client.CoreV1Api(api_client=api_client)
+    api_client.close()
+    server.shutdown()
+    server.server_close()
+
+
+def test_scrape_over_http_through_the_pod_proxy(api_server):
+    collector = MetricsCollector(api_server, connect_timeout=1.0)
+
+    node, node_values, pod_values = collector._scrape_dcgm(_exporter())
+
+    # "name:port" is percent-encoded by the client and decoded by the API server
+    assert _ApiServer.paths == [
+        "/api/v1/namespaces/gpu-operator/pods/dcgm-exporter-x1%3A9400/proxy/metrics"
+    ]
+    assert node == "gpu-node-1"
+    assert node_values == [97.0, 89.0, 3.0, 0.0]
+    assert pod_values == {("ml", "train-0"): [97.0, 89.0], ("research", "nb-7f9c"): [3.0]}
+
+
+def test_scrape_over_http_gives_up_at_the_read_timeout(api_server):
+    collector = MetricsCollector(api_server, connect_timeout=1.0)
+    exporter = _exporter()
+    exporter.metadata.name = "slow-exporter"
+
+    started = time.monotonic()
+    assert collector._scrape_dcgm(exporter) is None
+    assert time.monotonic() - started < 1.5
+
+
+def test_scrapes_fit_in_the_connection_pool(monkeypatch):
+    pytest.importorskip("kubernetes")
+    import k8s_client
+
+    monkeypatch.setattr(k8s_client, "METRICS_SCRAPE_CONCURRENCY", 8)
+    monkeypatch.setattr(k8s_client, "K8S_POOL_MAXSIZE", 8)
+    monkeypatch.setattr(k8s_client, "NAMESPACE_LIST_CONCURRENCY", 4)
+    k8s = object.__new__(k8s_client.K8sClient)
+    k8s.core = SimpleNamespace(api_client=None)
+    k8s._metrics = None
+    k8s.namespaces = []
+    # Node list and pod list in flight
+    assert k8s._metrics_collector().concurrency == 6
+    k8s._metrics, k8s.namespaces = None, ["a", "b", "c", "d", "e"]
+    assert k8s._metrics_collector().concurrency == 3
+    k8s._metrics, k8s.namespaces = None, [f"ns-{i}" for i in range(10)]
+    monkeypatch.setattr(k8s_client, "NAMESPACE_LIST_CONCURRENCY", 8)
+    assert k8s._metrics_collector().concurrency == 1
@@ -0,0 +1,177 @@
+from types import SimpleNamespace
+
+import pytest
+
+import owner_graph
+from owner_graph import OwnerGraph, controller_ref
+
+
+def _create(namespaces):
+    return OwnerGraph.create(None, "ctx", 1.0, 1.0, namespaces=namespaces)
+
+
+def _scopes(graph):
+    return sorted({namespace for _, namespace in graph._watches}, key=str)
+
+
+class _Reviews(list):
+    """Timeouts of the access reviews asked for, answered with *allowed*."""
+
+    allowed = False
+
+    def __call__(self, api_client, timeout):
+        self.append(timeout)
+        return self.allowed
+
+
+@pytest.fixture
+def reviews(monkeypatch):
+    reviews = _Reviews()
+    monkeypatch.setattr(owner_graph, "can_watch_cluster_wide", reviews)
+    return reviews
+
+
+def test_cluster_wide_context_needs_no_review(reviews):
+    graph = _create(None)
+    assert _scopes(graph) == [None]
+    assert len(graph._watches) == len(owner_graph.KINDS)
+    assert reviews == []
+
+
+def test_namespaced_context_watches_cluster_wide_when_allowed(reviews):
+    reviews.allowed = True
+    graph = _create(["a", "b", "c"])
+    assert _scopes(graph) == [None]
+    assert reviews == [(1.0, 1.0)]
+
+
+def test_namespaced_context_without_access_is_capped(reviews, monkeypatch):
+    assert _create(["a"]) is None
+    monkeypatch.setattr(owner_graph, "OWNER_MAX_NAMESPACES", 2)
+    assert _create(["a", "b", "c"]) is None
+    graph = _create(["a", "b"])
+    assert _scopes(graph) == ["a", "b"]
+    assert len(graph._watches) == 2 * len(owner_graph.KINDS)
+
+
+def test_failed_review_raises(monkeypatch):
+    def review(api_client, timeout):
+        raise OSError("connection refused")
+
+    monkeypatch.setattr(owner_graph, "can_watch_cluster_wide", review)
+    with pytest.raises(OSError):
+        _create(["a"])
+
+
+def test_can_watch_cluster_wide_needs_list_and_watch_on_every_kind(monkeypatch):
+    asked = []
+
+    class _AuthorizationApi:
+        def __init__(self, api_client=None):
+            pass
+
+        def create_self_subject_access_review(self, review, _request_timeout=None):
+            attrs = review.spec.resource_attributes
+            asked.append((attrs.group, attrs.resource, attrs.verb))
+            denied = (attrs.resource, attrs.verb) == ("jobs", "watch")
+            return SimpleNamespace(status=SimpleNamespace(allowed=not denied))
+
+    from kubernetes import client
+
+    monkeypatch.setattr(client, "AuthorizationV1Api", _AuthorizationApi)
+    assert not owner_graph.can_watch_cluster_wide(None, (1.0, 1.0))
+    assert ("batch", "jobs", "watch") in asked
+    assert asked.index(("batch", "jobs", "watch")) == len(asked) - 1
+
+
+def _ref(kind, name, controller=None):
+    return SimpleNamespace(kind=kind, name=name, controller=controller)
+
+
+def test_controller_ref_prefers_the_controller():
+    assert controller_ref(None) is None
+    first, controller = _ref("ConfigMap", "x"), _ref("ReplicaSet", "web-1", True)
+    assert controller_ref([first, controller]) is controller
+    assert controller_ref([first]) is first
+
+
+def test_resolve_walks_to_the_top_of_the_chain(reviews):
+    graph = _create(None)
+    graph._watches[("ReplicaSet", None)].parents["ml/web-5d9f"] = ("Deployment", "web")
+    graph._watches[("Job", None)].parents["ml/nightly-28"] = ("CronJob", "nightly")
+    graph._watches[("StatefulSet", None)].parents["ml/db"] = ("ReplicaSet", "db-rs")
+    graph._watches[("ReplicaSet", None)].parents["ml/db-rs"] = ("Cluster", "pg")
+
+    assert graph.resolve("ml", "ReplicaSet", "web-5d9f") == ("Deployment", "web")
+    assert graph.resolve("ml", "Job", "nightly-28") == ("CronJob", "nightly")
+    assert graph.resolve("ml", "StatefulSet", "db") == ("Cluster", "pg")
+    # Unknown objects and other namespaces stay as they are
+    assert graph.resolve("other", "ReplicaSet", "web-5d9f") == ("ReplicaSet", "web-5d9f")
+    assert graph.resolve("ml", "Node", "gpu-1") == ("Node", "gpu-1")
+
+
+def test_resolve_stops_on_cycles(reviews):
+    graph = _create(None)
+    parents = graph._watches[("ReplicaSet", None)].parents
+    parents["ml/a"] = ("ReplicaSet", "b")
+    parents["ml/b"] = ("ReplicaSet", "a")
+    assert graph.resolve("ml", "ReplicaSet", "a")[0] == "ReplicaSet"
+
+
+def test_watch_connections_bound_the_graph(monkeypatch):
+    kinds = len(owner_graph.KINDS)
+    assert owner_graph.watch_connections(None) == kinds
+    assert owner_graph.watch_connections(["a", "b"]) == kinds
+    monkeypatch.setattr(owner_graph, "OWNER_MAX_NAMESPACES", 2)
+    assert owner_graph.watch_connections(["a", "b"]) == 2 * kinds
+    monkeypatch.setattr(owner_graph, "OWNER_GRAPH_ENABLED", False)
+    assert owner_graph.watch_connections(None) == 0
+
+
+class _Graph:
+    started = 0
+
+    def start(self):
+        type(self).started += 1
+
+    def stop(self):
+        pass
+
+
+def test_concurrent_first_fetches_create_one_graph(monkeypatch):
+    import threading
+    import time
+
+    import k8s_client
+    from k8s_client import K8sClient
+
+    created = []
+
+    def create(*args, **kwargs):
+        # Slow enough for concurrent first fetches to overlap
+        time.sleep(0.05)
+        created.append(_Graph())
+        return created[-1]
+
+    monkeypatch.setattr(k8s_client, "OWNER_GRAPH_ENABLED", True)
+    monkeypatch.setattr(k8s_client.OwnerGraph, "create", create)
+    k8s = object.__new__(K8sClient)
+    k8s._context = "ctx"
+    k8s.namespaces = []
+    k8s.closed = False
+    k8s.core = SimpleNamespace(api_client=None)
+    k8s._owners, k8s._owners_created = None, False
+    k8s._owners_lock = threading.Lock()
+    k8s._watch_owners = True
+    _Graph.started = 0
+
+    graphs = []
+    threads = [
+        threading.Thread(target=lambda: graphs.append(k8s._owner_graph())) for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(created) == 1 and _Graph.started == 1
+    assert all(graph is created[0] for graph in graphs)
@@ -0,0 +1,88 @@
+import gc
+import tracemalloc
+
+import pytest
+
+import records
+from records import LabelPool, dump_nodes, load_nodes
+
+client = pytest.importorskip("kubernetes.client")
+
+from k8s_client import K8sClient  # noqa: E402
+
+
+def _pods(refresh, count=200):
+    """Pods of one refresh: every Job, its pods and their labels are new."""
+    pods = []
+    for i in range(count):
+        job = f"train-{refresh:04d}-{i:04d}"
+        pods.append(client.V1Pod(
+            metadata=client.V1ObjectMeta(
+                name=f"{job}-x7k2p",
+                namespace="ml",
+                labels={"job-name": job, "controller-uid": f"uid-{refresh}-{i}"},
+                owner_references=[client.V1OwnerReference(
+                    api_version="batch/v1", kind="Job", name=job, uid=f"uid-{refresh}-{i}",
+                    controller=True,
+                )],
+            ),
+            spec=client.V1PodSpec(containers=[client.V1Container(name="main")]),
+            status=client.V1PodStatus(
+                phase="Running",
+                qos_class="BestEffort",
+                container_statuses=[client.V1ContainerStatus(
+                    name="main", image=f"registry/train:{refresh}-{i}", image_id="",
+                    ready=True, restart_count=0,
+                    state=client.V1ContainerState(
+                        waiting=client.V1ContainerStateWaiting(reason=f"Pulling-{refresh}-{i}")
+                    ),
+                )],
+            ),
+        ))
+    return pods
+
+
+def _retained_growth(refresh_fn, rounds=20):
+    """Bytes allocated by the snapshot code that are still live after
+    *rounds* refreshes beyond the first, with every snapshot dropped."""
+    refresh_fn(0)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        for refresh in range(1, rounds + 1):
+            refresh_fn(refresh)
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    # Only allocations made here, not by threads other tests left running
+    ours = [
+        tracemalloc.Filter(True, f"*{name}")
+        for name in ("records.py", "k8s_client.py", "test_records.py", "kubernetes/*")
+    ]
+    after, before = after.filter_traces(ours), before.filter_traces(ours)
+    return sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+
+def test_churning_names_are_freed_with_the_snapshot():
+    k8s = object.__new__(K8sClient)
+
+    def refresh(n):
+        pods = _pods(n)
+        pool = LabelPool()
+        snapshot = [k8s._build_pod_record(pod, pool) for pod in pods]
+        # Decoding a shared or persisted snapshot takes the same path
+        load_nodes(dump_nodes([records.NodeRecord(name="node-0", pods=snapshot)]))
+
+    # Interned, the new strings of every refresh would stay: ~1.9 MB here
+    assert _retained_growth(refresh) < 64 * 1024
+
+
+def test_pool_shares_repeated_values_within_a_snapshot():
+    pool = LabelPool()
+    a = pool.get({"app": "".join(["trainer", "-1"])})
+    b = pool.get({"app": "trainer-1", "team": "".join(["m", "l"])})
+    assert a["app"] is b["app"]
+    assert pool.share("".join(["m", "l"])) is b["team"]
+    assert pool.share(None) is None
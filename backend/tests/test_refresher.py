@@ -0,0 +1,29 @@
+import threading
+import time
+
+import refresher
+
+
+def test_concurrent_workers_build_one_client_per_context(monkeypatch):
+    built = []
+
+    def build(context=None):
+        # Slow enough for concurrent misses to overlap
+        time.sleep(0.05)
+        built.append(context)
+        return object()
+
+    monkeypatch.setattr(refresher, "K8sClient", build)
+    monkeypatch.setattr(refresher, "_clients", {})
+    results = []
+    threads = [
+        threading.Thread(target=lambda c=c: results.append((c, refresher._client(c))))
+        for c in ["a", "b", None] * 4
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(built, key=str) == sorted(["a", "b", None], key=str)
+    assert all(k8s is refresher._clients[c] for c, k8s in results)
+    assert refresher._creating == {}
@@ -0,0 +1,143 @@
+import csv
+import io
+import json
+
+import pytest
+
+import report
+import snapshot_store
+from k8s_client import _snapshot_key
+from records import NodeRecord, PodRecord, dump_nodes
+from report import ClusterSnapshot
+
+
+def _nodes():
+    pods = [
+        PodRecord(
+            f"web-{i}", "shop", "ReplicaSet", "web-5d9f", "Running",
+            gpu_request=1, cpu_request_millicores=500,
+            workload_kind="Deployment", workload_name="web",
+        )
+        for i in range(2)
+    ]
+    return [
+        NodeRecord(
+            "gpu-1", gpu_type="H100", gpu_total=8, gpu_allocatable=8, gpu_used=2,
+            cpu_allocatable_millicores=4000, cpu_used_millicores=1000, pods=pods,
+        ),
+        NodeRecord("cpu-1", conditions_ready=False, cpu_allocatable_millicores=2000),
+    ]
+
+
+def _snapshots():
+    return [
+        ClusterSnapshot("prod", 1_700_000_000.0, _nodes()),
+        ClusterSnapshot("lab", error="ApiException: (403)"),
+    ]
+
+
+def test_build_tables_skips_failed_clusters():
+    tables = report.build_tables(_snapshots())
+    assert list(tables) == list(report.TABLES)
+    (summary,) = tables["summary"]
+    assert summary["cluster"] == "prod"
+    assert summary["fetched_at"] == "2023-11-14T22:13:20+00:00"
+    assert (summary["node_count"], summary["ready_node_count"], summary["pod_count"]) == (2, 1, 2)
+    assert summary["gpu_requested"] == 2
+    (namespace,) = tables["namespaces"]
+    assert (namespace["cluster"], namespace["namespace"], namespace["pod_count"]) == (
+        "prod", "shop", 2,
+    )
+    assert [row["gpu_type"] for row in tables["gpu_types"]] == ["H100"]
+    (workload,) = tables["workloads"]
+    assert (workload["kind"], workload["name"], workload["owners"]) == (
+        "Deployment", "web", "ReplicaSet/web-5d9f",
+    )
+
+
+def _errors():
+    return [{"cluster": "lab", "error": "ApiException: (403)"}]
+
+
+def test_render_json():
+    data = json.loads(report.render_json(report.build_tables(_snapshots()), _errors()))
+    assert set(data) == set(report.TABLES) | {"errors"}
+    assert data["errors"] == _errors()
+    assert data["summary"][0]["cluster"] == "prod"
+
+
+def test_render_csv_separates_tables():
+    tables = report.build_tables(_snapshots())
+    text = report.render_csv({"summary": tables["summary"], "gpu_types": []}, [])
+    sections = text.split("\n\n")
+    assert sections[0].startswith("# summary\n")
+    assert sections[1] == "# gpu_types\n"
+    rows = list(csv.DictReader(io.StringIO(sections[0].split("\n", 1)[1])))
+    assert rows[0]["cluster"] == "prod"
+    # A single table has no section header
+    assert report.render_csv({"summary": tables["summary"]}, []).startswith("cluster,")
+
+
+def test_render_markdown_escapes_cells_and_lists_errors():
+    text = report.render_markdown(
+        {"summary": [{"cluster": "a|b", "pods": None}], "workloads": []}, _errors()
+    )
+    assert "| cluster | pods |\n|---|---|\n| a\\|b |  |" in text
+    assert "## workloads\n\n_No data_" in text
+    assert text.endswith("## errors\n\n- `lab`: ApiException: (403)\n")
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    # report.main points SNAPSHOT_DIR elsewhere; restored after the test
+    monkeypatch.setattr(snapshot_store, "SNAPSHOT_DIR", str(tmp_path))
+    snapshot_store.save(
+        _snapshot_key("prod", "nodes_with_pods"), dump_nodes(_nodes()), 1_700_000_000.0
+    )
+    return tmp_path
+
+
+def test_since_snapshot_reads_the_persisted_snapshots(snapshot_dir, tmp_path, capsys):
+    out = tmp_path / "report.json"
+    argv = ["--since-snapshot", str(snapshot_dir), "--tables", "summary", "-o", str(out)]
+    assert report.main(argv) == 0
+    data = json.loads(out.read_text())
+    assert [row["cluster"] for row in data["summary"]] == ["prod"]
+    assert data["errors"] == []
+
+    assert report.main(argv + ["--context", "prod", "--context", "lab"]) == 1
+    data = json.loads(out.read_text())
+    assert data["errors"] == [{"cluster": "lab", "error": "No persisted snapshot"}]
+
+
+def test_since_snapshot_needs_a_directory(monkeypatch):
+    monkeypatch.setattr(snapshot_store, "SNAPSHOT_DIR", "")
+    with pytest.raises(SystemExit):
+        report.main(["--since-snapshot"])
+
+
+def test_fetch_lists_each_cluster_once_without_watches(monkeypatch):
+    clients = []
+
+    class _Client:
+        def __init__(self, context=None, namespaces=None, backend=None, watches=True):
+            self.watches = watches
+            self.fetches = 0
+            self.closed = False
+            clients.append(self)
+
+        def _fetch_nodes_with_pods(self):
+            self.fetches += 1
+            if len(clients) > 1:
+                raise RuntimeError("unreachable")
+            return _nodes()
+
+        def close(self):
+            self.closed = True
+
+    monkeypatch.setattr(report, "K8sClient", _Client)
+    ok, failed = report.fetch_clusters(["prod", "lab"], parallel=1)
+    assert [c.fetches for c in clients] == [1, 1]
+    assert all(not c.watches and c.closed for c in clients)
+    assert ok.nodes is not None and ok.fetched_at
+    assert failed.error == "RuntimeError: unreachable"
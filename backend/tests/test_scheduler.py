@@ -0,0 +1,41 @@
+import time
+
+from scheduler import RefreshScheduler
+
+
+class _Client:
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+    def cached_nodes(self):
+        return self.nodes
+
+
+def test_cold_contexts_are_due_at_once_and_warm_ones_spread():
+    clients = {"cold": _Client(None), "warm": _Client([]), None: None}
+    scheduler = RefreshScheduler(lambda: list(clients), clients.get)
+    before = time.monotonic()
+
+    scheduler._sync_contexts()
+
+    schedules = scheduler._schedules
+    assert schedules["cold"].next_run <= time.monotonic()
+    # No live client yet: nothing cached, so also due at once
+    assert schedules[None].next_run <= time.monotonic()
+    warm = schedules["warm"]
+    assert before <= warm.next_run <= time.monotonic() + warm.interval
+
+
+def test_known_contexts_keep_their_schedule():
+    clients = {"a": _Client(None)}
+    scheduler = RefreshScheduler(lambda: list(clients), clients.get)
+    scheduler._sync_contexts()
+    first = scheduler._schedules["a"]
+    first.next_run = 1e12
+
+    scheduler._sync_contexts()
+
+    assert scheduler._schedules["a"] is first
+    del clients["a"]
+    scheduler._sync_contexts()
+    assert "a" not in scheduler._schedules
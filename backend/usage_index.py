@@ -0,0 +1,202 @@
+"""Per-node requested resources, kept current by a scoped pod watch.
+
+The cluster summary only needs, per node, the sum of pod requests and the
+number of pods.  Instead of listing every pod for each summary, a
+UsageIndex lists scheduled pods once (in pages) and then follows a watch
+on them.  It keeps a per-node counter and, per pod, only the tuple it
+contributed, so it can subtract the pod again when the pod changes or is
+deleted.  Pods without requests contribute to the pod count only.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from records import intern
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration from environment
+# ---------------------------------------------------------------------------
+USAGE_WATCH_TIMEOUT = int(os.getenv("USAGE_WATCH_TIMEOUT", "300"))  # seconds per watch call
+USAGE_LIST_PAGE_SIZE = int(os.getenv("USAGE_LIST_PAGE_SIZE", "500"))
+
+# Only pods bound to a node count toward usage
+_FIELD_SELECTOR = "spec.nodeName!="
+
+# (gpu, cpu millicores, memory bytes) requested by a pod
+Requests = Tuple[int, int, int]
+_NO_REQUESTS: Requests = (0, 0, 0)
+
+
+def _add(nodes: Dict[str, list], pods: dict, uid: str, node: str, requests: Requests) -> None:
+    pods[uid] = (node, requests)
+    counters = nodes.get(node)
+    if counters is None:
+        counters = nodes[node] = [0, 0, 0, 0]
+    counters[0] += requests[0]
+    counters[1] += requests[1]
+    counters[2] += requests[2]
+    counters[3] += 1
+
+
+def _remove(nodes: Dict[str, list], pods: dict, uid: str) -> None:
+    old = pods.pop(uid, None)
+    if old is None:
+        return
+    node, requests = old
+    counters = nodes[node]
+    counters[0] -= requests[0]
+    counters[1] -= requests[1]
+    counters[2] -= requests[2]
+    counters[3] -= 1
+    if counters[3] == 0:
+        del nodes[node]
+
+
+class UsageIndex:
+    """Requested GPU/CPU/memory and pod count per node for one context.
+
+    *core* is the context's CoreV1Api; *requests_fn* maps a pod object to
+    its summed :data:`Requests`.
+    """
+
+    def __init__(
+        self,
+        core,
+        requests_fn: Callable[[object], Requests],
+        name: str,
+        connect_timeout: float,
+        read_timeout: float,
+    ):
+        self._core = core
+        self._requests_fn = requests_fn
+        self.name = name
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        # node -> [gpu, cpu, memory, pods]
+        self._nodes: Dict[str, list] = {}
+        # pod uid -> (node, requests)
+        self._pods: Dict[str, Tuple[str, Requests]] = {}
+        self._lock = threading.Lock()
+        self._synced = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.resource_version: Optional[str] = None
+        self.synced_at: Optional[float] = None
+        self.events = 0
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name=f"usage-{self.name}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def wait_synced(self, timeout: float) -> bool:
+        return self._synced.wait(timeout)
+
+    def usage(self) -> Dict[str, Tuple[int, int, int, int]]:
+        """Copy of node -> (gpu, cpu millicores, memory bytes, pods)."""
+        with self._lock:
+            return {node: tuple(c) for node, c in self._nodes.items()}
+
+    def tracked_pods(self) -> int:
+        return len(self._pods)
+
+    # ------------------------------------------------------------------
+    # Counters
+    # ------------------------------------------------------------------
+    def _requests(self, pod) -> Requests:
+        requests = self._requests_fn(pod)
+        # Most pods request nothing; share one tuple for them
+        return _NO_REQUESTS if requests == _NO_REQUESTS else requests
+
+    def _apply(self, event_type: str, pod) -> None:
+        uid = pod.metadata.uid
+        with self._lock:
+            _remove(self._nodes, self._pods, uid)
+            if event_type != "DELETED" and pod.spec.node_name:
+                node = intern(pod.spec.node_name)
+                _add(self._nodes, self._pods, uid, node, self._requests(pod))
+
+    # ------------------------------------------------------------------
+    # List + watch
+    # ------------------------------------------------------------------
+    def _relist(self) -> None:
+        nodes: Dict[str, list] = {}
+        pods: Dict[str, Tuple[str, Requests]] = {}
+        continue_token = None
+        while True:
+            page = self._core.list_pod_for_all_namespaces(
+                field_selector=_FIELD_SELECTOR,
+                limit=USAGE_LIST_PAGE_SIZE,
+                _continue=continue_token,
+                _request_timeout=(self._connect_timeout, self._read_timeout),
+            )
+            for pod in page.items:
+                node = intern(pod.spec.node_name)
+                _add(nodes, pods, pod.metadata.uid, node, self._requests(pod))
+            continue_token = page.metadata._continue
+            if not continue_token:
+                break
+        with self._lock:
+            self._nodes, self._pods = nodes, pods
+            self.resource_version = page.metadata.resource_version
+        self.synced_at = time.time()
+        self._synced.set()
+        logger.info("Usage index for %s synced: %d pods", self.name, len(pods))
+
+    def _watch(self) -> None:
+        from kubernetes import watch
+
+        w = watch.Watch()
+        for event in w.stream(
+            self._core.list_pod_for_all_namespaces,
+            field_selector=_FIELD_SELECTOR,
+            resource_version=self.resource_version,
+            allow_watch_bookmarks=True,
+            timeout_seconds=USAGE_WATCH_TIMEOUT,
+            _request_timeout=(self._connect_timeout, USAGE_WATCH_TIMEOUT + 30),
+        ):
+            if self._stop.is_set():
+                w.stop()
+                return
+            if event["type"] == "ERROR":
+                # Unexpected watch error: resynchronize from a fresh list
+                raise RuntimeError(f"watch error: {event['raw_object']}")
+            if event["type"] != "BOOKMARK":
+                self._apply(event["type"], event["object"])
+                self.events += 1
+            self.resource_version = w.resource_version
+
+    def _run(self) -> None:
+        from kubernetes.client.exceptions import ApiException
+
+        backoff = 1.0
+        needs_list = True
+        while not self._stop.is_set():
+            try:
+                if needs_list:
+                    self._relist()
+                    needs_list = False
+                self._watch()
+                backoff = 1.0
+            except ApiException as exc:
+                if exc.status == 410:
+                    # resourceVersion too old: start over from a fresh list
+                    needs_list = True
+                    continue
+                logger.warning("Usage watch for %s failed: %s", self.name, exc)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 60.0)
+            except Exception:
+                logger.exception("Usage watch for %s failed", self.name)
+                needs_list = True
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 60.0)
@@ -128,8 +128,9 @@ function App() {
   const allOwners = useMemo(() => {
     const map = {}
     nodes.forEach(n => n.pods.forEach(p => {
-      const key = `${p.owner_kind}/${p.owner_name}`
-      if (!map[key]) map[key] = { kind: p.owner_kind, name: p.owner_name, count: 0 }
+      const { kind, name } = workloadOf(p)
+      const key = `${kind}/${name}`
+      if (!map[key]) map[key] = { kind, name, count: 0 }
       map[key].count++
     }))
     return Object.values(map).sort((a, b) => a.name.localeCompare(b.name))
@@ -218,8 +219,8 @@ function App() {
         let match = false
         if (workloadMode === 'owner') {
           if (selectedOwners.length === 0) return
-          const key = `${p.owner_kind}/${p.owner_name}`
-          match = selectedOwners.includes(key)
+          const { kind, name } = workloadOf(p)
+          match = selectedOwners.includes(`${kind}/${name}`)
         } else {
           if (!wlLabelKey || !wlLabelValue) return
           match = (p.labels || {})[wlLabelKey] === wlLabelValue
@@ -252,8 +253,9 @@ function App() {
   const workloadByOwner = useMemo(() => {
     const map = {}
     workloadPods.forEach(({ pod, nodeName, clusterName, nodeReady }) => {
-      const key = `${pod.owner_kind}/${pod.owner_name}`
-      if (!map[key]) map[key] = { ownerKey: key, kind: pod.owner_kind, name: pod.owner_name, pods: [], gpu: 0, cpuMillis: 0, memBytes: 0, nodeSet: new Set() }
+      const { kind, name } = workloadOf(pod)
+      const key = `${kind}/${name}`
+      if (!map[key]) map[key] = { ownerKey: key, kind, name, pods: [], gpu: 0, cpuMillis: 0, memBytes: 0, nodeSet: new Set() }
       map[key].pods.push({ pod, nodeName, clusterName, nodeReady })
       map[key].gpu += pod.gpu_request || 0
       map[key].cpuMillis += pod.cpu_request_millicores || 0
@@ -536,6 +538,12 @@ function App() {
                             <span className="detail-label">Owner</span>
                             <span className="detail-value">{pod.owner_kind}/{pod.owner_name}</span>
                           </div>
+                          {pod.workload_name && pod.workload_name !== pod.owner_name && (
+                            <div className="detail-item">
+                              <span className="detail-label">Workload</span>
+                              <span className="detail-value">{pod.workload_kind}/{pod.workload_name}</span>
+                            </div>
+                          )}
                           <div className="detail-item">
                             <span className="detail-label">IP</span>
                             <span className="detail-value">{pod.ip || 'N/A'}</span>
@@ -860,6 +868,14 @@ function App() {
   )
 }
 
+// Top-level controller of a pod; older snapshots only carry the direct owner
+function workloadOf(pod) {
+  return {
+    kind: pod.workload_kind || pod.owner_kind,
+    name: pod.workload_name || pod.owner_name,
+  }
+}
+
 function formatBytes(bytes) {
   if (!bytes || bytes === 0) return '0 B'
   const units = ['B', 'KiB', 'MiB', 'GiB', 'TiB']